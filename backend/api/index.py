@@ -6,9 +6,9 @@ import logging
 import os
 import random
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from urllib.parse import urlparse
 from typing import Optional
 from dotenv import load_dotenv
@@ -17,7 +17,6 @@ from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-import httpx
 from PIL import Image
 from PIL import ImageDraw
 
@@ -34,15 +33,26 @@ from core.config import (
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
     DEFAULT_CITY,
+    DEFAULT_LLM_PROVIDER,
     DEFAULT_MODES,
+    DEFAULT_REFRESH_INTERVAL,
+    FONT_CACHE_WARMUP,
+    ICON_ATLAS_PATH,
+    LOOP_LAG_INTERVAL_MS,
+    CACHE_SWEEP_INTERVAL_SECONDS,
+    WEATHER_REFRESH_INTERVAL_SECONDS,
+    RENDER_PRERENDER,
+    RENDER_STALE_GRACE_MINUTES,
+    get_cacheable_modes,
 )
 from core.mode_registry import get_registry
-from core.context import get_date_context, get_weather, calc_battery_pct
+from core.context import context_service, calc_battery_pct
 from core.config_store import (
     init_db,
     save_config,
     get_active_config,
     get_config_history,
+    get_active_cities,
     activate_config,
     get_cycle_index,
     set_cycle_index,
@@ -54,8 +64,15 @@ from core.config_store import (
     validate_device_token,
 )
 from core.cache import content_cache
+from core.delta import frame_history
+from core.framebuffer import RENDER_MEDIA_TYPES, frame_encodings
 from core.schemas import ConfigRequest
 from core.pipeline import generate_and_render
+from core.scheduler import Priority, config_version, render_job_key, render_scheduler
+from core.render_pool import loop_lag, render_pool
+from core.llm_pool import llm_pool
+from core.http_client import close_http_client, get_http_client, open_http_client
+from core.telemetry import telemetry
 from core.renderer import (
     render_error,
     image_to_bmp_bytes,
@@ -63,8 +80,6 @@ from core.renderer import (
 )
 from core.stats_store import (
     init_stats_db,
-    log_render,
-    log_heartbeat,
     get_device_stats,
     get_stats_overview,
     get_render_history,
@@ -86,11 +101,57 @@ async def lifespan(app: FastAPI):
     await init_stats_db()
     from core.cache import init_cache_db
     await init_cache_db()
+    _warm_render_caches()
+    from core.calendar_index import calendar_index
+    await asyncio.to_thread(calendar_index.load_or_build)
+    await open_http_client()
+    background = []
+    if CACHE_SWEEP_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(content_cache.run_sweeper(CACHE_SWEEP_INTERVAL_SECONDS)))
+    if LOOP_LAG_INTERVAL_MS > 0:
+        background.append(asyncio.create_task(loop_lag.run()))
+    if WEATHER_REFRESH_INTERVAL_SECONDS > 0:
+        background.append(asyncio.create_task(
+            context_service.run_weather_refresh(get_active_cities, WEATHER_REFRESH_INTERVAL_SECONDS)
+        ))
+    background.append(asyncio.create_task(telemetry.run()))
     yield
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await telemetry.aclose()
+    await render_scheduler.stop()
+    render_pool.shutdown()
+    await llm_pool.aclose()
+    await close_http_client()
     from core.db import close_all
     await close_all()
 
 
+def _warm_render_caches() -> None:
+    """Pre-load icons, fonts and layout plans of builtin JSON modes so first renders skip parsing."""
+    from core.json_renderer import collect_icon_sizes, warm_font_cache
+    from core.patterns.utils import prepare_icon_atlas
+
+    registry = get_registry()
+    builtin_ids = [info.mode_id for info in registry.list_modes() if info.source == "builtin_json"]
+    defs = [registry.get_json_mode(mode_id).definition for mode_id in builtin_ids]
+    try:
+        count = prepare_icon_atlas(collect_icon_sizes(defs), ICON_ATLAS_PATH or None)
+        logger.info(f"[ICON] {count} monochrome icons resident")
+    except Exception:
+        logger.warning("[ICON] Icon atlas preparation failed", exc_info=True)
+    if FONT_CACHE_WARMUP:
+        try:
+            count = warm_font_cache(defs)
+            for mode_id in builtin_ids:
+                registry.get_layout_plan(mode_id, SCREEN_WIDTH, SCREEN_HEIGHT)
+            logger.info(f"[FONT] Warmed fonts and layout plans for {count} layouts of {len(defs)} builtin modes")
+        except Exception:
+            logger.warning("[FONT] Font cache warm-up failed", exc_info=True)
+
+
 app = FastAPI(title="InkSight API", version="1.0.0", lifespan=lifespan)
 
 # ── Rate limiting ────────────────────────────────────────────
@@ -179,17 +240,11 @@ async def _choose_persona_from_config(config: dict, peek_next: bool = False) ->
 
     elif strategy == "time_slot":
         hour = datetime.now().hour
-        rules = config.get("time_slot_rules", [])
-        for rule in rules:
-            start_h = rule.get("startHour", 0)
-            end_h = rule.get("endHour", 24)
-            rule_modes = rule.get("modes", [])
-            if start_h <= hour < end_h and rule_modes:
-                available = [m for m in rule_modes if m in modes]
-                if available:
-                    persona = random.choice(available)
-                    logger.debug(f"[TIME_SLOT] hour={hour}, matched {start_h}-{end_h}, persona={persona}")
-                    return persona
+        available = _time_slot_modes(config, modes, hour)
+        if available:
+            persona = random.choice(available)
+            logger.debug(f"[TIME_SLOT] hour={hour}, persona={persona}")
+            return persona
         logger.debug(f"[TIME_SLOT] hour={hour}, no rule matched, falling back to random")
         return random.choice(modes)
 
@@ -208,6 +263,47 @@ async def _choose_persona_from_config(config: dict, peek_next: bool = False) ->
         return random.choice(modes)
 
 
+def _time_slot_modes(config: dict, modes: list[str], hour: int) -> list[str]:
+    """Enabled modes of the first time-slot rule covering ``hour``; empty if none matches."""
+    for rule in config.get("time_slot_rules", []):
+        start_h = rule.get("startHour", 0)
+        end_h = rule.get("endHour", 24)
+        rule_modes = rule.get("modes", [])
+        if start_h <= hour < end_h and rule_modes:
+            available = [m for m in rule_modes if m in modes]
+            if available:
+                return available
+    return []
+
+
+async def _predict_next_persona(config: dict) -> Optional[str]:
+    """Persona of the device's next wake-up, when the strategy makes it knowable."""
+    strategy = config.get("refresh_strategy", "random")
+    if strategy == "cycle":
+        return await _choose_persona_from_config(config, peek_next=True)
+    if strategy == "time_slot":
+        modes = config.get("modes") or DEFAULT_MODES
+        wake = datetime.now() + timedelta(minutes=config.get("refresh_interval", DEFAULT_REFRESH_INTERVAL))
+        candidates = _time_slot_modes(config, modes, wake.hour) or modes
+        if len(candidates) == 1:
+            return candidates[0]
+    return None
+
+
+async def _schedule_prerender(
+    mac: str, config: dict, v: float, screen_w: int, screen_h: int,
+) -> None:
+    """Render the device's next persona ahead of its next wake-up."""
+    try:
+        persona = await _predict_next_persona(config)
+    except Exception:
+        logger.warning(f"[PRERENDER] Failed to predict next persona for {mac}", exc_info=True)
+        return
+    if persona and persona.upper() in get_cacheable_modes():
+        if content_cache.prerender(mac, persona.upper(), config, v, screen_w, screen_h):
+            logger.info(f"[PRERENDER] {mac}:{persona.upper()} scheduled for next wake-up")
+
+
 async def _resolve_mode(
     mac: Optional[str], config: Optional[dict], persona_override: Optional[str],
     force_next: bool = False,
@@ -302,11 +398,18 @@ async def _build_image(
     cache_hit = False
     if mac and config:
         await content_cache.check_and_regenerate_all(mac, config, v, screen_w, screen_h)
-        cached_img = await content_cache.get(mac, persona, config, screen_w=screen_w, screen_h=screen_h)
-        if cached_img:
+        cached = await content_cache.get_frame(mac, persona, config, screen_w=screen_w, screen_h=screen_h)
+        if not cached and RENDER_STALE_GRACE_MINUTES > 0:
+            cached = content_cache.get_stale_frame(
+                mac, persona, config, RENDER_STALE_GRACE_MINUTES, screen_w, screen_h,
+            )
+            if cached:
+                logger.info(f"[CACHE STALE] {mac}:{persona} - Returning stale image, revalidating")
+                content_cache.revalidate(mac, persona, config, v, screen_w, screen_h)
+        if cached:
             logger.info(f"[CACHE HIT] {mac}:{persona} - Returning cached image")
             cache_hit = True
-            img = cached_img
+            frame = cached
         else:
             logger.info(f"[CACHE MISS] {mac}:{persona} - Generating fallback content")
 
@@ -314,17 +417,26 @@ async def _build_image(
     if not cache_hit:
         city = config.get("city", DEFAULT_CITY) if config else None
         date_ctx, weather = await asyncio.gather(
-            get_date_context(),
-            get_weather(city=city),
+            context_service.date_context(),
+            context_service.weather(city=city),
         )
-        img, content_data = await generate_and_render(
-            persona, config, date_ctx, weather, battery_pct,
-            screen_w=screen_w, screen_h=screen_h,
-            mac=mac or "",
+        version = config_version(config)
+        if not mac:
+            # Anonymous previews share no device, so the battery indicator must match too
+            version = (version, battery_pct)
+        frame, content_data = await render_scheduler.run(
+            lambda: generate_and_render(
+                persona, config, date_ctx, weather, battery_pct,
+                screen_w=screen_w, screen_h=screen_h,
+                mac=mac or "",
+            ),
+            key=render_job_key(mac, persona, screen_w, screen_h, version),
+            priority=Priority.INTERACTIVE,
+            provider=(config or {}).get("llm_provider", DEFAULT_LLM_PROVIDER),
         )
 
         if mac and config:
-            await content_cache.set(mac, persona, img, screen_w, screen_h)
+            frame = await content_cache.set(mac, persona, frame, screen_w, screen_h)
 
     if mac:
         await update_device_state(
@@ -333,6 +445,11 @@ async def _build_image(
             last_refresh_at=datetime.now().isoformat(),
         )
 
+    if mac and config:
+        content_cache.record_served(mac, persona, cache_hit)
+        if RENDER_PRERENDER and not persona_override:
+            await _schedule_prerender(mac, config, v, screen_w, screen_h)
+
     # Save content history
     if mac and content_data:
         try:
@@ -340,7 +457,7 @@ async def _build_image(
         except Exception:
             logger.warning(f"[CONTENT] Failed to save content for {mac}:{persona}", exc_info=True)
 
-    return img, persona, cache_hit
+    return frame, persona, cache_hit
 
 
 # ── Stats helper ─────────────────────────────────────────────
@@ -350,10 +467,9 @@ async def _log_render(
     mac: str, persona: str, cache_hit: bool, elapsed_ms: int,
     voltage: float = 3.3, rssi: Optional[int] = None, status: str = "success",
 ):
-    """Log render stats and device heartbeat (fire-and-forget)."""
+    """Queue render stats and device heartbeat for the next batched write."""
     try:
-        await log_render(mac, persona, cache_hit, elapsed_ms, status)
-        await log_heartbeat(mac, voltage, rssi)
+        await telemetry.record_render(mac, persona, cache_hit, elapsed_ms, status, voltage, rssi)
     except Exception:
         logger.warning(f"[STATS] Failed to log render stats for {mac}", exc_info=True)
 
@@ -408,8 +524,7 @@ async def _load_firmware_releases(force_refresh: bool = False) -> dict:
             headers["Authorization"] = f"Bearer {github_token}"
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(GITHUB_RELEASES_API, headers=headers)
+            resp = await get_http_client().get(GITHUB_RELEASES_API, headers=headers, timeout=10.0)
             if resp.status_code >= 400:
                 message = f"GitHub releases API error: {resp.status_code}"
                 try:
@@ -472,17 +587,17 @@ async def _validate_firmware_url(url: str) -> dict:
     if not parsed.path.lower().endswith(".bin"):
         raise ValueError("firmware URL should point to a .bin file")
 
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-        try:
-            resp = await client.head(url)
-            status_code = resp.status_code
-            headers = resp.headers
-            final_url = str(resp.url)
-        except Exception:
-            resp = await client.get(url, headers={"Range": "bytes=0-0"})
-            status_code = resp.status_code
-            headers = resp.headers
-            final_url = str(resp.url)
+    client = get_http_client()
+    try:
+        resp = await client.head(url, timeout=10.0, follow_redirects=True)
+        status_code = resp.status_code
+        headers = resp.headers
+        final_url = str(resp.url)
+    except Exception:
+        resp = await client.get(url, headers={"Range": "bytes=0-0"}, timeout=10.0, follow_redirects=True)
+        status_code = resp.status_code
+        headers = resp.headers
+        final_url = str(resp.url)
 
     if status_code >= 400:
         raise RuntimeError(f"firmware URL is not reachable: {status_code}")
@@ -500,6 +615,14 @@ async def _validate_firmware_url(url: str) -> dict:
 # ── Render endpoints ─────────────────────────────────────────
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
 @app.get("/api/render")
 @limiter.limit("10/minute")
 async def render(
@@ -511,7 +634,13 @@ async def render(
     w: int = Query(default=SCREEN_WIDTH, ge=100, le=1600, description="Screen width in pixels"),
     h: int = Query(default=SCREEN_HEIGHT, ge=100, le=1200, description="Screen height in pixels"),
     next_mode: Optional[int] = Query(default=None, alias="next", description="1 = advance to next mode (double-click)"),
+    fmt: str = Query(
+        default="bmp", pattern="^(bmp|raw1|raw1rle|delta1)$",
+        description="bmp, raw1 (header + top-down 1-bpp rows), raw1rle (PackBits rows) "
+                    "or delta1 (changed rects against the If-None-Match frame)",
+    ),
     x_device_token: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
 ):
     if mac:
         mac = validate_mac_param(mac)
@@ -521,26 +650,39 @@ async def render(
     logger.debug(f"[RENDER] Request started: mac={mac}, v={v}, persona={persona}, next={force_next}, size={w}x{h}")
 
     try:
-        img, resolved_persona, cache_hit = await _build_image(
+        frame, resolved_persona, cache_hit = await _build_image(
             v, mac, persona, rssi, screen_w=w, screen_h=h, force_next=force_next,
         )
-        bmp_bytes = image_to_bmp_bytes(img)
+        headers = {"ETag": frame.etag, "X-InkSight-Hash": frame.content_hash}
+        not_modified = _etag_matches(if_none_match, frame.etag)
+        if not_modified:
+            # The device already shows this frame: no body, no panel refresh
+            body = b""
+        elif fmt == "delta1":
+            base = frame_history.get(mac) if mac else None
+            if base is not None and not _etag_matches(if_none_match, base.etag):
+                base = None
+            body, is_delta = frame_history.encode(frame, base)
+            if is_delta:
+                headers["X-InkSight-Base"] = base.content_hash
+        else:
+            body = frame.encode(fmt)
         elapsed = time.time() - start_time
         elapsed_ms = int(elapsed * 1000)
         logger.info(
-            f"[RENDER] ✓ Success in {elapsed:.2f}s - Generated BMP: {len(bmp_bytes)} bytes for {mac}:{resolved_persona} ({w}x{h})"
+            f"[RENDER] ✓ Success in {elapsed:.2f}s - Generated {fmt}: {len(body)} bytes for {mac}:{resolved_persona} ({w}x{h})"
         )
 
         if mac:
+            frame_history.remember(mac, frame)
             await _log_render(mac, resolved_persona, cache_hit, elapsed_ms, v, rssi)
-
-        headers = {}
-        if mac:
             was_pending = await consume_pending_refresh(mac)
             if was_pending:
                 headers["X-Pending-Refresh"] = "1"
 
-        return Response(content=bmp_bytes, media_type="image/bmp", headers=headers)
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=RENDER_MEDIA_TYPES[fmt], headers=headers)
     except Exception as e:
         elapsed = time.time() - start_time
         logger.error(f"[RENDER] ✗ Failed in {elapsed:.2f}s - Error: {e}")
@@ -581,16 +723,23 @@ async def get_widget(
     persona = mode.upper() if mode else config.get("modes", ["STOIC"])[0] if config.get("modes") else "STOIC"
     city = config.get("city") if config else None
 
-    date_ctx = await get_date_context()
-    weather = await get_weather(city=city)
+    date_ctx, weather = await asyncio.gather(
+        context_service.date_context(),
+        context_service.weather(city=city),
+    )
 
-    img, _ = await generate_and_render(
-        persona, config, date_ctx, weather, 100.0,
-        screen_w=w, screen_h=h,
+    frame, _ = await render_scheduler.run(
+        lambda: generate_and_render(
+            persona, config, date_ctx, weather, 100.0,
+            screen_w=w, screen_h=h,
+        ),
+        key=render_job_key(mac, persona, w, h, config_version(config), kind="widget"),
+        priority=Priority.INTERACTIVE,
+        provider=config.get("llm_provider", DEFAULT_LLM_PROVIDER),
     )
 
     buf = io.BytesIO()
-    img.save(buf, format="PNG")
+    frame.to_image().save(buf, format="PNG")
     buf.seek(0)
 
     return StreamingResponse(
@@ -616,10 +765,10 @@ async def preview(
     if mac:
         mac = validate_mac_param(mac)
     try:
-        img, resolved_persona, cache_hit = await _build_image(
+        frame, resolved_persona, cache_hit = await _build_image(
             v, mac, persona, screen_w=w, screen_h=h,
         )
-        png_bytes = image_to_png_bytes(img)
+        png_bytes = image_to_png_bytes(frame.to_image())
         logger.info(f"[PREVIEW] Generated PNG: {len(png_bytes)} bytes, persona={resolved_persona} ({w}x{h})")
         return Response(content=png_bytes, media_type="image/png")
     except Exception:
@@ -709,8 +858,10 @@ async def custom_mode_preview(body: dict, admin_auth: None = Depends(require_adm
     from core.json_content import generate_json_mode_content
     from core.json_renderer import render_json_mode
 
-    date_ctx = await get_date_context()
-    weather = await get_weather()
+    date_ctx, weather = await asyncio.gather(
+        context_service.date_context(),
+        context_service.weather(),
+    )
     content = await generate_json_mode_content(
         mode_def,
         date_ctx=date_ctx,
@@ -1099,6 +1250,29 @@ async def stats_overview(admin_auth: None = Depends(require_admin)):
     return await get_stats_overview()
 
 
+@app.get("/api/stats/runtime")
+async def stats_runtime(admin_auth: None = Depends(require_admin)):
+    """In-process cache and render-engine counters."""
+    from core.patterns.font_cache import font_cache
+    from core.patterns.icon_cache import icon_cache
+    from core.patterns.text_layout import glyph_cache_info
+
+    return {
+        "font_cache": font_cache.stats(),
+        "glyph_cache": glyph_cache_info(),
+        "icon_cache": icon_cache.stats(),
+        "render_cache": content_cache.stats(),
+        "render_scheduler": render_scheduler.stats(),
+        "render_pool": render_pool.stats(),
+        "event_loop": loop_lag.stats(),
+        "llm_pool": llm_pool.stats(),
+        "context": context_service.stats(),
+        "frame_history": frame_history.stats(),
+        "frame_encodings": frame_encodings.stats(),
+        "telemetry": telemetry.stats(),
+    }
+
+
 @app.get("/api/stats/{mac}")
 async def stats_device(mac: str, x_device_token: Optional[str] = Header(default=None)):
     """Device-specific statistics."""
@@ -2,9 +2,12 @@ from __future__ import annotations
 
 import asyncio
 import copy
-import io
 import logging
 import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -14,6 +17,8 @@ from PIL import Image
 logger = logging.getLogger(__name__)
 
 from .db import get_cache_db
+from .framebuffer import Frame, is_legacy_payload
+from .metrics import percentile
 
 _CACHE_DB_PATH = os.path.join(os.path.dirname(__file__), "..", "cache.db")
 
@@ -35,18 +40,161 @@ from .config import (
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
     DEFAULT_CITY,
+    DEFAULT_LLM_PROVIDER,
     DEFAULT_MODES,
+    MAX_DEVICE_MODES,
+    MAX_REFRESH_INTERVAL,
+    RENDER_CACHE_DB_MAX_AGE_HOURS,
+    RENDER_CACHE_MAX_AGE_MINUTES,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_CACHE_MAX_ENTRIES,
+    RENDER_STALE_GRACE_MINUTES,
     get_cacheable_modes,
 )
-from .context import get_date_context, get_weather, calc_battery_pct
+from .context import context_service, calc_battery_pct
 from .pipeline import generate_and_render
+from .render_pool import render_pool
+from .scheduler import Priority, config_version, render_job_key, render_scheduler
+
+
+CacheEntry = tuple[Frame, datetime]
+
+
+class _MemoryTier:
+    """In-process tier: cache key -> (Frame, stored_at), an LRU bounded by
+    entry count and total BMP bytes.
+
+    Lookups through :meth:`get` refresh recency; a store that exceeds either
+    bound evicts least recently used entries. Supports the dict operations
+    ContentCache (and tests) use.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int = RENDER_CACHE_MAX_ENTRIES) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.resident_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> CacheEntry:
+        return self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: CacheEntry | None = None) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry
+
+    def __setitem__(self, key: str, entry: CacheEntry) -> None:
+        self._discard(key)
+        self._entries[key] = entry
+        self.resident_bytes += len(entry[0].bmp)
+        while len(self._entries) > 1 and (
+            self.resident_bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def expire(self, max_age: timedelta) -> int:
+        """Drop entries stored more than ``max_age`` ago. Returns the count."""
+        cutoff = datetime.now() - max_age
+        stale = [key for key, (_, stored_at) in self._entries.items() if stored_at < cutoff]
+        for key in stale:
+            self._discard(key)
+        self.expirations += len(stale)
+        return len(stale)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._entries:
+            raise KeyError(key)
+        self._discard(key)
+
+    def pop(self, key: str, default: CacheEntry | None = None) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._discard(key)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.resident_bytes = 0
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= len(entry[0].bmp)
+
+
+@dataclass(frozen=True)
+class RegenerationPlan:
+    """Per-mode freshness for one device and what a pass should regenerate.
+
+    ``missing`` modes are absent or past their TTL; ``expiring`` modes are
+    still valid but will expire before the device's next refresh. ``due``
+    is every missing mode plus the first ``_EARLY_REGEN_PER_PASS`` expiring
+    ones, soonest first, so entries rendered together drift apart instead
+    of all expiring in the same poll.
+    """
+    fresh: tuple[str, ...]
+    expiring: tuple[str, ...]
+    missing: tuple[str, ...]
+    due: tuple[str, ...]
+
+
+# Writers to the same key serialize on one of these; readers never lock.
+_LOCK_SHARDS = 64
+# Still-valid modes regenerated ahead of expiry per planning pass
+_EARLY_REGEN_PER_PASS = 1
+# Recent lookup latencies kept for percentile stats
+_LATENCY_SAMPLES = 2048
 
 
 class ContentCache:
-    def __init__(self):
-        self._cache: dict[str, tuple[Image.Image, datetime]] = {}
-        self._lock = asyncio.Lock()
-        self._regenerating: set[str] = set()
+    def __init__(
+        self,
+        max_bytes: int = RENDER_CACHE_MAX_BYTES,
+        max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+    ):
+        self._cache = _MemoryTier(max_bytes, max_entries)
+        self._locks = [asyncio.Lock() for _ in range(_LOCK_SHARDS)]
+        self._inflight: dict[str, asyncio.Future] = {}
+        # mac -> cache keys its background regeneration pass is rendering
+        self._regenerating: dict[str, set[str]] = {}
+        self._lock_waits = 0
+        self._lock_wait_ns = 0
+        self._lock_wait_max_ns = 0
+        self._db_reads = 0
+        self._coalesced_reads = 0
+        self._lookup_us: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._background: set[asyncio.Task] = set()
+        self._revalidating: set[str] = set()
+        self._stale_served = 0
+        self._revalidations = 0
+        self._planned_regens = 0
+        # mac -> (predicted persona, when predicted); swept with the memory tier
+        self._predicted: OrderedDict[str, tuple[str, datetime]] = OrderedDict()
+        self._predictions = 0
+        self._prerenders = 0
+        self._prediction_hits = 0
+        self._next_warm = 0
+        self._next_cold = 0
+        self._skipped_regens = 0
+        self._sweeps = 0
+        self._db_expired = 0
+        self._last_sweep_at: str | None = None
+        self._memory_hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._hit_ns = 0
 
     def _get_cache_key(
         self, mac: str, persona: str,
@@ -67,111 +215,396 @@ class ContentCache:
         ttl_minutes = int(refresh_interval * mode_count * 1.1)
         return ttl_minutes
 
+    def _max_age_minutes(self) -> int:
+        """Longest TTL any device config can give an entry, plus the stale grace.
+
+        The sweeper never drops entries younger than this, so it cannot
+        remove a frame a device would still be served.
+        """
+        mode_count = min(MAX_DEVICE_MODES, len(get_cacheable_modes()))
+        return int(MAX_REFRESH_INTERVAL * max(1, mode_count) * 1.1) + max(0, RENDER_STALE_GRACE_MINUTES)
+
     async def get(
         self, mac: str, persona: str, config: dict,
         ttl_minutes: int | None = None,
         screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
     ) -> Optional[Image.Image]:
         """Get cached image if available and not expired"""
-        async with self._lock:
-            key = self._get_cache_key(mac, persona, screen_w, screen_h)
-            if key in self._cache:
-                img, timestamp = self._cache[key]
-                if ttl_minutes is None:
-                    ttl_minutes = self._get_ttl_minutes(config)
-                if datetime.now() - timestamp < timedelta(minutes=ttl_minutes):
-                    return img.copy()
-                else:
-                    logger.debug(f"[CACHE] {key} expired (TTL={ttl_minutes}min)")
-                    del self._cache[key]
+        frame = await self.get_frame(mac, persona, config, ttl_minutes, screen_w, screen_h)
+        return frame.to_image() if frame else None
+
+    async def get_frame(
+        self, mac: str, persona: str, config: dict,
+        ttl_minutes: int | None = None,
+        screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
+    ) -> Optional[Frame]:
+        """Get the cached frame (ready-to-send BMP bytes) if available and not expired.
+
+        Frames are immutable, so hits hand out the stored object without copying.
+        The in-memory lookup takes no lock; concurrent misses on the same key
+        share a single SQLite read.
+        """
+        start = time.perf_counter_ns()
+        key = self._get_cache_key(mac, persona, screen_w, screen_h)
+        entry = self._cache.get(key)
+        from_memory = entry is not None
+        if entry is None:
             # Try SQLite persistent cache
-            try:
-                img = await self._get_from_db(key, ttl_minutes=ttl_minutes)
-                if img:
-                    self._cache[key] = (img, datetime.now())
-                    return img.copy()
-            except Exception:
-                pass
+            entry = await self._read_through(key)
+
+        if entry is not None:
+            frame, timestamp = entry
+            if ttl_minutes is None:
+                ttl_minutes = self._get_ttl_minutes(config)
+            if datetime.now() - timestamp < timedelta(minutes=ttl_minutes):
+                elapsed = time.perf_counter_ns() - start
+                if from_memory:
+                    self._memory_hits += 1
+                    self._hit_ns += elapsed
+                else:
+                    self._db_hits += 1
+                self._lookup_us.append(elapsed / 1000)
+                return frame
+            # Expired entries stay resident for stale serving until swept
+            logger.debug(f"[CACHE] {key} expired (TTL={ttl_minutes}min)")
+
+        self._misses += 1
+        self._lookup_us.append((time.perf_counter_ns() - start) / 1000)
+        return None
+
+    def get_stale_frame(
+        self, mac: str, persona: str, config: dict,
+        grace_minutes: int,
+        screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
+    ) -> Optional[Frame]:
+        """Resident frame that expired less than ``grace_minutes`` ago, if any.
+
+        Call after :meth:`get_frame` missed; that call has already pulled any
+        persisted copy into memory.
+        """
+        key = self._get_cache_key(mac, persona, screen_w, screen_h)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        frame, timestamp = entry
+        max_age = timedelta(minutes=self._get_ttl_minutes(config) + grace_minutes)
+        if datetime.now() - timestamp >= max_age:
             return None
+        self._stale_served += 1
+        return frame
+
+    def revalidate(
+        self, mac: str, persona: str, config: dict, v: float = 3.3,
+        screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
+    ) -> bool:
+        """Regenerate one entry in the background. Returns False if one is already underway."""
+        if not self._start_regeneration(mac, persona, config, v, screen_w, screen_h, Priority.PREFETCH):
+            return False
+        self._revalidations += 1
+        return True
+
+    def prerender(
+        self, mac: str, persona: str, config: dict, v: float = 3.3,
+        screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
+    ) -> bool:
+        """Make sure ``persona`` is fresh when the device next wakes up.
+
+        Records ``persona`` as the prediction that :meth:`record_served`
+        scores on the device's next request. Returns True if a render was
+        scheduled; an entry that outlives the next wake-up is left alone.
+        """
+        self._predicted.pop(mac, None)
+        self._predicted[mac] = (persona, datetime.now())
+        while len(self._predicted) > self._cache.max_entries:
+            self._predicted.popitem(last=False)
+        self._predictions += 1
+        key = self._get_cache_key(mac, persona, screen_w, screen_h)
+        entry = self._cache.get(key)
+        wake = datetime.now() + timedelta(minutes=config.get("refresh_interval", 60))
+        if entry is not None and wake - entry[1] < timedelta(minutes=self._get_ttl_minutes(config)):
+            return False
+        if not self._start_regeneration(mac, persona, config, v, screen_w, screen_h, Priority.PREFETCH):
+            return False
+        self._prerenders += 1
+        return True
+
+    def record_served(self, mac: str, persona: str, warm: bool) -> None:
+        """Score the prediction made after the device's previous render."""
+        predicted = self._predicted.pop(mac, None)
+        if predicted is None:
+            return
+        if persona == predicted[0]:
+            self._prediction_hits += 1
+        if warm:
+            self._next_warm += 1
+        else:
+            self._next_cold += 1
+
+    def _start_regeneration(
+        self, mac: str, persona: str, config: dict, v: float,
+        screen_w: int, screen_h: int, priority: Priority,
+    ) -> bool:
+        key = self._get_cache_key(mac, persona, screen_w, screen_h)
+        if key in self._regenerating.get(mac, ()) or key in self._revalidating:
+            return False
+        self._revalidating.add(key)
+        self._spawn(self._revalidate(key, mac, persona, config, v, screen_w, screen_h, priority))
+        return True
+
+    async def _revalidate(
+        self, key: str, mac: str, persona: str, config: dict, v: float,
+        screen_w: int, screen_h: int, priority: Priority = Priority.PREFETCH,
+    ) -> None:
+        try:
+            city = config.get("city", DEFAULT_CITY)
+            date_ctx, weather = await asyncio.gather(
+                context_service.date_context(),
+                context_service.weather(city=city),
+            )
+            await self._generate_single_mode(
+                mac, persona, calc_battery_pct(v), copy.deepcopy(config), date_ctx, weather,
+                screen_w, screen_h, priority=priority,
+            )
+        except Exception as e:
+            logger.error(f"[CACHE] Revalidation failed for {key}: {e}")
+        finally:
+            self._revalidating.discard(key)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a background task and keep a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    async def _read_through(self, key: str) -> Optional[CacheEntry]:
+        """Load ``key`` from cache.db into memory, coalescing concurrent callers.
+
+        The entry keeps its persisted ``created_at`` so age checks stay honest.
+        """
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._coalesced_reads += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            self._db_reads += 1
+            entry = await self._get_from_db(key)
+            if entry:
+                self._cache[key] = entry
+        except Exception:
+            entry = None
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(entry)
+        return entry
+
+    @asynccontextmanager
+    async def _key_lock(self, key: str):
+        """Per-shard write lock, recording how long callers had to wait."""
+        lock = self._locks[hash(key) % len(self._locks)]
+        if lock.locked():
+            start = time.perf_counter_ns()
+            await lock.acquire()
+            waited = time.perf_counter_ns() - start
+            self._lock_waits += 1
+            self._lock_wait_ns += waited
+            self._lock_wait_max_ns = max(self._lock_wait_max_ns, waited)
+        else:
+            await lock.acquire()
+        try:
+            yield
+        finally:
+            lock.release()
 
     async def set(
-        self, mac: str, persona: str, img: Image.Image,
+        self, mac: str, persona: str, frame: Frame | Image.Image,
         screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
-    ):
-        """Store image in cache"""
-        async with self._lock:
-            key = self._get_cache_key(mac, persona, screen_w, screen_h)
-            img_copy = img.copy()
-            self._cache[key] = (img_copy, datetime.now())
+    ) -> Frame:
+        """Store a frame in cache; an image is packed first. Returns the stored frame."""
+        if not isinstance(frame, Frame):
+            frame = render_pool.pack(frame)
+        key = self._get_cache_key(mac, persona, screen_w, screen_h)
+        self._cache[key] = (frame, datetime.now())
+        # Serialize persistence per key so an older write never lands last
+        async with self._key_lock(key):
             try:
-                await self._save_to_db(key, img_copy)
+                await self._save_to_db(key, frame)
             except Exception:
                 pass
+        return frame
+
+    def stats(self) -> dict:
+        """Memory-tier usage and hit counters.
+
+        ``avg_encode_us`` is the measured cost of packing a rendered image
+        into BMP bytes, timed by the render pool where renders are packed;
+        every hit skips it, which ``saved_ms`` totals.
+        """
+        hits = self._memory_hits + self._db_hits
+        lookups = hits + self._misses
+        avg_encode_us = render_pool.avg_encode_us
+        samples = sorted(self._lookup_us)
+        scored = self._next_warm + self._next_cold
+        return {
+            "entries": len(self._cache),
+            "max_entries": self._cache.max_entries,
+            "resident_bytes": self._cache.resident_bytes,
+            "max_bytes": self._cache.max_bytes,
+            "evictions": self._cache.evictions,
+            "expirations": self._cache.expirations,
+            "db_expired": self._db_expired,
+            "sweeps": self._sweeps,
+            "last_sweep_at": self._last_sweep_at,
+            "memory_hits": self._memory_hits,
+            "db_hits": self._db_hits,
+            "misses": self._misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_us": round(self._hit_ns / self._memory_hits / 1000, 1) if self._memory_hits else 0.0,
+            "avg_encode_us": round(avg_encode_us, 1),
+            "saved_ms": round(hits * avg_encode_us / 1000, 1),
+            "stale_served": self._stale_served,
+            "revalidations": self._revalidations,
+            "revalidating": len(self._revalidating),
+            "regen_planned": self._planned_regens,
+            "regen_skipped": self._skipped_regens,
+            "prerender_predictions": self._predictions,
+            "prerender_scheduled": self._prerenders,
+            "prerender_prediction_hits": self._prediction_hits,
+            "next_request_warm": self._next_warm,
+            "next_request_cold": self._next_cold,
+            "next_request_warm_rate": round(self._next_warm / scored, 4) if scored else 0.0,
+            "lookup_p50_us": percentile(samples, 0.50),
+            "lookup_p99_us": percentile(samples, 0.99),
+            "db_reads": self._db_reads,
+            "coalesced_reads": self._coalesced_reads,
+            "inflight_reads": len(self._inflight),
+            "lock_shards": len(self._locks),
+            "lock_waits": self._lock_waits,
+            "lock_wait_ms": round(self._lock_wait_ns / 1e6, 3),
+            "lock_wait_max_ms": round(self._lock_wait_max_ns / 1e6, 3),
+        }
+
+    async def plan_regeneration(
+        self, mac: str, config: dict,
+        screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
+    ) -> RegenerationPlan:
+        """Classify the device's cacheable modes with one batched freshness lookup."""
+        cacheable = get_cacheable_modes()
+        modes = [m.upper() for m in config.get("modes", DEFAULT_MODES) if m.upper() in cacheable]
+        ttl = timedelta(minutes=self._get_ttl_minutes(config))
+        lead = timedelta(minutes=config.get("refresh_interval", 60))
+        stored = await self._stored_at(mac, modes, screen_w, screen_h)
+
+        now = datetime.now()
+        fresh, expiring, missing = [], [], []
+        remaining: dict[str, timedelta] = {}
+        for persona in modes:
+            stored_at = stored.get(persona)
+            if stored_at is None or now - stored_at >= ttl:
+                missing.append(persona)
+                continue
+            remaining[persona] = ttl - (now - stored_at)
+            (expiring if remaining[persona] < lead else fresh).append(persona)
+
+        early = sorted(expiring, key=remaining.__getitem__)[:_EARLY_REGEN_PER_PASS]
+        due = [
+            persona for persona in missing + early
+            if self._get_cache_key(mac, persona, screen_w, screen_h) not in self._revalidating
+        ]
+        return RegenerationPlan(tuple(fresh), tuple(expiring), tuple(missing), tuple(due))
+
+    async def _stored_at(
+        self, mac: str, modes: list[str], screen_w: int, screen_h: int,
+    ) -> dict[str, datetime]:
+        """When each mode's entry was stored; modes with no entry are left out.
+
+        Resident entries answer from memory. The rest are read from cache.db
+        in a single query and kept in memory for the requests that follow.
+        """
+        stored: dict[str, datetime] = {}
+        absent: dict[str, str] = {}
+        for persona in modes:
+            key = self._get_cache_key(mac, persona, screen_w, screen_h)
+            entry = self._cache.get(key)
+            if entry is not None:
+                stored[persona] = entry[1]
+            else:
+                absent[key] = persona
+        if not absent:
+            return stored
+
+        try:
+            self._db_reads += 1
+            rows = await self._get_many_from_db(list(absent))
+        except Exception:
+            logger.debug(f"[CACHE] Batched lookup failed for {mac}", exc_info=True)
+            return stored
+        for key, entry in rows.items():
+            # A render stored while the query ran is newer than the row
+            if key not in self._cache:
+                self._cache[key] = entry
+            stored[absent[key]] = self._cache[key][1]
+        return stored
 
     async def check_and_regenerate_all(
         self, mac: str, config: dict, v: float = 3.3,
         screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
     ) -> bool:
-        """Check if all modes are cached, if not, regenerate all modes"""
-        cacheable = get_cacheable_modes()
-        modes = [m.upper() for m in config.get("modes", DEFAULT_MODES) if m.upper() in cacheable]
+        """Regenerate the device's missing or expiring modes in the background.
 
-        if not modes:
+        Returns True when every cacheable mode has a valid entry.
+        """
+        plan = await self.plan_regeneration(mac, config, screen_w, screen_h)
+        checked = len(plan.fresh) + len(plan.expiring) + len(plan.missing)
+        if not checked:
             return False
-
-        ttl_minutes = self._get_ttl_minutes(config)
-        refresh_interval = config.get("refresh_interval", 60)
-        mode_count = len(modes)
+        self._skipped_regens += checked - len(plan.due)
         logger.debug(
-            f"[CACHE] TTL: {refresh_interval}min × {mode_count} modes × 1.1 = {ttl_minutes}min"
+            f"[CACHE] {mac}: {len(plan.fresh)} fresh, {len(plan.expiring)} expiring, "
+            f"{len(plan.missing)} missing"
         )
 
-        needs_regeneration = False
-        for persona in modes:
-            cached = await self.get(mac, persona, config, ttl_minutes, screen_w, screen_h)
-            if not cached:
-                needs_regeneration = True
-                logger.debug(f"[CACHE] {mac}:{persona} missing or expired")
-                break
-
-        if not needs_regeneration:
-            logger.debug(f"[CACHE] All {len(modes)} modes cached for {mac}")
-            return True
+        if not plan.due:
+            return not plan.missing
 
         if mac not in self._regenerating:
-            self._regenerating.add(mac)
-            logger.info(f"[CACHE] Spawning background regeneration of all {len(modes)} modes for {mac}...")
-            asyncio.create_task(
-                self._regenerate_background(mac, config, modes, v, screen_w, screen_h)
-            )
+            self._regenerating[mac] = {self._get_cache_key(mac, p, screen_w, screen_h) for p in plan.due}
+            self._planned_regens += len(plan.due)
+            logger.info(f"[CACHE] Spawning background regeneration of {', '.join(plan.due)} for {mac}...")
+            self._spawn(self._regenerate_background(mac, config, list(plan.due), v, screen_w, screen_h))
         else:
             logger.debug(f"[CACHE] Background regeneration already in progress for {mac}")
 
-        return False
+        return not plan.missing
 
     async def _regenerate_background(
         self, mac: str, config: dict, modes: list[str], v: float,
         screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
     ):
-        """Background task that wraps _generate_all_modes with cleanup of _regenerating."""
+        """Background task that wraps _generate_modes with cleanup of _regenerating."""
         try:
-            await self._generate_all_modes(mac, config, modes, v, screen_w, screen_h)
+            await self._generate_modes(mac, config, modes, v, screen_w, screen_h)
         except Exception as e:
             logger.error(f"[CACHE] Background regeneration failed for {mac}: {e}")
         finally:
-            self._regenerating.discard(mac)
+            self._regenerating.pop(mac, None)
 
-    async def _generate_all_modes(
+    async def _generate_modes(
         self, mac: str, config: dict, modes: list[str], v: float,
         screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT,
     ):
-        """Generate and cache all modes"""
+        """Generate and cache the given modes"""
         battery_pct = calc_battery_pct(v)
         city = config.get("city", DEFAULT_CITY)
 
         date_ctx, weather = await asyncio.gather(
-            get_date_context(),
-            get_weather(city=city),
+            context_service.date_context(),
+            context_service.weather(city=city),
         )
 
         tasks = [
@@ -196,17 +629,23 @@ class ContentCache:
         weather: dict,
         screen_w: int = SCREEN_WIDTH,
         screen_h: int = SCREEN_HEIGHT,
+        priority: Priority = Priority.BACKGROUND,
     ) -> bool:
         """Generate and cache a single mode via the unified pipeline."""
         try:
             logger.info(f"[CACHE] Generating {mac}:{persona}...")
 
-            img, _content = await generate_and_render(
-                persona, config, date_ctx, weather, battery_pct,
-                screen_w=screen_w, screen_h=screen_h,
+            frame, _content = await render_scheduler.run(
+                lambda: generate_and_render(
+                    persona, config, date_ctx, weather, battery_pct,
+                    screen_w=screen_w, screen_h=screen_h,
+                ),
+                key=render_job_key(mac, persona, screen_w, screen_h, config_version(config)),
+                priority=priority,
+                provider=config.get("llm_provider", DEFAULT_LLM_PROVIDER),
             )
 
-            await self.set(mac, persona, img, screen_w, screen_h)
+            await self.set(mac, persona, frame, screen_w, screen_h)
             logger.info(f"[CACHE] ✓ {mac}:{persona}")
             return True
 
@@ -214,7 +653,8 @@ class ContentCache:
             logger.error(f"[CACHE] ✗ {mac}:{persona} failed: {e}")
             return False
 
-    async def _get_from_db(self, key: str, ttl_minutes: int | None = None) -> Image.Image | None:
+    async def _get_from_db(self, key: str, ttl_minutes: int | None = None) -> CacheEntry | None:
+        """Persisted (frame, created_at) for ``key``; None if absent, unreadable or older than the TTL."""
         db = await get_cache_db()
         cursor = await db.execute(
             "SELECT image_data, created_at FROM image_cache WHERE cache_key = ?",
@@ -223,22 +663,49 @@ class ContentCache:
         row = await cursor.fetchone()
         if not row:
             return None
+        return await self._decode_row(db, key, row[0], row[1], ttl_minutes)
+
+    async def _get_many_from_db(self, keys: list[str]) -> dict[str, CacheEntry]:
+        """Persisted entries for ``keys`` in one query; unreadable rows are left out."""
+        db = await get_cache_db()
+        placeholders = ",".join("?" * len(keys))
+        cursor = await db.execute(
+            f"SELECT cache_key, image_data, created_at FROM image_cache WHERE cache_key IN ({placeholders})",
+            keys,
+        )
+        entries = {}
+        for key, data, created_at in await cursor.fetchall():
+            entry = await self._decode_row(db, key, data, created_at)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    async def _decode_row(
+        self, db, key: str, data: bytes, created_at: str, ttl_minutes: int | None = None,
+    ) -> CacheEntry | None:
         try:
-            if ttl_minutes is not None and row[1]:
-                created_at = datetime.fromisoformat(row[1])
-                if datetime.now() - created_at >= timedelta(minutes=ttl_minutes):
+            stored_at = datetime.fromisoformat(created_at)
+            if ttl_minutes is not None:
+                if datetime.now() - stored_at >= timedelta(minutes=ttl_minutes):
                     logger.debug(f"[CACHE] DB entry {key} expired (TTL={ttl_minutes}min)")
                     return None
-            img = Image.open(io.BytesIO(row[0]))
-            img.load()
-            return img
+            frame = Frame.from_payload(data)
         except Exception:
             return None
+        if is_legacy_payload(data):
+            # Rewrite PNG rows from older versions in the packed format, keeping their age
+            try:
+                await db.execute(
+                    "UPDATE image_cache SET image_data = ? WHERE cache_key = ?",
+                    (frame.to_payload(), key),
+                )
+                await db.commit()
+            except Exception:
+                logger.debug(f"[CACHE] Failed to migrate legacy entry {key}", exc_info=True)
+        return frame, stored_at
 
-    async def _save_to_db(self, key: str, img: Image.Image):
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        data = buf.getvalue()
+    async def _save_to_db(self, key: str, frame: Frame):
+        data = frame.to_payload()
         db = await get_cache_db()
         await db.execute(
             """INSERT INTO image_cache (cache_key, image_data, created_at)
@@ -248,15 +715,58 @@ class ContentCache:
         )
         await db.commit()
 
-    async def cleanup_expired(self, max_age_hours: int = 48):
-        """Remove cache entries older than max_age_hours."""
+    async def cleanup_expired(self, max_age_hours: int = 48) -> int:
+        """Remove cache entries older than max_age_hours. Returns rows deleted."""
         cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
         try:
             db = await get_cache_db()
-            await db.execute("DELETE FROM image_cache WHERE created_at < ?", (cutoff,))
+            cursor = await db.execute("DELETE FROM image_cache WHERE created_at < ?", (cutoff,))
             await db.commit()
+            return max(cursor.rowcount, 0)
         except Exception:
-            pass
+            return 0
+
+    async def sweep(
+        self,
+        memory_max_age_minutes: int | None = None,
+        db_max_age_hours: int | None = None,
+    ) -> tuple[int, int]:
+        """Expire old entries from both tiers. Returns (memory, db) counts removed.
+
+        Without explicit ages, both tiers keep entries for at least
+        :meth:`_max_age_minutes` (longer if configured).
+        """
+        longest = self._max_age_minutes()
+        if memory_max_age_minutes is None:
+            memory_max_age_minutes = max(RENDER_CACHE_MAX_AGE_MINUTES, longest)
+        if db_max_age_hours is None:
+            db_max_age_hours = max(RENDER_CACHE_DB_MAX_AGE_HOURS, -(-longest // 60))
+        expired = self._cache.expire(timedelta(minutes=memory_max_age_minutes))
+        self._expire_predictions(timedelta(minutes=memory_max_age_minutes))
+        deleted = await self.cleanup_expired(db_max_age_hours)
+        self._db_expired += deleted
+        self._sweeps += 1
+        self._last_sweep_at = datetime.now().isoformat()
+        if expired or deleted:
+            logger.info(f"[CACHE] Sweep expired {expired} in-memory and {deleted} cache.db entries")
+        return expired, deleted
+
+    def _expire_predictions(self, max_age: timedelta) -> int:
+        """Forget predictions for devices that have not rendered within ``max_age``."""
+        cutoff = datetime.now() - max_age
+        stale = [mac for mac, (_, predicted_at) in self._predicted.items() if predicted_at < cutoff]
+        for mac in stale:
+            del self._predicted[mac]
+        return len(stale)
+
+    async def run_sweeper(self, interval_seconds: float) -> None:
+        """Sweep both tiers every ``interval_seconds`` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.warning("[CACHE] Sweep failed", exc_info=True)
 
 
 # Global cache instance
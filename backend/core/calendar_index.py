@@ -0,0 +1,191 @@
+"""
+农历 / 节日日历索引
+按天预先计算若干年的农历日期、节日、工作日标记和下一个法定节假日，落盘为 JSON。
+日期上下文直接按日期查表，不再逐次换算农历或同步等待节假日接口；
+节假日接口返回的官方工作日 / 调休信息在后台回写索引并持久化。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from zhdate import ZhDate
+
+from .config import CALENDAR_INDEX_PATH, CALENDAR_INDEX_YEARS, LUNAR_FESTIVALS, SOLAR_FESTIVALS
+
+logger = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+# 可按日期推算的法定节假日；清明按节气确定，由节假日接口回写
+PUBLIC_HOLIDAYS = ("元旦", "春节", "劳动节", "端午节", "中秋节", "国庆节")
+
+# Days scanned past the indexed range so its last days still find a next holiday
+_LOOKAHEAD_DAYS = 400
+
+
+def _day_festivals(day: date) -> tuple[str, str, list[int] | None]:
+    """(festival shown for the day, public holiday falling on it, lunar [month, day])."""
+    solar = SOLAR_FESTIVALS.get((day.month, day.day), "")
+    try:
+        lunar = ZhDate.from_datetime(datetime(day.year, day.month, day.day))
+    except Exception:
+        return solar, solar if solar in PUBLIC_HOLIDAYS else "", None
+    lunar_festival = LUNAR_FESTIVALS.get((lunar.lunar_month, lunar.lunar_day), "")
+    public = next((f for f in (solar, lunar_festival) if f in PUBLIC_HOLIDAYS), "")
+    return solar or lunar_festival, public, [lunar.lunar_month, lunar.lunar_day]
+
+
+def build_days(start: date, end: date) -> dict[str, dict]:
+    """Offline records for every day in ``[start, end)``, keyed by ISO date.
+
+    Workday flags are estimated from weekends and public holidays until the
+    holiday API confirms them (see :meth:`CalendarIndex.confirm`).
+    """
+    span = (end - start).days
+    festivals = [_day_festivals(start + timedelta(days=i)) for i in range(span + _LOOKAHEAD_DAYS)]
+    days: dict[str, dict] = {}
+    upcoming: tuple[str, date] | None = None
+    for i in range(len(festivals) - 1, -1, -1):
+        day = start + timedelta(days=i)
+        festival, public, lunar = festivals[i]
+        if i < span:
+            is_workday = day.weekday() < 5 and not public
+            days[day.isoformat()] = {
+                "lunar": lunar,
+                "festival": festival,
+                "is_workday": is_workday,
+                "is_holiday": not is_workday,
+                "confirmed": False,
+                "upcoming": {
+                    "days_until": (upcoming[1] - day).days if upcoming else 0,
+                    "holiday_name": upcoming[0] if upcoming else "",
+                    "date": upcoming[1].strftime("%m月%d日") if upcoming else "",
+                    "holiday_duration": 0,
+                },
+            }
+        if public:
+            upcoming = (public, day)
+    return days
+
+
+def calendar_signature(start: date, end: date) -> str:
+    """Identifies the range and festival tables an index was built from."""
+    payload = json.dumps(
+        [
+            _INDEX_VERSION,
+            start.isoformat(),
+            end.isoformat(),
+            sorted(SOLAR_FESTIVALS.items()),
+            sorted(LUNAR_FESTIVALS.items()),
+            PUBLIC_HOLIDAYS,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CalendarIndex:
+    """Per-day calendar records covering ``years`` years from January 1st.
+
+    Loaded from ``path`` when the file matches the current range and festival
+    tables, otherwise built and written back. Lookups are dict reads; a date
+    outside the range rebuilds the index around that date's year.
+    """
+
+    def __init__(self, path: str | None = CALENDAR_INDEX_PATH, years: int = CALENDAR_INDEX_YEARS) -> None:
+        self.path = path
+        self.years = max(1, years)
+        self._days: dict[str, dict] = {}
+        self._signature = ""
+        self._start: date | None = None
+        self._end: date | None = None
+        self._source = ""
+        self._lock = threading.Lock()
+
+    def load_or_build(self, today: date | None = None) -> int:
+        """Make the index cover ``today``'s year onwards. Returns the number of days."""
+        today = today or date.today()
+        start = date(today.year, 1, 1)
+        end = date(today.year + self.years, 1, 1)
+        signature = calendar_signature(start, end)
+        days = self._load(signature)
+        source = "disk"
+        if days is None:
+            days = build_days(start, end)
+            source = "built"
+        with self._lock:
+            self._days = days
+            self._signature = signature
+            self._start, self._end = start, end
+            self._source = source
+        if source == "built":
+            self.save()
+        return len(days)
+
+    def get(self, day: date) -> dict:
+        record = self._days.get(day.isoformat())
+        if record is None:
+            self.load_or_build(day)
+            record = self._days[day.isoformat()]
+        return record
+
+    def confirm(self, day: date, holiday_info: dict, upcoming: dict) -> dict:
+        """Overlay the holiday API's workday flag and next holiday onto ``day``."""
+        record = dict(self.get(day))
+        record["is_workday"] = holiday_info["is_workday"]
+        record["is_holiday"] = holiday_info["is_holiday"]
+        record["confirmed"] = True
+        if holiday_info.get("holiday_name") and not record["festival"]:
+            record["festival"] = holiday_info["holiday_name"]
+        if upcoming.get("holiday_name"):
+            record["upcoming"] = dict(upcoming)
+        with self._lock:
+            self._days[day.isoformat()] = record
+        return record
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            payload = {
+                "version": _INDEX_VERSION,
+                "signature": self._signature,
+                "days": dict(self._days),
+            }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            logger.warning(f"[CALENDAR] Failed to write calendar index {self.path}", exc_info=True)
+
+    def _load(self, signature: str) -> dict[str, dict] | None:
+        if not self.path:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != _INDEX_VERSION or payload.get("signature") != signature:
+            return None
+        return payload.get("days") or None
+
+    def stats(self) -> dict:
+        return {
+            "days": len(self._days),
+            "start": self._start.isoformat() if self._start else None,
+            "end": self._end.isoformat() if self._end else None,
+            "confirmed": sum(1 for record in self._days.values() if record["confirmed"]),
+            "source": self._source,
+        }
+
+
+# Global calendar index instance
+calendar_index = CalendarIndex()
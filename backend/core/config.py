@@ -2,6 +2,7 @@
 InkSight 配置文件
 包含所有常量、映射表和配置项
 """
+import os
 
 # ==================== 屏幕配置 ====================
 SCREEN_WIDTH = 400   # Default; overridable per-request via w/h query params
@@ -246,6 +247,85 @@ ICON_SIZES = {
 }
 
 
+# ==================== 性能配置 ====================
+# 以下参数均可通过同名环境变量覆盖
+# 字体对象 LRU 容量（按 (路径, 字号) 计）
+FONT_CACHE_MAX_ENTRIES = int(os.getenv("FONT_CACHE_MAX_ENTRIES", "128"))
+# 启动时预加载内置 JSON 模式用到的字体字号
+FONT_CACHE_WARMUP = os.getenv("FONT_CACHE_WARMUP", "1") == "1"
+# 编译后布局计划的 LRU 容量（按 (模式, 宽, 高) 计；渲染进程内各自一份）
+LAYOUT_PLAN_CACHE_SIZE = int(os.getenv("LAYOUT_PLAN_CACHE_SIZE", "256"))
+# 已转换图标的 LRU 容量（按 (图标名, 尺寸) 计，不存在的图标名也占一项）
+ICON_CACHE_MAX_ENTRIES = int(os.getenv("ICON_CACHE_MAX_ENTRIES", "512"))
+# 预转换 1-bit 图标图集的落盘路径（留空则只在内存中缓存）
+ICON_ATLAS_PATH = os.getenv(
+    "ICON_ATLAS_PATH", os.path.join(os.path.dirname(__file__), "..", "icon_atlas.bin")
+)
+# 内存渲染缓存的字节上限（BMP 帧按实际字节计）
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# 内存渲染缓存的条目上限（超出按 LRU 淘汰）
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "4096"))
+# 后台清扫：内存条目最长保留时间（分钟）、cache.db 行最长保留时间（小时）、清扫间隔（秒）；
+# 保留时间至少为设备配置可能得到的最长 TTL 加上过期宽限时间，0 表示只按该值
+RENDER_CACHE_MAX_AGE_MINUTES = int(os.getenv("RENDER_CACHE_MAX_AGE_MINUTES", "0"))
+RENDER_CACHE_DB_MAX_AGE_HOURS = int(os.getenv("RENDER_CACHE_DB_MAX_AGE_HOURS", "0"))
+CACHE_SWEEP_INTERVAL_SECONDS = int(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "600"))
+# 帧编码（紧凑行 / raw1 / raw1rle）的 LRU 字节上限；不计入上面的渲染缓存，单独限额
+FRAME_ENCODING_CACHE_BYTES = int(os.getenv("FRAME_ENCODING_CACHE_BYTES", str(8 * 1024 * 1024)))
+# 缓存过期后仍可先返回旧图、后台重新生成的宽限时间（分钟，0 关闭）
+RENDER_STALE_GRACE_MINUTES = int(os.getenv("RENDER_STALE_GRACE_MINUTES", "120"))
+# 每次渲染后预先生成设备下次唤醒时的模式（cycle / 可确定的 time_slot 策略）
+RENDER_PRERENDER = os.getenv("RENDER_PRERENDER", "1") == "1"
+# 局部刷新：按设备记住最近下发的帧（最多设备数，0 关闭），供 fmt=delta1 只返回变化的矩形区域；
+# 比较分块的宽（像素，8 的倍数）和高
+DELTA_HISTORY_SIZE = int(os.getenv("DELTA_HISTORY_SIZE", "2000"))
+DELTA_TILE_WIDTH = int(os.getenv("DELTA_TILE_WIDTH", "32"))
+DELTA_TILE_HEIGHT = int(os.getenv("DELTA_TILE_HEIGHT", "16"))
+# 渲染执行池：thread（默认）/ process（多核并行）/ inline（在事件循环内渲染）；worker 数 0 表示 CPU 核数
+# Pillow 绘制基本持有 GIL：thread 只让渲染不阻塞事件循环，不提升渲染吞吐；多核并行需用 process
+RENDER_POOL = os.getenv("RENDER_POOL", "thread")
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", "0"))
+# 事件循环延迟采样间隔（毫秒，0 关闭）
+LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", "500"))
+# 共享出站 HTTP 客户端：总连接上限、单个主机并发上限、长连接保活秒数、默认超时秒数
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+# 日期 / 天气上下文缓存：天气的缓存秒数、到期前多少秒后台刷新、接口失败后的重试间隔秒数
+CONTEXT_WEATHER_TTL_SECONDS = float(os.getenv("CONTEXT_WEATHER_TTL_SECONDS", "1800"))
+CONTEXT_REFRESH_AHEAD_SECONDS = float(os.getenv("CONTEXT_REFRESH_AHEAD_SECONDS", "300"))
+CONTEXT_ERROR_TTL_SECONDS = float(os.getenv("CONTEXT_ERROR_TTL_SECONDS", "60"))
+# 天气按城市坐标聚合：合并请求的等待窗口（毫秒）、单次请求最多的坐标数、按设备城市批量刷新的间隔（秒，0 关闭）
+WEATHER_BATCH_WINDOW_MS = int(os.getenv("WEATHER_BATCH_WINDOW_MS", "20"))
+WEATHER_BATCH_SIZE = int(os.getenv("WEATHER_BATCH_SIZE", "50"))
+WEATHER_REFRESH_INTERVAL_SECONDS = int(os.getenv("WEATHER_REFRESH_INTERVAL_SECONDS", "300"))
+# 农历 / 节日日历索引的落盘路径（留空则只在内存中构建）与覆盖年数（从当年 1 月 1 日起）
+CALENDAR_INDEX_PATH = os.getenv(
+    "CALENDAR_INDEX_PATH", os.path.join(os.path.dirname(__file__), "..", "calendar_index.json")
+)
+CALENDAR_INDEX_YEARS = int(os.getenv("CALENDAR_INDEX_YEARS", "3"))
+# 渲染日志 / 心跳写缓冲：定时批量写入的间隔（毫秒，0 表示每条直接写入）、攒够多少条立即写入、
+# 数据库不可用时内存中最多积压的条数、每台设备保留的心跳条数及清理间隔（秒）
+TELEMETRY_FLUSH_INTERVAL_MS = int(os.getenv("TELEMETRY_FLUSH_INTERVAL_MS", "1000"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "500"))
+TELEMETRY_MAX_PENDING = int(os.getenv("TELEMETRY_MAX_PENDING", "50000"))
+TELEMETRY_HEARTBEATS_PER_DEVICE = int(os.getenv("TELEMETRY_HEARTBEATS_PER_DEVICE", "1000"))
+TELEMETRY_TRIM_INTERVAL_SECONDS = int(os.getenv("TELEMETRY_TRIM_INTERVAL_SECONDS", "3600"))
+# 按小时汇总的渲染统计保留天数（按天汇总永久保留），随上面的清理任务一起执行
+ROLLUP_HOURLY_RETENTION_DAYS = int(os.getenv("ROLLUP_HOURLY_RETENTION_DAYS", "14"))
+# LLM 客户端池：最多缓存的客户端数、每个客户端的连接上限、长连接保活秒数、客户端空闲关闭秒数
+LLM_POOL_MAX_CLIENTS = int(os.getenv("LLM_POOL_MAX_CLIENTS", "32"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_CLIENT_IDLE_SECONDS = float(os.getenv("LLM_CLIENT_IDLE_SECONDS", "600"))
+# 渲染任务调度：同时执行的任务数、每个 LLM 服务商的默认并发上限
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "8"))
+RENDER_PROVIDER_DEFAULT_CONCURRENCY = int(os.getenv("RENDER_PROVIDER_DEFAULT_CONCURRENCY", "4"))
+# 按服务商单独设置并发上限，如 "deepseek=4,aliyun=2"
+RENDER_PROVIDER_CONCURRENCY = os.getenv("RENDER_PROVIDER_CONCURRENCY", "")
+
+
 # ==================== 业务默认值 ====================
 DEFAULT_CITY = "杭州"
 DEFAULT_LLM_PROVIDER = "deepseek"
@@ -255,6 +335,8 @@ DEFAULT_CONTENT_TONE = "neutral"
 DEFAULT_MODES = ["STOIC"]
 DEFAULT_REFRESH_STRATEGY = "random"
 DEFAULT_REFRESH_INTERVAL = 60  # minutes
+MAX_REFRESH_INTERVAL = 1440  # minutes
+MAX_DEVICE_MODES = 10
 
 # 硬编码模式列表仅作为 fallback，运行时应通过 mode_registry 获取
 _BUILTIN_MODE_IDS = {
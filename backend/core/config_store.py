@@ -241,6 +241,16 @@ async def get_config_history(mac: str) -> list[dict]:
     return [_row_to_dict(r, columns) for r in rows]
 
 
+async def get_active_cities() -> list[str]:
+    """Distinct cities across all active device configs."""
+    db = await get_main_db()
+    db.row_factory = None
+    cursor = await db.execute(
+        "SELECT DISTINCT city FROM configs WHERE is_active = 1 AND city IS NOT NULL"
+    )
+    return [row[0] for row in await cursor.fetchall()]
+
+
 async def activate_config(mac: str, config_id: int) -> bool:
     db = await get_main_db()
     cursor = await db.execute(
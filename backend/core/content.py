@@ -6,6 +6,7 @@ import os
 import re
 import traceback
 import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
 
 import logging
 import httpx
@@ -19,6 +20,8 @@ from tenacity import (
 )
 
 from .errors import LLMKeyMissingError
+from .http_client import get_http_client
+from .llm_pool import llm_pool
 
 logger = logging.getLogger(__name__)
 
@@ -139,11 +142,11 @@ def _build_style_instructions(
     return "\n额外风格要求：" + "；".join(parts) + "。"
 
 
-def _get_client(
+def _resolve_client(
     provider: str = "deepseek", model: str = "deepseek-chat",
     api_key: str | None = None,
-) -> tuple[AsyncOpenAI, int]:
-    """Get OpenAI client for specified provider and return max_tokens"""
+) -> tuple[str, str, int]:
+    """Resolve (base_url, api_key, max_tokens) for the provider and model"""
     if not api_key:
         api_key_map = {
             "deepseek": "DEEPSEEK_API_KEY",
@@ -162,8 +165,18 @@ def _get_client(
     base_url = config["base_url"]
     model_config = config["models"].get(model, {"max_tokens": 120})
     max_tokens = model_config["max_tokens"]
+    return base_url, api_key, max_tokens
 
-    return AsyncOpenAI(api_key=api_key, base_url=base_url), max_tokens
+
+@asynccontextmanager
+async def _lease_client(
+    provider: str = "deepseek", model: str = "deepseek-chat",
+    api_key: str | None = None,
+):
+    """Borrow the pooled client for one request; yields (client, max_tokens)."""
+    base_url, api_key, max_tokens = _resolve_client(provider, model, api_key)
+    async with llm_pool.lease(provider, base_url, api_key) as client:
+        yield client, max_tokens
 
 
 class LLMClient:
@@ -172,7 +185,9 @@ class LLMClient:
     def __init__(self, provider: str = "deepseek", model: str = "deepseek-chat", api_key: str | None = None):
         self.provider = provider
         self.model = model
-        self._client, self._max_tokens = _get_client(provider, model, api_key=api_key)
+        self._api_key = api_key
+        # Resolve eagerly so a missing key fails at construction
+        _resolve_client(provider, model, api_key=api_key)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -192,12 +207,14 @@ class LLMClient:
         self, prompt: str, temperature: float = 0.8, max_tokens: int | None = None,
     ) -> str:
         """Call the LLM with retry logic. Returns response text."""
-        response = await self._client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=max_tokens or self._max_tokens,
-            temperature=temperature,
-        )
+        lease = _lease_client(self.provider, self.model, api_key=self._api_key)
+        async with lease as (client, default_max_tokens):
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens or default_max_tokens,
+                temperature=temperature,
+            )
         text = response.choices[0].message.content.strip()
         finish_reason = response.choices[0].finish_reason
         usage = response.usage
@@ -236,13 +253,13 @@ async def _call_llm(
     Retries up to 3 times with exponential backoff for transient errors.
     Raises ValueError when the API key is missing (no retry).
     """
-    client, default_max_tokens = _get_client(provider, model, api_key=api_key)
-    response = await client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=max_tokens or default_max_tokens,
-        temperature=temperature,
-    )
+    async with _lease_client(provider, model, api_key=api_key) as (client, default_max_tokens):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens or default_max_tokens,
+            temperature=temperature,
+        )
     text = response.choices[0].message.content.strip()
 
     finish_reason = response.choices[0].finish_reason
@@ -358,96 +375,96 @@ def _fallback_content(persona: str) -> dict:
 # ── Hacker News & Product Hunt ───────────────────────────────
 
 
-async def fetch_hn_top_stories(limit: int = 3) -> list[dict]:
+async def fetch_hn_top_stories(limit: int = 3, client: httpx.AsyncClient | None = None) -> list[dict]:
     """获取 Hacker News 热榜 Top N（并发请求各 story）"""
     import asyncio as _asyncio
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://hacker-news.firebaseio.com/v0/topstories.json"
+        client = client or get_http_client()
+        resp = await client.get(
+            "https://hacker-news.firebaseio.com/v0/topstories.json"
+        )
+        if resp.status_code != 200:
+            logger.error(f"[HN] Failed to fetch top stories: {resp.status_code}")
+            return []
+
+        story_ids = resp.json()[:limit]
+
+        async def _fetch_one(sid: int) -> dict | None:
+            r = await client.get(
+                f"https://hacker-news.firebaseio.com/v0/item/{sid}.json"
             )
-            if resp.status_code != 200:
-                logger.error(f"[HN] Failed to fetch top stories: {resp.status_code}")
-                return []
-
-            story_ids = resp.json()[:limit]
-
-            async def _fetch_one(sid: int) -> dict | None:
-                r = await client.get(
-                    f"https://hacker-news.firebaseio.com/v0/item/{sid}.json"
-                )
-                if r.status_code == 200:
-                    s = r.json()
-                    return {
-                        "title": s.get("title", "No title"),
-                        "score": s.get("score", 0),
-                        "url": s.get("url", ""),
-                    }
-                return None
-
-            results = await _asyncio.gather(*[_fetch_one(sid) for sid in story_ids])
-            stories = [s for s in results if s is not None]
-
-            logger.info(f"[HN] Fetched {len(stories)} stories (concurrent)")
-            return stories
+            if r.status_code == 200:
+                s = r.json()
+                return {
+                    "title": s.get("title", "No title"),
+                    "score": s.get("score", 0),
+                    "url": s.get("url", ""),
+                }
+            return None
+
+        results = await _asyncio.gather(*[_fetch_one(sid) for sid in story_ids])
+        stories = [s for s in results if s is not None]
+
+        logger.info(f"[HN] Fetched {len(stories)} stories (concurrent)")
+        return stories
 
     except Exception as e:
         logger.error(f"[HN] Error: {e}")
         return []
 
 
-async def fetch_ph_top_product() -> dict:
+async def fetch_ph_top_product(client: httpx.AsyncClient | None = None) -> dict:
     """获取 Product Hunt 今日 #1 产品（通过 RSS）"""
     try:
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            resp = await client.get("https://www.producthunt.com/feed")
-            if resp.status_code != 200:
-                logger.error(f"[PH] Failed to fetch RSS: {resp.status_code}")
-                return {}
+        client = client or get_http_client()
+        resp = await client.get("https://www.producthunt.com/feed", follow_redirects=True)
+        if resp.status_code != 200:
+            logger.error(f"[PH] Failed to fetch RSS: {resp.status_code}")
+            return {}
 
-            root = ET.fromstring(resp.content)
+        root = ET.fromstring(resp.content)
 
-            namespaces = {
-                "atom": "http://www.w3.org/2005/Atom",
-                "media": "http://search.yahoo.com/mrss/",
-            }
+        namespaces = {
+            "atom": "http://www.w3.org/2005/Atom",
+            "media": "http://search.yahoo.com/mrss/",
+        }
 
-            items = (
-                root.findall(".//item")
-                or root.findall(".//entry", namespaces)
-                or root.findall(".//{http://www.w3.org/2005/Atom}entry")
-            )
+        items = (
+            root.findall(".//item")
+            or root.findall(".//entry", namespaces)
+            or root.findall(".//{http://www.w3.org/2005/Atom}entry")
+        )
 
-            if not items:
-                logger.warning(f"[PH] No items found in RSS. Root tag: {root.tag}")
-                return {}
+        if not items:
+            logger.warning(f"[PH] No items found in RSS. Root tag: {root.tag}")
+            return {}
 
-            first_item = items[0]
+        first_item = items[0]
 
-            title = first_item.find("title") or first_item.find(
-                "{http://www.w3.org/2005/Atom}title"
-            )
-            description = (
-                first_item.find("description")
-                or first_item.find("summary")
-                or first_item.find("{http://www.w3.org/2005/Atom}summary")
-                or first_item.find("content")
-                or first_item.find("{http://www.w3.org/2005/Atom}content")
-            )
+        title = first_item.find("title") or first_item.find(
+            "{http://www.w3.org/2005/Atom}title"
+        )
+        description = (
+            first_item.find("description")
+            or first_item.find("summary")
+            or first_item.find("{http://www.w3.org/2005/Atom}summary")
+            or first_item.find("content")
+            or first_item.find("{http://www.w3.org/2005/Atom}content")
+        )
 
-            tagline_text = ""
-            if description is not None and description.text:
-                tagline_text = re.sub(r"<[^>]+>", "", description.text).strip()
-                tagline_text = tagline_text[:100]
+        tagline_text = ""
+        if description is not None and description.text:
+            tagline_text = re.sub(r"<[^>]+>", "", description.text).strip()
+            tagline_text = tagline_text[:100]
 
-            product = {
-                "name": title.text if title is not None else "Unknown Product",
-                "tagline": tagline_text,
-            }
+        product = {
+            "name": title.text if title is not None else "Unknown Product",
+            "tagline": tagline_text,
+        }
 
-            logger.info(f"[PH] Fetched product: {product['name']}")
-            return product
+        logger.info(f"[PH] Fetched product: {product['name']}")
+        return product
 
     except Exception as e:
         logger.exception("[PH] Error fetching Product Hunt product")
@@ -457,21 +474,21 @@ async def fetch_ph_top_product() -> dict:
 # ── V2EX ─────────────────────────────────────────────────────
 
 
-async def fetch_v2ex_hot(limit: int = 3) -> list[dict]:
+async def fetch_v2ex_hot(limit: int = 3, client: httpx.AsyncClient | None = None) -> list[dict]:
     """获取 V2EX 热门话题"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get("https://www.v2ex.com/api/topics/hot.json")
-            if resp.status_code == 200:
-                topics = resp.json()[:limit]
-                return [
-                    {
-                        "title": t.get("title", ""),
-                        "node": t.get("node", {}).get("title", ""),
-                    }
-                    for t in topics
-                ]
-            logger.error(f"[V2EX] Failed to fetch hot topics: {resp.status_code}")
+        client = client or get_http_client()
+        resp = await client.get("https://www.v2ex.com/api/topics/hot.json")
+        if resp.status_code == 200:
+            topics = resp.json()[:limit]
+            return [
+                {
+                    "title": t.get("title", ""),
+                    "node": t.get("node", {}).get("title", ""),
+                }
+                for t in topics
+            ]
+        logger.error(f"[V2EX] Failed to fetch hot topics: {resp.status_code}")
     except Exception as e:
         logger.error(f"[V2EX] Error: {e}")
     return []
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 import httpx
 import random
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable, Iterable
 
 from tenacity import (
     retry,
@@ -13,13 +14,10 @@ from tenacity import (
     wait_exponential,
     retry_if_exception_type,
 )
-from zhdate import ZhDate
 
 from .config import (
     WEEKDAY_CN,
     MONTH_CN,
-    SOLAR_FESTIVALS,
-    LUNAR_FESTIVALS,
     IDIOMS,
     POEMS,
     CITY_COORDINATES,
@@ -28,9 +26,14 @@ from .config import (
     OPEN_METEO_URL,
     HOLIDAY_WORK_API_URL,
     HOLIDAY_NEXT_API_URL,
+    CONTEXT_WEATHER_TTL_SECONDS,
+    CONTEXT_REFRESH_AHEAD_SECONDS,
+    CONTEXT_ERROR_TTL_SECONDS,
+    WEATHER_BATCH_SIZE,
+    WEATHER_BATCH_WINDOW_MS,
 )
-
-_context_cache: dict[str, tuple[Any, float]] = {}
+from .calendar_index import calendar_index
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -47,117 +50,136 @@ _api_retry = retry(
 )
 
 
-def _cache_get(key: str, ttl: float) -> Any | None:
-    if key in _context_cache:
-        val, ts = _context_cache[key]
-        if time.time() - ts < ttl:
-            return val
-        del _context_cache[key]
-    return None
+class _CityIndex:
+    """Precomputed city lookup replacing a substring scan over the city table.
+
+    Keeps the scan's semantics: an exact name wins, otherwise the first city
+    in table order whose name contains, or is contained in, the query.
+    """
+
+    def __init__(self, cities: dict[str, tuple[float, float]]) -> None:
+        self._coords = list(cities.values())
+        self._rank = {name: i for i, name in enumerate(cities)}
+        self._longest = max(map(len, cities), default=0)
+        # Every substring of every name -> first city containing it
+        self._within: dict[str, int] = {}
+        for i, name in enumerate(cities):
+            for start in range(len(name)):
+                for end in range(start + 1, len(name) + 1):
+                    self._within.setdefault(name[start:end], i)
+        # Device configs repeat a handful of spellings; remember each answer
+        self._memo: dict[str, tuple[float, float] | None] = {}
+
+    _MAX_MEMO = 4096
+
+    def resolve(self, city: str) -> tuple[float, float] | None:
+        try:
+            return self._memo[city]
+        except KeyError:
+            pass
+        if len(self._memo) >= self._MAX_MEMO:
+            self._memo.clear()
+        coords = self._memo[city] = self._lookup(city)
+        return coords
+
+    def _lookup(self, city: str) -> tuple[float, float] | None:
+        rank = self._rank.get(city)
+        if rank is not None:
+            return self._coords[rank]
+        best = self._within.get(city)
+        # Names contained in the query, e.g. "杭州" in "浙江杭州市"
+        for size in range(1, min(len(city), self._longest) + 1):
+            for start in range(len(city) - size + 1):
+                rank = self._rank.get(city[start:start + size])
+                if rank is not None and (best is None or rank < best):
+                    best = rank
+        return None if best is None else self._coords[best]
 
 
-def _cache_set(key: str, val: Any):
-    _context_cache[key] = (val, time.time())
+_city_index = _CityIndex(CITY_COORDINATES)
 
 
 def _resolve_city(city: str | None) -> tuple[float, float]:
     if not city:
         return DEFAULT_LATITUDE, DEFAULT_LONGITUDE
-    coords = CITY_COORDINATES.get(city)
-    if coords:
-        return coords
-    for name, c in CITY_COORDINATES.items():
-        if name in city or city in name:
-            return c
-    return DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+    return _city_index.resolve(city) or (DEFAULT_LATITUDE, DEFAULT_LONGITUDE)
 
 
 @_api_retry
-async def _fetch_holiday_info(date_str: str) -> dict:
+async def _fetch_holiday_info(date_str: str, client: httpx.AsyncClient | None = None) -> dict:
     """Fetch holiday info with retry."""
-    async with httpx.AsyncClient(timeout=3.0) as client:
-        resp = await client.get(HOLIDAY_WORK_API_URL, params={"date": date_str})
-        resp.raise_for_status()
-        return resp.json()
+    client = client or get_http_client()
+    resp = await client.get(HOLIDAY_WORK_API_URL, params={"date": date_str}, timeout=3.0)
+    resp.raise_for_status()
+    return resp.json()
+
+
+_NO_HOLIDAY = {"is_holiday": False, "holiday_name": "", "is_workday": False}
+_NO_UPCOMING = {"days_until": 0, "holiday_name": "", "date": "", "holiday_duration": 0}
+
+
+def _parse_holiday_info(result: dict) -> dict:
+    if result.get("code") == 200 and result.get("data"):
+        is_work = result["data"].get("work", True)
+        return {
+            "is_holiday": not is_work,
+            "holiday_name": "",
+            "is_workday": is_work,
+        }
+    return dict(_NO_HOLIDAY)
 
 
 async def get_holiday_info(date: datetime) -> dict:
     date_str = date.strftime("%Y-%m-%d")
     try:
-        result = await _fetch_holiday_info(date_str)
-        if result.get("code") == 200 and result.get("data"):
-            data = result["data"]
-            is_work = data.get("work", True)
-            return {
-                    "is_holiday": not is_work,
-                    "holiday_name": "",
-                    "is_workday": is_work,
-                }
-        else:
-            return {"is_holiday": False, "holiday_name": "", "is_workday": False}
+        return _parse_holiday_info(await _fetch_holiday_info(date_str))
     except Exception:
-        return {"is_holiday": False, "holiday_name": "", "is_workday": False}
+        return dict(_NO_HOLIDAY)
 
 
 @_api_retry
-async def _fetch_upcoming_holiday() -> dict:
+async def _fetch_upcoming_holiday(client: httpx.AsyncClient | None = None) -> dict:
     """Fetch upcoming holiday info with retry."""
-    async with httpx.AsyncClient(timeout=3.0) as client:
-        resp = await client.get(HOLIDAY_NEXT_API_URL)
-        resp.raise_for_status()
-        return resp.json()
+    client = client or get_http_client()
+    resp = await client.get(HOLIDAY_NEXT_API_URL, timeout=3.0)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _parse_upcoming_holiday(result: dict, now: datetime) -> dict:
+    if result.get("code") == 200 and result.get("data"):
+        data = result["data"]
+        holiday_date_str = data.get("date", "")
+
+        if holiday_date_str:
+            holiday_date = datetime.strptime(holiday_date_str, "%Y-%m-%d")
+            days_until = (holiday_date.date() - now.date()).days
+
+            return {
+                "days_until": days_until if days_until > 0 else 0,
+                "holiday_name": data.get("name", ""),
+                "date": holiday_date.strftime("%m月%d日"),
+                "holiday_duration": data.get("days", 0),
+            }
+    return dict(_NO_UPCOMING)
 
 
 async def get_upcoming_holiday(now: datetime) -> dict:
     try:
-        result = await _fetch_upcoming_holiday()
-        if result.get("code") == 200 and result.get("data"):
-            data = result["data"]
-            holiday_date_str = data.get("date", "")
-
-            if holiday_date_str:
-                from datetime import datetime as dt
-
-                holiday_date = dt.strptime(holiday_date_str, "%Y-%m-%d")
-                days_until = (holiday_date.date() - now.date()).days
-
-                return {
-                    "days_until": days_until if days_until > 0 else 0,
-                    "holiday_name": data.get("name", ""),
-                    "date": holiday_date.strftime("%m月%d日"),
-                    "holiday_duration": data.get("days", 0),
-                }
+        return _parse_upcoming_holiday(await _fetch_upcoming_holiday(), now)
     except Exception:
-        pass
-
-    return {"days_until": 0, "holiday_name": "", "date": "", "holiday_duration": 0}
+        return dict(_NO_UPCOMING)
 
 
-async def get_date_context() -> dict:
-    now = datetime.now()
+def _build_date_context(now: datetime, day: dict) -> dict:
+    """Date context for ``now`` from its calendar index record."""
     day_of_year = now.timetuple().tm_yday
     days_in_year = (
         366
         if (now.year % 4 == 0 and (now.year % 100 != 0 or now.year % 400 == 0))
         else 365
     )
-    
-    festival = SOLAR_FESTIVALS.get((now.month, now.day), "")
-    
-    try:
-        lunar = ZhDate.from_datetime(now)
-        lunar_festival = LUNAR_FESTIVALS.get((lunar.lunar_month, lunar.lunar_day), "")
-        if lunar_festival and not festival:
-            festival = lunar_festival
-    except Exception:
-        pass
-    
-    holiday_info = await get_holiday_info(now)
-    if holiday_info["holiday_name"] and not festival:
-        festival = holiday_info["holiday_name"]
-    
-    upcoming = await get_upcoming_holiday(now)
-    
+    upcoming = day["upcoming"]
     daily_word = random.choice(IDIOMS + POEMS)
     
     return {
@@ -172,9 +194,9 @@ async def get_date_context() -> dict:
         "weekday_cn": WEEKDAY_CN[now.weekday()],
         "day_of_year": day_of_year,
         "days_in_year": days_in_year,
-        "festival": festival,
-        "is_holiday": holiday_info["is_holiday"],
-        "is_workday": holiday_info["is_workday"],
+        "festival": day["festival"],
+        "is_holiday": day["is_holiday"],
+        "is_workday": day["is_workday"],
         "upcoming_holiday": upcoming["holiday_name"],
         "days_until_holiday": upcoming["days_until"],
         "holiday_date": upcoming["date"],
@@ -182,58 +204,343 @@ async def get_date_context() -> dict:
     }
 
 
-async def get_date_context_cached(ttl: float = 900) -> dict:
-    """Cached version of get_date_context (15min default TTL)."""
-    cached = _cache_get("date_context", ttl)
-    if cached is not None:
-        return cached
-    result = await get_date_context()
-    _cache_set("date_context", result)
-    return result
+async def _load_holidays(now: datetime) -> tuple[dict, dict]:
+    """Both holiday lookups for one day; raises if the workday lookup fails."""
+    info, upcoming = await asyncio.gather(
+        _fetch_holiday_info(now.strftime("%Y-%m-%d")),
+        _fetch_upcoming_holiday(),
+    )
+    if info.get("code") != 200 or not info.get("data"):
+        raise ValueError(f"holiday API returned code {info.get('code')}")
+    return _parse_holiday_info(info), _parse_upcoming_holiday(upcoming, now)
+
+
+async def _confirm_holidays(now: datetime) -> dict:
+    """Fetch the official flags for ``now``'s day and persist them in the calendar index."""
+    holiday_info, upcoming = await _load_holidays(now)
+    record = calendar_index.confirm(now.date(), holiday_info, upcoming)
+    await asyncio.to_thread(calendar_index.save)
+    return record
+
+
+async def get_date_context() -> dict:
+    """Date context with the holiday APIs queried for today if not yet confirmed."""
+    now = datetime.now()
+    day = calendar_index.get(now.date())
+    if not day["confirmed"]:
+        try:
+            day = await _confirm_holidays(now)
+        except Exception:
+            pass
+    return _build_date_context(now, day)
 
 
 @_api_retry
-async def _fetch_weather_data(url: str, params: dict) -> dict:
+async def _fetch_weather_data(url: str, params: dict, client: httpx.AsyncClient | None = None) -> dict:
     """Fetch weather data with retry."""
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        return resp.json()
+    client = client or get_http_client()
+    resp = await client.get(url, params=params, timeout=5.0)
+    resp.raise_for_status()
+    return resp.json()
 
 
-async def get_weather(
-    lat: float | None = None, lon: float | None = None, city: str | None = None
-) -> dict:
-    if lat is None or lon is None:
-        lat, lon = _resolve_city(city)
+_NO_WEATHER = {"temp": 0, "weather_code": -1, "weather_str": "--°C"}
+
+
+def _parse_current_weather(data: dict) -> dict:
+    current = data["current"]
+    return {
+        "temp": round(current["temperature_2m"]),
+        "weather_code": current["weather_code"],
+        "weather_str": f"{round(current['temperature_2m'])}°C",
+    }
+
 
+async def _fetch_current_weather(coords: list[tuple[float, float]]) -> list[dict]:
+    """Current weather for several locations in one Open-Meteo request."""
     params = {
-        "latitude": lat,
-        "longitude": lon,
+        "latitude": ",".join(str(lat) for lat, _ in coords),
+        "longitude": ",".join(str(lon) for _, lon in coords),
         "current": "temperature_2m,weather_code",
         "timezone": "auto",
     }
-    try:
-        data = await _fetch_weather_data(OPEN_METEO_URL, params)
-        current = data["current"]
+    data = await _fetch_weather_data(OPEN_METEO_URL, params)
+    # A single location comes back as an object, several as a list in request order
+    results = data if isinstance(data, list) else [data]
+    if len(results) != len(coords):
+        raise ValueError(f"expected {len(coords)} locations, got {len(results)}")
+    return [_parse_current_weather(item) for item in results]
+
+
+class WeatherBatcher:
+    """Folds current-weather lookups for different locations into shared requests.
+
+    Lookups arriving within ``window`` seconds of each other go out as one
+    multi-location Open-Meteo call of at most ``max_batch`` locations.
+    """
+
+    def __init__(
+        self,
+        window: float = WEATHER_BATCH_WINDOW_MS / 1000,
+        max_batch: int = WEATHER_BATCH_SIZE,
+    ) -> None:
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: dict[tuple[float, float], asyncio.Future] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._sending: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.requests = 0
+        self.locations = 0
+
+    async def get(self, lat: float, lon: float) -> dict:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = {}
+            self._timer = None
+        fut = self._pending.get((lat, lon))
+        if fut is None:
+            fut = self._pending[(lat, lon)] = loop.create_future()
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._flush)
+        return dict(await asyncio.shield(fut))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = self._loop.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: dict[tuple[float, float], asyncio.Future]) -> None:
+        self.requests += 1
+        self.locations += len(batch)
+        try:
+            results = await _fetch_current_weather(list(batch))
+        except Exception as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                    # Every waiter re-raises it; don't also log it as unretrieved
+                    fut.exception()
+            return
+        for fut, result in zip(batch.values(), results):
+            if not fut.done():
+                fut.set_result(result)
+
+    def stats(self) -> dict:
         return {
-            "temp": round(current["temperature_2m"]),
-            "weather_code": current["weather_code"],
-            "weather_str": f"{round(current['temperature_2m'])}°C",
+            "requests": self.requests,
+            "locations": self.locations,
+            "locations_per_request": round(self.locations / self.requests, 2) if self.requests else 0.0,
         }
+
+
+# Global weather batcher instance
+weather_batcher = WeatherBatcher()
+
+
+async def _load_weather(lat: float, lon: float) -> dict:
+    return await weather_batcher.get(lat, lon)
+
+
+async def get_weather(
+    lat: float | None = None, lon: float | None = None, city: str | None = None
+) -> dict:
+    if lat is None or lon is None:
+        lat, lon = _resolve_city(city)
+    try:
+        return await _load_weather(lat, lon)
     except Exception:
-        return {"temp": 0, "weather_code": -1, "weather_str": "--°C"}
-
-
-async def get_weather_cached(city: str | None = None, ttl: float = 1800) -> dict:
-    """Cached version of get_weather (30min default TTL)."""
-    cache_key = f"weather:{city or 'default'}"
-    cached = _cache_get(cache_key, ttl)
-    if cached is not None:
-        return cached
-    result = await get_weather(city=city)
-    _cache_set(cache_key, result)
-    return result
+        return dict(_NO_WEATHER)
+
+
+class ContextService:
+    """In-memory date and weather context for the render path.
+
+    The date context is read from the calendar index; a day the holiday API
+    has not confirmed yet is confirmed in the background. Weather is a TTL
+    cache: concurrent misses for one key share a single fetch, and an entry
+    close to expiry is refreshed in the background while the old value keeps
+    being served. A failed fetch falls back to the last value (or defaults)
+    for ``error_ttl`` seconds instead of retrying on every render.
+    """
+
+    def __init__(
+        self,
+        weather_ttl: float = CONTEXT_WEATHER_TTL_SECONDS,
+        refresh_ahead: float = CONTEXT_REFRESH_AHEAD_SECONDS,
+        error_ttl: float = CONTEXT_ERROR_TTL_SECONDS,
+    ) -> None:
+        self.weather_ttl = weather_ttl
+        self.refresh_ahead = refresh_ahead
+        self.error_ttl = error_ttl
+        # key -> (value, refresh_at, expires_at) on the monotonic clock
+        self._entries: dict[str, tuple[Any, float, float]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    async def date_context(self, now: datetime | None = None) -> dict:
+        now = now or datetime.now()
+        day = calendar_index.get(now.date())
+        self.hits += 1
+        if not day["confirmed"]:
+            self._confirm_in_background(now)
+        return _build_date_context(now, day)
+
+    def _confirm_in_background(self, now: datetime) -> None:
+        self._bind_loop()
+        key = f"holidays:{now:%Y-%m-%d}"
+        entry = self._entries.get(key)
+        # A recent failure is retried only after error_ttl
+        if key in self._inflight or (entry is not None and time.monotonic() < entry[2]):
+            return
+        self.refreshes += 1
+        self._start(key, self.error_ttl, lambda: _confirm_holidays(now), None)
+
+    async def weather(
+        self, city: str | None = None, lat: float | None = None, lon: float | None = None
+    ) -> dict:
+        if lat is None or lon is None:
+            lat, lon = _resolve_city(city)
+        value = await self._get(*self._weather_args(lat, lon))
+        return dict(value)
+
+    async def refresh_weather(self, cities: Iterable[str | None]) -> int:
+        """Load every distinct location of ``cities`` that is missing or due a refresh.
+
+        The loads start together, so the batcher sends them as a few
+        multi-location requests. Returns the number of locations loaded.
+        """
+        self._bind_loop()
+        now = time.monotonic()
+        tasks = []
+        for lat, lon in {_resolve_city(city) for city in cities}:
+            args = self._weather_args(lat, lon)
+            entry = self._entries.get(args[0])
+            if (entry is not None and now < entry[1]) or args[0] in self._inflight:
+                continue
+            tasks.append(self._start(*args))
+        await asyncio.gather(*tasks)
+        return len(tasks)
+
+    async def run_weather_refresh(
+        self, cities: Callable[[], Awaitable[Iterable[str | None]]], interval_seconds: float
+    ) -> None:
+        """Refresh the weather of every city ``cities()`` returns, every ``interval_seconds``."""
+        while True:
+            try:
+                await self.refresh_weather(await cities())
+            except Exception:
+                logger.warning("[CONTEXT] Weather refresh failed", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    def _weather_args(self, lat: float, lon: float) -> tuple:
+        return (
+            f"weather:{lat:.4f},{lon:.4f}",
+            self.weather_ttl,
+            lambda: _load_weather(lat, lon),
+            _NO_WEATHER,
+        )
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Fetches started on another loop (tests, reloads) cannot be awaited here
+            self._loop = loop
+            self._inflight.clear()
+
+    async def _get(
+        self, key: str, ttl: float, load: Callable[[], Awaitable[Any]], fallback: Any
+    ) -> Any:
+        self._bind_loop()
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry[2]:
+            self.hits += 1
+            if now >= entry[1] and key not in self._inflight:
+                self.refreshes += 1
+                self._start(key, ttl, load, fallback)
+            return entry[0]
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._start(key, ttl, load, fallback)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _start(
+        self, key: str, ttl: float, load: Callable[[], Awaitable[Any]], fallback: Any
+    ) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self._load(key, ttl, load, fallback))
+        self._inflight[key] = task
+        return task
+
+    async def _load(
+        self, key: str, ttl: float, load: Callable[[], Awaitable[Any]], fallback: Any
+    ) -> Any:
+        try:
+            value = await load()
+            refresh_in = ttl - min(self.refresh_ahead, ttl / 2)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[CONTEXT] Fetching {key} failed, retry in {self.error_ttl:.0f}s: {e}")
+            entry = self._entries.get(key)
+            value = entry[0] if entry is not None else fallback
+            ttl = refresh_in = self.error_ttl
+        finally:
+            self._inflight.pop(key, None)
+        now = time.monotonic()
+        self._entries[key] = (value, now + refresh_in, now + ttl)
+        self._prune(now)
+        return value
+
+    def _prune(self, now: float) -> None:
+        # Expired entries stay one more TTL as the fallback for a failed refresh
+        keep = self.weather_ttl
+        for key in [k for k, entry in self._entries.items() if now - entry[2] > keep]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "weather_batches": weather_batcher.stats(),
+            "calendar": calendar_index.stats(),
+        }
+
+
+# Global context service instance
+context_service = ContextService()
+
+
+async def get_date_context_cached() -> dict:
+    """Date context served from the calendar index."""
+    return await context_service.date_context()
+
+
+async def get_weather_cached(city: str | None = None) -> dict:
+    """Current weather for a city, served from the context cache."""
+    return await context_service.weather(city=city)
 
 
 def _weather_code_to_desc(code: int) -> str:
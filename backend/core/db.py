@@ -15,8 +15,10 @@ _CACHE_DB_PATH = os.path.join(_DB_DIR, "cache.db")
 
 _main_conn: aiosqlite.Connection | None = None
 _cache_conn: aiosqlite.Connection | None = None
+_telemetry_conn: aiosqlite.Connection | None = None
 _main_lock = asyncio.Lock()
 _cache_lock = asyncio.Lock()
+_telemetry_lock = asyncio.Lock()
 
 
 async def get_main_db() -> aiosqlite.Connection:
@@ -43,9 +45,25 @@ async def get_cache_db() -> aiosqlite.Connection:
         return _cache_conn
 
 
+async def get_telemetry_db() -> aiosqlite.Connection:
+    """Get or create the main database connection reserved for telemetry writes.
+
+    Batched render logs commit in their own transactions here, so they never
+    commit or roll back other coroutines' writes on the shared connection.
+    """
+    global _telemetry_conn
+    async with _telemetry_lock:
+        if _telemetry_conn is None:
+            _telemetry_conn = await aiosqlite.connect(_MAIN_DB_PATH)
+            await _telemetry_conn.execute("PRAGMA journal_mode=WAL")
+            await _telemetry_conn.execute("PRAGMA busy_timeout=5000")
+            logger.info("[DB] Telemetry database connection established (WAL mode)")
+        return _telemetry_conn
+
+
 async def close_all():
     """Close all database connections (called on shutdown)."""
-    global _main_conn, _cache_conn
+    global _main_conn, _cache_conn, _telemetry_conn
     async with _main_lock:
         if _main_conn:
             await _main_conn.close()
@@ -56,3 +74,8 @@ async def close_all():
             await _cache_conn.close()
             _cache_conn = None
             logger.info("[DB] Cache database connection closed")
+    async with _telemetry_lock:
+        if _telemetry_conn:
+            await _telemetry_conn.close()
+            _telemetry_conn = None
+            logger.info("[DB] Telemetry database connection closed")
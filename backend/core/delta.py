@@ -0,0 +1,213 @@
+"""
+帧差分（局部刷新）
+记录每台设备最近一次下发的帧；设备带上当前画面的哈希请求 fmt=delta1 时，
+只返回发生变化的矩形区域（自上而下的 1-bpp 紧凑行），墨水屏据此局部刷新。
+差分在整块紧凑缓冲区上按字节异或后查找非零区间，不逐像素比较。
+"""
+from __future__ import annotations
+
+import re
+import struct
+from collections import OrderedDict
+from typing import Optional
+
+from .config import DELTA_HISTORY_SIZE, DELTA_TILE_HEIGHT, DELTA_TILE_WIDTH
+from .framebuffer import RAW1_HEADER, RAW1_PACKBITS, RAW1_PLAIN, Frame, packbits, unpackbits
+
+# Same 14-byte header as raw1 with its own magic. The (optionally PackBits
+# encoded) body is a rect count followed by, per rect, x, y, width, height in
+# pixels and that rect's top-down rows of ceil(width / 8) bytes.
+DELTA_MAGIC = b"INKD"
+_COUNT = struct.Struct("<H")
+_RECT = struct.Struct("<HHHH")
+
+_CHANGED = re.compile(rb"[^\x00]+")
+
+Rect = tuple[int, int, int, int]
+
+
+def diff_rects(
+    old: bytes,
+    new: bytes,
+    width: int,
+    height: int,
+    tile_w: int = DELTA_TILE_WIDTH,
+    tile_h: int = DELTA_TILE_HEIGHT,
+) -> list[Rect]:
+    """Rectangles ``(x, y, w, h)`` covering every pixel that differs.
+
+    ``old`` and ``new`` are top-down packed rows (:attr:`Frame.rows`). The
+    buffers are XORed as one big integer and the non-zero byte runs mark
+    dirty ``tile_w`` x ``tile_h`` tiles, which are merged into rectangles:
+    horizontally adjacent tiles within a tile row, then identical spans in
+    consecutive tile rows. ``x`` and ``w`` are multiples of 8 except where
+    clipped at the right edge.
+    """
+    if old == new:
+        return []
+    row_bytes = (width + 7) // 8
+    tile_bytes = max(1, tile_w // 8)
+    tile_h = max(1, tile_h)
+    xor = (int.from_bytes(old, "big") ^ int.from_bytes(new, "big")).to_bytes(len(new), "big")
+
+    dirty: dict[int, set[int]] = {}
+    for match in _CHANGED.finditer(xor):
+        start, end = match.span()
+        for row in range(start // row_bytes, (end - 1) // row_bytes + 1):
+            first = max(start, row * row_bytes) - row * row_bytes
+            last = min(end, (row + 1) * row_bytes) - row * row_bytes - 1
+            dirty.setdefault(row // tile_h, set()).update(
+                range(first // tile_bytes, last // tile_bytes + 1)
+            )
+
+    rects: list[Rect] = []
+    open_spans: dict[tuple[int, int], list[int]] = {}  # (tx0, tx1) -> [first ty, last ty]
+    for ty in sorted(dirty):
+        spans = []
+        for tx in sorted(dirty[ty]):
+            if spans and spans[-1][1] == tx - 1:
+                spans[-1][1] = tx
+            else:
+                spans.append([tx, tx])
+        current = {(tx0, tx1) for tx0, tx1 in spans}
+        for span, rows in list(open_spans.items()):
+            if span not in current or rows[1] != ty - 1:
+                rects.append(_tile_rect(span, rows, tile_bytes, tile_h, width, height))
+                del open_spans[span]
+        for span in current:
+            if span in open_spans:
+                open_spans[span][1] = ty
+            else:
+                open_spans[span] = [ty, ty]
+    for span, rows in open_spans.items():
+        rects.append(_tile_rect(span, rows, tile_bytes, tile_h, width, height))
+    rects.sort(key=lambda r: (r[1], r[0]))
+    return rects
+
+
+def _tile_rect(span, rows, tile_bytes: int, tile_h: int, width: int, height: int) -> Rect:
+    x = span[0] * tile_bytes * 8
+    y = rows[0] * tile_h
+    w = min((span[1] + 1) * tile_bytes * 8, width) - x
+    h = min((rows[1] + 1) * tile_h, height) - y
+    return x, y, w, h
+
+
+def crop_rows(rows: bytes, width: int, rect: Rect) -> bytes:
+    """Top-down packed rows of ``rect`` cut out of a full frame's rows."""
+    x, y, w, h = rect
+    row_bytes = (width + 7) // 8
+    first, count = x // 8, (w + 7) // 8
+    view = memoryview(rows)
+    return b"".join(
+        view[(y + i) * row_bytes + first:(y + i) * row_bytes + first + count] for i in range(h)
+    )
+
+
+def encode_delta(base: Frame, frame: Frame, rle: bool = True) -> bytes:
+    """Delta response turning ``base`` into ``frame`` (same size required)."""
+    if base.size != frame.size:
+        raise ValueError("delta frames must have the same size")
+    rects = diff_rects(base.rows, frame.rows, frame.width, frame.height)
+    parts = [_COUNT.pack(len(rects))]
+    for rect in rects:
+        parts.append(_RECT.pack(*rect))
+        parts.append(crop_rows(frame.rows, frame.width, rect))
+    body = b"".join(parts)
+    encoding = RAW1_PLAIN
+    if rle:
+        body, encoding = packbits(body), RAW1_PACKBITS
+    header = RAW1_HEADER.pack(DELTA_MAGIC, frame.width, frame.height, encoding, 0, len(body))
+    return header + body
+
+
+def apply_delta(rows: bytes, data: bytes) -> tuple[bytes, list[Rect]]:
+    """Apply a delta response to top-down ``rows``; returns the new rows and the rects."""
+    magic, width, height, encoding, _, length = RAW1_HEADER.unpack_from(data, 0)
+    if magic != DELTA_MAGIC:
+        raise ValueError(f"not a delta frame (magic={magic!r})")
+    body = bytes(data[RAW1_HEADER.size:RAW1_HEADER.size + length])
+    if len(body) != length:
+        raise ValueError("truncated delta frame")
+    if encoding == RAW1_PACKBITS:
+        body = unpackbits(body)
+    row_bytes = (width + 7) // 8
+    if len(rows) != row_bytes * height:
+        raise ValueError("base frame size does not match the delta")
+    out = bytearray(rows)
+    (count,) = _COUNT.unpack_from(body, 0)
+    offset = _COUNT.size
+    rects: list[Rect] = []
+    for _ in range(count):
+        x, y, w, h = _RECT.unpack_from(body, offset)
+        offset += _RECT.size
+        if x % 8 or x + w > width or y + h > height:
+            raise ValueError(f"delta rect {(x, y, w, h)} out of bounds")
+        count_bytes = (w + 7) // 8
+        for i in range(h):
+            start = (y + i) * row_bytes + x // 8
+            out[start:start + count_bytes] = body[offset:offset + count_bytes]
+            offset += count_bytes
+        rects.append((x, y, w, h))
+    if offset != len(body):
+        raise ValueError("trailing bytes in delta frame")
+    return bytes(out), rects
+
+
+class FrameHistory:
+    """The last frame sent to each device, an LRU bounded by ``max_devices``.
+
+    Frames are immutable and usually shared with the render cache, so an
+    entry costs a reference rather than a copy.
+    """
+
+    def __init__(self, max_devices: int = DELTA_HISTORY_SIZE) -> None:
+        self.max_devices = max_devices
+        self._frames: OrderedDict[str, Frame] = OrderedDict()
+        self._deltas = 0
+        self._full = 0
+        self._bytes_saved = 0
+
+    def remember(self, mac: str, frame: Frame) -> None:
+        if self.max_devices <= 0:
+            return
+        self._frames[mac] = frame
+        self._frames.move_to_end(mac)
+        while len(self._frames) > self.max_devices:
+            self._frames.popitem(last=False)
+
+    def get(self, mac: str) -> Optional[Frame]:
+        return self._frames.get(mac)
+
+    def forget(self, mac: str) -> None:
+        self._frames.pop(mac, None)
+
+    def encode(self, frame: Frame, base: Optional[Frame]) -> tuple[bytes, bool]:
+        """Body for a ``delta1`` request: ``(body, is_delta)``.
+
+        ``base`` is the remembered frame the device reported still showing.
+        The delta is used when it is smaller than the full PackBits frame;
+        otherwise (or without a base) the full ``raw1rle`` body is returned.
+        """
+        full = frame.encode("raw1rle")
+        if base is not None and base.size == frame.size:
+            delta = encode_delta(base, frame)
+            if len(delta) < len(full):
+                self._deltas += 1
+                self._bytes_saved += len(full) - len(delta)
+                return delta, True
+        self._full += 1
+        return full, False
+
+    def stats(self) -> dict:
+        return {
+            "devices": len(self._frames),
+            "max_devices": self.max_devices,
+            "deltas": self._deltas,
+            "full_frames": self._full,
+            "bytes_saved": self._bytes_saved,
+        }
+
+
+# Global frame history instance
+frame_history = FrameHistory()
@@ -0,0 +1,290 @@
+"""
+1-bit 帧缓冲
+将渲染结果保存为与 BMP 像素区一致的 1-bpp 行数据及预计算的 BMP 文件头，
+缓存命中时直接输出字节，无需 Pillow 编解码。
+设备也可请求紧凑的 raw1 格式：固定 14 字节头 + 自上而下的紧凑行，可选 PackBits 压缩。
+raw1 等派生编码记在按字节限额的独立 LRU 中，不挂在帧对象上，缓存占用只算 BMP 字节。
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+import struct
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable
+
+from PIL import Image
+
+from .config import FRAME_ENCODING_CACHE_BYTES
+
+# Cache payload: magic, format version, width, height, then a complete BMP file.
+# Version 1 is the legacy PNG blob, recognised by its signature.
+PAYLOAD_MAGIC = b"INKF"
+PAYLOAD_VERSION = 2
+_PAYLOAD_HEADER = struct.Struct("<4sBHH")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# raw1 response: magic, width, height, encoding, reserved, body length, then the
+# body. 14 bytes like a BMP file header, so devices read one header for either.
+RAW1_MAGIC = b"INK1"
+RAW1_HEADER = struct.Struct("<4sHHBBI")
+RAW1_PLAIN = 0
+RAW1_PACKBITS = 1
+
+# Bodies :meth:`Frame.encode` produces; /api/render also accepts ``delta1``
+# (see core.delta) and answers it with a delta or a full raw1rle frame.
+RENDER_FORMATS = ("bmp", "raw1", "raw1rle")
+RENDER_MEDIA_TYPES = {
+    "bmp": "image/bmp",
+    "raw1": "application/octet-stream",
+    "raw1rle": "application/octet-stream",
+    "delta1": "application/octet-stream",
+}
+
+_RUN = re.compile(rb"(.)\1{2,}", re.S)
+
+
+def bmp_stride(width: int) -> int:
+    """Bytes per BMP pixel row for a 1-bpp image (rows are 4-byte aligned)."""
+    return ((width + 31) // 32) * 4
+
+
+@lru_cache(maxsize=32)
+def bmp_header(width: int, height: int) -> bytes:
+    """File header, info header and palette Pillow writes for a mode "1" BMP."""
+    buf = io.BytesIO()
+    Image.new("1", (width, height), 1).save(buf, format="BMP")
+    data = buf.getvalue()
+    pixel_offset = struct.unpack_from("<I", data, 10)[0]
+    return data[:pixel_offset]
+
+
+def packbits(data: bytes) -> bytes:
+    """PackBits-encode ``data``.
+
+    A header byte ``n < 128`` is followed by ``n + 1`` literal bytes; ``n > 128``
+    is followed by one byte repeated ``257 - n`` times. Runs of three or more
+    equal bytes (long white stretches on e-ink frames) become repeat packets.
+    """
+    out = bytearray()
+    view = memoryview(data)
+
+    def literal(start: int, end: int) -> None:
+        for i in range(start, end, 128):
+            chunk = view[i:min(i + 128, end)]
+            out.append(len(chunk) - 1)
+            out.extend(chunk)
+
+    pos = 0
+    for match in _RUN.finditer(data):
+        literal(pos, match.start())
+        value = data[match.start()]
+        remaining = match.end() - match.start()
+        while remaining >= 2:
+            count = min(remaining, 128)
+            out += bytes((257 - count, value))
+            remaining -= count
+        if remaining:
+            out += bytes((0, value))
+        pos = match.end()
+    literal(pos, len(data))
+    return bytes(out)
+
+
+def unpackbits(data: bytes) -> bytes:
+    """Inverse of :func:`packbits`."""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        n = data[i]
+        if n < 128:
+            out += data[i + 1:i + 2 + n]
+            i += 2 + n
+        elif n > 128:
+            out += data[i + 1:i + 2] * (257 - n)
+            i += 2
+        else:
+            i += 1
+    return bytes(out)
+
+
+def decode_raw1(data: bytes) -> tuple[int, int, bytes]:
+    """Parse a raw1 response into ``(width, height, top-down rows)``."""
+    magic, width, height, encoding, _, length = RAW1_HEADER.unpack_from(data, 0)
+    if magic != RAW1_MAGIC:
+        raise ValueError(f"not a raw1 frame (magic={magic!r})")
+    body = bytes(data[RAW1_HEADER.size:RAW1_HEADER.size + length])
+    if len(body) != length:
+        raise ValueError("truncated raw1 frame")
+    if encoding == RAW1_PACKBITS:
+        body = unpackbits(body)
+    elif encoding != RAW1_PLAIN:
+        raise ValueError(f"unknown raw1 encoding {encoding}")
+    if len(body) != (width + 7) // 8 * height:
+        raise ValueError("raw1 frame size does not match its header")
+    return width, height, body
+
+
+def is_legacy_payload(data: bytes) -> bool:
+    return bytes(data[:len(_PNG_SIGNATURE)]) == _PNG_SIGNATURE
+
+
+@dataclass(frozen=True)
+class Frame:
+    """An immutable rendered frame held as ready-to-send BMP bytes.
+
+    ``bmp`` is byte-identical to ``image_to_bmp_bytes(img)``: the header
+    from :func:`bmp_header` followed by bottom-up, 4-byte aligned rows.
+    ``etag`` is a strong validator derived from those bytes.
+    """
+    width: int
+    height: int
+    bmp: bytes
+    etag: str = field(default="", compare=False)
+
+    def __post_init__(self):
+        if not self.etag:
+            digest = hashlib.blake2b(self.bmp, digest_size=16).hexdigest()
+            object.__setattr__(self, "etag", f'"{digest}"')
+
+    @property
+    def content_hash(self) -> str:
+        """The ETag's digest without quotes, as sent in ``X-InkSight-Hash``."""
+        return self.etag.strip('"')
+
+    @classmethod
+    def from_image(cls, img: Image.Image) -> Frame:
+        if img.mode != "1":
+            img = img.convert("1")
+        width, height = img.size
+        pixels = img.tobytes("raw", "1", bmp_stride(width), -1)
+        return cls(width, height, bmp_header(width, height) + pixels)
+
+    @classmethod
+    def from_payload(cls, data: bytes) -> Frame:
+        """Decode a cache payload; legacy PNG rows are converted on the fly."""
+        if is_legacy_payload(data):
+            img = Image.open(io.BytesIO(data))
+            img.load()
+            return cls.from_image(img)
+        magic, version, width, height = _PAYLOAD_HEADER.unpack_from(data, 0)
+        if magic != PAYLOAD_MAGIC or version != PAYLOAD_VERSION:
+            raise ValueError(f"unsupported frame payload (magic={magic!r}, version={version})")
+        bmp = bytes(data[_PAYLOAD_HEADER.size:])
+        if len(bmp) != len(bmp_header(width, height)) + bmp_stride(width) * height:
+            raise ValueError("truncated frame payload")
+        return cls(width, height, bmp)
+
+    def to_payload(self) -> bytes:
+        return _PAYLOAD_HEADER.pack(PAYLOAD_MAGIC, PAYLOAD_VERSION, self.width, self.height) + self.bmp
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def pixels(self) -> memoryview:
+        """The bottom-up 1-bpp pixel rows, without copying."""
+        return memoryview(self.bmp)[len(bmp_header(self.width, self.height)):]
+
+    def to_image(self) -> Image.Image:
+        return Image.frombytes(
+            "1", self.size, bytes(self.pixels), "raw", "1", bmp_stride(self.width), -1,
+        )
+
+    @property
+    def rows(self) -> bytes:
+        """Top-down 1-bpp rows of ``ceil(width / 8)`` bytes, the panel's own layout."""
+        return frame_encodings.get(self, "rows", self._build_rows)
+
+    @property
+    def raw1(self) -> bytes:
+        return frame_encodings.get(self, "raw1", lambda: self._raw1(RAW1_PLAIN, self.rows))
+
+    @property
+    def raw1_rle(self) -> bytes:
+        return frame_encodings.get(
+            self, "raw1rle", lambda: self._raw1(RAW1_PACKBITS, packbits(self.rows)),
+        )
+
+    def _build_rows(self) -> bytes:
+        stride = bmp_stride(self.width)
+        row_bytes = (self.width + 7) // 8
+        pixels = self.pixels
+        return b"".join(
+            pixels[y * stride:y * stride + row_bytes] for y in range(self.height - 1, -1, -1)
+        )
+
+    def _raw1(self, encoding: int, body: bytes) -> bytes:
+        header = RAW1_HEADER.pack(RAW1_MAGIC, self.width, self.height, encoding, 0, len(body))
+        return header + body
+
+    def encode(self, fmt: str = "bmp") -> bytes:
+        """Response body for a ``fmt`` in :data:`RENDER_FORMATS`; see :class:`EncodingCache`."""
+        if fmt == "bmp":
+            return self.bmp
+        if fmt == "raw1":
+            return self.raw1
+        if fmt == "raw1rle":
+            return self.raw1_rle
+        raise ValueError(f"unknown frame format {fmt!r}")
+
+
+class EncodingCache:
+    """Derived frame encodings keyed by ``(etag, kind)``, an LRU bounded by
+    total bytes.
+
+    Frames held by the render cache and the delta history stay at their BMP
+    size, which is what those caches account for; rows and raw1 bodies live
+    here under their own ``max_bytes``. Frames with equal pixels share
+    entries.
+    """
+
+    def __init__(self, max_bytes: int = FRAME_ENCODING_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, frame: Frame, kind: str, build: Callable[[], bytes]) -> bytes:
+        key = (frame.etag, kind)
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = build()
+        if len(data) <= self.max_bytes:
+            self._entries[key] = data
+            self.resident_bytes += len(data)
+            while self.resident_bytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.resident_bytes -= len(old)
+                self.evictions += 1
+        return data
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.resident_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Global encoding cache instance
+frame_encodings = EncodingCache()
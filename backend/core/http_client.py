@@ -0,0 +1,141 @@
+"""
+共享出站 HTTP 客户端
+天气、节假日、HN / PH / V2EX、图片预取与固件查询共用一个带连接池的
+httpx.AsyncClient，由应用 lifespan 创建和关闭，按主机限制并发连接数。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+
+from .config import (
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_PER_HOST,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+# Closes of clients left behind by another loop; held so they are not collected
+_closing: set[asyncio.Task] = set()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slot: asyncio.Semaphore) -> None:
+        self._stream = stream
+        self._slot: asyncio.Semaphore | None = slot
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._slot is not None:
+                self._slot.release()
+                self._slot = None
+
+
+class _HostLimitedTransport(httpx.AsyncHTTPTransport):
+    """Pooled transport that also caps in-flight requests per host.
+
+    A slot is held from sending the request until its body is closed.
+    Waiting for a slot counts against the request's pool timeout, like
+    waiting for a pooled connection does.
+    """
+
+    def __init__(self, max_per_host: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.max_per_host = max(1, max_per_host)
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.max_per_host)
+        pool_timeout = request.extensions.get("timeout", {}).get("pool")
+        try:
+            await asyncio.wait_for(slot.acquire(), pool_timeout)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"No free slot for {host} within {pool_timeout}s", request=request) from None
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slot)
+        return response
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        transport=_HostLimitedTransport(
+            HTTP_MAX_PER_HOST,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+            ),
+        ),
+        headers={"User-Agent": "InkSight"},
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client for the running loop.
+
+    Normally opened by the app lifespan; code running outside it (scripts,
+    tests) gets one created on first use.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # A client from another loop holds connections that loop owned; close it
+        if _client is not None and not _client.is_closed:
+            _close_stale(_client, _client_loop, loop)
+        _client = create_http_client()
+        _client_loop = loop
+    return _client
+
+
+def _close_stale(
+    client: httpx.AsyncClient,
+    owner: asyncio.AbstractEventLoop | None,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    """Schedule ``client.aclose()`` on its own loop if that still runs, else here."""
+
+    async def close() -> None:
+        try:
+            await client.aclose()
+        except Exception:
+            logger.debug("[HTTP] Failed to close stale client", exc_info=True)
+
+    if owner is not None and owner is not loop and owner.is_running() and not owner.is_closed():
+        asyncio.run_coroutine_threadsafe(close(), owner)
+        return
+    task = loop.create_task(close())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
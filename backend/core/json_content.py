@@ -15,6 +15,7 @@ import httpx
 
 from .config import DEFAULT_LLM_PROVIDER, DEFAULT_LLM_MODEL
 from .content import _build_context_str, _build_style_instructions, _call_llm, _clean_json_response
+from .http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,9 @@ def _collect_image_fields(blocks: list, fields: set):
                 _collect_image_fields(children, fields)
 
 
-async def _prefetch_images(content: dict, mode_def: dict) -> dict:
+async def _prefetch_images(
+    content: dict, mode_def: dict, client: httpx.AsyncClient | None = None,
+) -> dict:
     """Pre-fetch any image URLs referenced by the layout into content dict."""
     layout = mode_def.get("layout", {})
     body_blocks = layout.get("body", [])
@@ -42,16 +45,16 @@ async def _prefetch_images(content: dict, mode_def: dict) -> dict:
     if not image_fields:
         return content
 
-    async with httpx.AsyncClient(timeout=12.0, follow_redirects=True) as client:
-        for field_name in image_fields:
-            url = content.get(field_name)
-            if url and isinstance(url, str) and url.startswith("http"):
-                try:
-                    resp = await client.get(url)
-                    if resp.status_code < 400:
-                        content[f"_prefetched_{field_name}"] = resp.content
-                except Exception:
-                    pass  # Renderer will show placeholder
+    client = client or get_http_client()
+    for field_name in image_fields:
+        url = content.get(field_name)
+        if url and isinstance(url, str) and url.startswith("http"):
+            try:
+                resp = await client.get(url, timeout=12.0, follow_redirects=True)
+                if resp.status_code < 400:
+                    content[f"_prefetched_{field_name}"] = resp.content
+            except Exception:
+                pass  # Renderer will show placeholder
     return content
 
 
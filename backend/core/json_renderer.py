@@ -7,12 +7,13 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass, field
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 
 import httpx
 from PIL import Image, ImageDraw
 
-from .config import SCREEN_WIDTH, SCREEN_HEIGHT
+from .config import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_SIZES
 from .patterns.utils import (
     EINK_BG,
     EINK_FG,
@@ -43,6 +44,10 @@ class RenderContext:
     x_offset: int = 0
     available_width: int = SCREEN_WIDTH
     footer_height: int = 30
+    # Measure-only contexts advance ``y`` without drawing; ``layouts`` memoises
+    # wrapped text (and fetched images) so the draw pass can reuse them.
+    measure_only: bool = False
+    layouts: dict = field(default_factory=dict)
 
     @property
     def scale(self) -> float:
@@ -78,11 +83,161 @@ class RenderContext:
     def get_field(self, name: str) -> Any:
         return self.content.get(name, "")
 
+    def wrap(self, text: str, font, max_width: int) -> list[str]:
+        """``wrap_text`` memoised for the lifetime of this render."""
+        key = (id(font), max_width, text)
+        hit = self.layouts.get(key)
+        if hit is None:
+            # Keep the font referenced so its id() stays unique while cached.
+            hit = self.layouts[key] = (font, wrap_text(text, font, max_width))
+        return hit[1]
+
+    def child(self, *, x_offset: int, available_width: int) -> RenderContext:
+        """Sub-context for a column, sharing canvas, mode and layout memo."""
+        return RenderContext(
+            draw=self.draw, img=self.img, content=self.content,
+            screen_w=self.screen_w, screen_h=self.screen_h, y=self.y,
+            x_offset=x_offset, available_width=available_width,
+            footer_height=self.footer_height,
+            measure_only=self.measure_only, layouts=self.layouts,
+        )
+
     @property
     def remaining_height(self) -> int:
         return self.footer_top - self.y
 
 
+# ── Compiled layout plans ────────────────────────────────────
+
+
+BlockRenderer = Callable[[RenderContext, "BlockPlan"], None]
+
+
+@dataclass(frozen=True)
+class _Frame:
+    """Static geometry a block is laid out in (mirrors RenderContext)."""
+    screen_w: int
+    screen_h: int
+    x_offset: int = 0
+    available_width: int = SCREEN_WIDTH
+
+    def __post_init__(self):
+        if self.available_width == SCREEN_WIDTH and self.screen_w != SCREEN_WIDTH:
+            object.__setattr__(self, "available_width", self.screen_w)
+
+    @property
+    def scale(self) -> float:
+        return self.screen_w / 400.0
+
+    @property
+    def min_scale(self) -> float:
+        return min(self.scale, self.screen_h / 300.0)
+
+
+@dataclass(frozen=True)
+class BlockPlan:
+    """One layout block compiled for a fixed screen size.
+
+    ``metrics`` holds scaled sizes, margins and pre-resolved fonts/icons;
+    ``render`` is the bound block renderer. Only content-dependent work
+    (field lookup, wrapping, drawing) is left for render time.
+    """
+    type: str
+    render: BlockRenderer
+    metrics: Mapping[str, Any]
+    children: tuple[BlockPlan, ...] = ()
+    left: tuple[BlockPlan, ...] = ()
+    right: tuple[BlockPlan, ...] = ()
+    branches: tuple[tuple[str, Any, tuple[BlockPlan, ...]], ...] = ()
+    fallback: tuple[BlockPlan, ...] = ()
+
+
+@dataclass(frozen=True)
+class LayoutPlan:
+    """A JSON mode definition compiled for one screen size."""
+    mode_id: str
+    screen_w: int
+    screen_h: int
+    body: tuple[BlockPlan, ...]
+    body_mode: str  # "full_center" | "center" | "top"
+    status_bar_bottom: int
+    footer_height: int
+    status_line_width: int = 1
+    status_dashed: bool = False
+    footer_label: str = ""
+    footer_attribution_template: str = ""
+    footer_attr_font_size: int | None = None
+    footer_line_width: int = 1
+    footer_dashed: bool = False
+
+    @property
+    def footer_top(self) -> int:
+        return self.screen_h - self.footer_height
+
+
+def compile_layout(mode_def: dict, screen_w: int = SCREEN_WIDTH, screen_h: int = SCREEN_HEIGHT) -> LayoutPlan:
+    """Compile a mode definition into an immutable render plan for one screen size."""
+    layout = mode_def.get("layout", {})
+    overrides = mode_def.get("layout_overrides", {})
+    size_key = f"{screen_w}x{screen_h}"
+    if size_key in overrides:
+        layout = {**layout, **overrides[size_key]}
+
+    frame = _Frame(screen_w, screen_h)
+    sb = layout.get("status_bar", {})
+    ft = layout.get("footer", {})
+    status_bar_pct = 0.10 if screen_h < 200 else 0.12
+    footer_height = int(ft.get("height", 30) * frame.min_scale)
+
+    body = layout.get("body", [])
+    has_vcenter = any(
+        b.get("type") == "centered_text" and b.get("vertical_center", True)
+        for b in body
+    )
+    if has_vcenter and len(body) == 1:
+        body_mode = "full_center"
+    elif layout.get("body_align", "center") == "center" and body:
+        body_mode = "center"
+    else:
+        body_mode = "top"
+
+    attr_font_size = ft.get("font_size")
+    if attr_font_size is not None:
+        attr_font_size = int(attr_font_size * frame.scale)
+
+    return LayoutPlan(
+        mode_id=mode_def.get("mode_id", ""),
+        screen_w=screen_w,
+        screen_h=screen_h,
+        body=_compile_blocks(body, frame),
+        body_mode=body_mode,
+        status_bar_bottom=int(screen_h * status_bar_pct),
+        footer_height=footer_height,
+        status_line_width=sb.get("line_width", 1),
+        status_dashed=sb.get("dashed", False),
+        footer_label=ft.get("label", mode_def.get("mode_id", "")),
+        footer_attribution_template=ft.get("attribution_template", "") or "",
+        footer_attr_font_size=attr_font_size,
+        footer_line_width=ft.get("line_width", 1),
+        footer_dashed=ft.get("dashed", False),
+    )
+
+
+def _compile_blocks(blocks: list, frame: _Frame) -> tuple[BlockPlan, ...]:
+    return tuple(_compile_block(b, frame) for b in blocks or [])
+
+
+def _compile_block(block: dict, frame: _Frame) -> BlockPlan:
+    btype = block.get("type", "")
+    entry = _BLOCK_TYPES.get(btype)
+    if entry is None:
+        return BlockPlan(type=btype, render=_render_unknown, metrics=MappingProxyType({}))
+    compile_fn, render_fn = entry
+    fields = compile_fn(block, frame)
+    metrics = MappingProxyType(fields.pop("metrics"))
+    return BlockPlan(type=btype, render=render_fn, metrics=metrics, **fields)
+
+
 # ── Public API ───────────────────────────────────────────────
 
 
@@ -97,161 +252,234 @@ def render_json_mode(
     time_str: str = "",
     screen_w: int = SCREEN_WIDTH,
     screen_h: int = SCREEN_HEIGHT,
+    plan: LayoutPlan | None = None,
 ) -> Image.Image:
-    """Render a JSON-defined mode to a 1-bit e-ink image."""
+    """Render a JSON-defined mode to a 1-bit e-ink image.
+
+    Pass a precompiled ``plan`` (see ``ModeRegistry.get_layout_plan``) to
+    skip layout compilation; otherwise ``mode_def`` is compiled on the fly.
+    """
+    if plan is None:
+        plan = compile_layout(mode_def, screen_w, screen_h)
+    screen_w, screen_h = plan.screen_w, plan.screen_h
     img = Image.new("1", (screen_w, screen_h), EINK_BG)
     draw = ImageDraw.Draw(img)
-    layout = mode_def.get("layout", {})
-
-    # Select screen-size-specific layout override if available
-    overrides = mode_def.get("layout_overrides", {})
-    size_key = f"{screen_w}x{screen_h}"
-    if size_key in overrides:
-        layout = {**layout, **overrides[size_key]}
 
     # 1. Status bar
-    sb = layout.get("status_bar", {})
     draw_status_bar(
         draw, img, date_str, weather_str, int(battery_pct), weather_code,
-        line_width=sb.get("line_width", 1),
-        dashed=sb.get("dashed", False),
+        line_width=plan.status_line_width,
+        dashed=plan.status_dashed,
         time_str=time_str,
         screen_w=screen_w, screen_h=screen_h,
     )
 
-    ft_layout = layout.get("footer", {})
-    status_bar_pct = 0.10 if screen_h < 200 else 0.12
-    status_bar_bottom = int(screen_h * status_bar_pct)
-    scale = screen_w / 400.0
-    min_scale = min(scale, screen_h / 300.0)
-    footer_height = int(ft_layout.get("height", 30) * min_scale)
-    footer_top = screen_h - footer_height
-
-    # 2. Body blocks
-    body = layout.get("body", [])
-    body_align = layout.get("body_align", "center")
-    _has_vcenter = any(
-        b.get("type") == "centered_text" and b.get("vertical_center", True)
-        for b in body
-    )
+    status_bar_bottom = plan.status_bar_bottom
+    footer_top = plan.footer_top
 
-    if _has_vcenter and len(body) == 1:
-        ctx = RenderContext(
+    def _ctx(y: int, **kwargs) -> RenderContext:
+        return RenderContext(
             draw=draw, img=img, content=content,
             screen_w=screen_w, screen_h=screen_h,
-            y=status_bar_bottom, footer_height=footer_height,
-        )
-        _render_centered_text(ctx, body[0], use_full_body=True)
-    elif body_align == "center" and body:
-        measure_img = Image.new("1", (screen_w, screen_h), EINK_BG)
-        measure_ctx = RenderContext(
-            draw=ImageDraw.Draw(measure_img), img=measure_img, content=content,
-            screen_w=screen_w, screen_h=screen_h,
-            y=status_bar_bottom, footer_height=footer_height,
+            y=y, footer_height=plan.footer_height, **kwargs,
         )
-        for block in body:
-            if measure_ctx.y >= footer_top - 10:
-                break
-            _render_block(measure_ctx, block)
+
+    # 2. Body blocks
+    if plan.body_mode == "full_center":
+        ctx = _ctx(status_bar_bottom)
+        _render_centered_text(ctx, plan.body[0], use_full_body=True)
+    elif plan.body_mode == "center":
+        # Measure pass: lay out without drawing, keeping wrapped lines for reuse
+        measure_ctx = _ctx(status_bar_bottom, measure_only=True)
+        _render_children(measure_ctx, plan.body)
         content_height = measure_ctx.y - status_bar_bottom
         available_height = footer_top - status_bar_bottom
         offset = max(0, (available_height - content_height) // 2)
 
-        ctx = RenderContext(
-            draw=draw, img=img, content=content,
-            screen_w=screen_w, screen_h=screen_h,
-            y=status_bar_bottom + offset, footer_height=footer_height,
-        )
-        for block in body:
-            if ctx.y >= footer_top - 10:
-                break
-            _render_block(ctx, block)
+        ctx = _ctx(status_bar_bottom + offset, layouts=measure_ctx.layouts)
+        _render_children(ctx, plan.body)
     else:
-        ctx = RenderContext(
-            draw=draw, img=img, content=content,
-            screen_w=screen_w, screen_h=screen_h,
-            y=status_bar_bottom, footer_height=footer_height,
-        )
-        for block in body:
-            if ctx.y >= footer_top - 10:
-                break
-            _render_block(ctx, block)
+        ctx = _ctx(status_bar_bottom)
+        _render_children(ctx, plan.body)
 
     # 3. Footer
-    ft = ft_layout
-    label = ft.get("label", mode_def.get("mode_id", ""))
-    attribution = ctx.resolve(ft.get("attribution_template", "")) if ft.get("attribution_template") else ""
-    _attr_font_size = ft.get("font_size")
-    if _attr_font_size is not None:
-        _attr_font_size = int(_attr_font_size * scale)
+    template = plan.footer_attribution_template
+    attribution = ctx.resolve(template) if template else ""
     draw_footer(
-        draw, img, label, attribution,
-        line_width=ft.get("line_width", 1),
-        dashed=ft.get("dashed", False),
-        attr_font_size=_attr_font_size,
+        draw, img, plan.footer_label, attribution,
+        line_width=plan.footer_line_width,
+        dashed=plan.footer_dashed,
+        attr_font_size=plan.footer_attr_font_size,
         screen_w=screen_w, screen_h=screen_h,
     )
 
     return img
 
 
-# ── Block dispatcher ─────────────────────────────────────────
+# ── Font warm-up ─────────────────────────────────────────────
 
 
-_BLOCK_RENDERERS: dict[str, Any] = {}
+def _iter_child_blocks(block: dict):
+    for key in ("children", "left", "right", "fallback_children"):
+        yield from block.get(key, []) or []
+    for cond in block.get("conditions", []) or []:
+        yield from cond.get("children", []) or []
 
 
-def _render_block(ctx: RenderContext, block: dict) -> None:
+def _iter_screen_layouts(mode_def: dict, screen_sizes: list[tuple[int, int]] | None = None):
+    """Yield (w, h, layout) for the default size(s) and each layout_overrides size."""
+    overrides = mode_def.get("layout_overrides", {})
+    sizes = set(screen_sizes or [(SCREEN_WIDTH, SCREEN_HEIGHT)])
+    for size_key in overrides:
+        try:
+            w, h = (int(v) for v in size_key.split("x"))
+        except ValueError:
+            continue
+        sizes.add((w, h))
+    for w, h in sorted(sizes):
+        layout = mode_def.get("layout", {})
+        override = overrides.get(f"{w}x{h}")
+        if override:
+            layout = {**layout, **override}
+        yield w, h, layout
+
+
+def warm_font_cache(mode_defs: list[dict], screen_sizes: list[tuple[int, int]] | None = None) -> int:
+    """Pre-load the fonts the given mode definitions render with.
+
+    Compiling a plan resolves every body font; the status bar and footer
+    fonts are loaded alongside. Covers the default screen size plus each
+    ``layout_overrides`` size. Returns the number of (mode, size) layouts.
+    """
+    count = 0
+    for mode_def in mode_defs:
+        for w, h, layout in _iter_screen_layouts(mode_def, screen_sizes):
+            compile_layout(mode_def, w, h)
+            scale = w / 400.0
+            load_font("noto_serif_extralight", int(FONT_SIZES["status_bar"]["cn"] * scale))
+            load_font("inter_medium", int(FONT_SIZES["status_bar"]["en"] * scale))
+            load_font("inter_medium", int(FONT_SIZES["footer"]["label"] * scale))
+            attr_size = layout.get("footer", {}).get("font_size", FONT_SIZES["footer"]["attribution"])
+            load_font("noto_serif_light", int(attr_size * scale))
+            load_font("lora_regular", int(attr_size * scale))
+            count += 1
+    return count
+
+
+def _collect_block_icon_sizes(block: dict, scale: float, out: set) -> None:
     btype = block.get("type", "")
-    renderer = _BLOCK_RENDERERS.get(btype)
-    if renderer:
-        renderer(ctx, block)
-    else:
-        logger.warning(f"[JSONRenderer] Unknown block type: {btype}")
+    if btype in ("section", "icon_list"):
+        side = int(12 * scale)
+        out.add((side, side))
+    elif btype == "icon_text":
+        side = int(block.get("icon_size", 12) * scale)
+        out.add((side, side))
+    for child in _iter_child_blocks(block):
+        _collect_block_icon_sizes(child, scale, out)
+
+
+def collect_icon_sizes(mode_defs: list[dict], screen_sizes: list[tuple[int, int]] | None = None) -> list[tuple[int, int]]:
+    """Icon pixel sizes the given mode definitions paste at."""
+    sizes: set = set()
+    for mode_def in mode_defs:
+        for w, _h, layout in _iter_screen_layouts(mode_def, screen_sizes):
+            for block in layout.get("body", []):
+                _collect_block_icon_sizes(block, w / 400.0, sizes)
+    return sorted(sizes)
+
+
+# ── Block dispatcher ─────────────────────────────────────────
+
+
+_BLOCK_TYPES: dict[str, tuple[Callable[[dict, _Frame], dict], BlockRenderer]] = {}
+
+
+def _render_children(ctx: RenderContext, plans: tuple[BlockPlan, ...], *, stop_at_footer: bool = True) -> None:
+    for child in plans:
+        if stop_at_footer and ctx.y >= ctx.footer_top - 10:
+            break
+        child.render(ctx, child)
+
+
+def _render_unknown(ctx: RenderContext, plan: BlockPlan) -> None:
+    logger.warning(f"[JSONRenderer] Unknown block type: {plan.type}")
+
+
+def _margin(block: dict, frame: _Frame, base: int, ratio: float) -> int:
+    """Scaled ``margin_x`` if set, else ``base * ratio``."""
+    raw = block.get("margin_x")
+    if raw is not None:
+        return int(raw * frame.scale)
+    return int(base * ratio)
+
+
+def _font_pair(font_key: str, size: int) -> dict:
+    """Latin and CJK variants of a font key, resolved up front."""
+    return {
+        "font": load_font(font_key, size),
+        "cjk_font": load_font(_pick_cjk_font(font_key), size),
+    }
 
 
 # ── Block implementations ────────────────────────────────────
 
 
-def _render_centered_text(ctx: RenderContext, block: dict, *, use_full_body: bool = False) -> None:
-    field_name = block.get("field", "text")
-    text = str(ctx.get_field(field_name))
+def _compile_centered_text(block: dict, f: _Frame) -> dict:
+    font_size = int(block.get("font_size", 16) * f.scale)
+    font_name = block.get("font_name")
+    if font_name:
+        cjk_name = font_name if "Noto" in font_name else "NotoSerifSC-Light.ttf"
+        font_src = ("name", font_name, cjk_name)
+    else:
+        font_src = ("key", block.get("font", "noto_serif_light"), "noto_serif_light")
+    return {"metrics": {
+        "field": block.get("field", "text"),
+        "font_size": font_size,
+        "font_src": font_src,
+        "font": _load_font_source(font_src, False, font_size),
+        "cjk_font": _load_font_source(font_src, True, font_size),
+        "max_w": int(f.available_width * block.get("max_width_ratio", 0.88)),
+        "line_spacing": int(block.get("line_spacing", 8) * f.scale),
+        "vertical_center": block.get("vertical_center", True),
+    }}
+
+
+def _load_font_source(src: tuple[str, str, str], cjk: bool, size: int):
+    kind, latin, cjk_variant = src
+    name = cjk_variant if cjk else latin
+    return load_font_by_name(name, size) if kind == "name" else load_font(name, size)
+
+
+def _render_centered_text(ctx: RenderContext, plan: BlockPlan, *, use_full_body: bool = False) -> None:
+    m = plan.metrics
+    text = str(ctx.get_field(m["field"]))
     if not text:
         return
 
-    font_size = int(block.get("font_size", 16) * ctx.scale)
-    font_name = block.get("font_name")
-    font_key = block.get("font", "noto_serif_light")
-    max_ratio = block.get("max_width_ratio", 0.88)
-    line_spacing = int(block.get("line_spacing", 8) * ctx.scale)
+    cjk = has_cjk(text)
+    font_size = m["font_size"]
+    font = m["cjk_font"] if cjk else m["font"]
+    line_spacing = m["line_spacing"]
+    fit_body = use_full_body and m["vertical_center"]
 
     body_height = ctx.footer_top - ctx.y
-    max_w = int(ctx.available_width * max_ratio)
-    while font_size >= 10:
-        if font_name:
-            if has_cjk(text) and "Noto" not in font_name:
-                font_name = "NotoSerifSC-Light.ttf"
-            font = load_font_by_name(font_name, font_size)
-        else:
-            if has_cjk(text):
-                font_key = "noto_serif_light"
-            font = load_font(font_key, font_size)
-
-        lines = wrap_text(text, font, max_w)
+    while True:
+        lines = ctx.wrap(text, font, m["max_w"])
         line_h = font_size + line_spacing
         total_h = len(lines) * line_h
 
-        if use_full_body and block.get("vertical_center", True) and total_h > body_height:
+        if fit_body and total_h > body_height and font_size - 2 >= 10:
             font_size -= 2
+            font = _load_font_source(m["font_src"], cjk, font_size)
         else:
             break
 
-    if use_full_body and block.get("vertical_center", True):
+    if fit_body:
         y_start = ctx.y + (body_height - total_h) // 2
     else:
         y_start = ctx.y
 
-    for i, line in enumerate(lines):
+    for i, line in enumerate(lines if not ctx.measure_only else ()):
         bbox = font.getbbox(line)
         lw = bbox[2] - bbox[0]
         x = ctx.x_offset + (ctx.available_width - lw) // 2
@@ -260,35 +488,39 @@ def _render_centered_text(ctx: RenderContext, block: dict, *, use_full_body: boo
     ctx.y = y_start + total_h + 4
 
 
-def _render_text(ctx: RenderContext, block: dict) -> None:
-    template = block.get("template", "")
-    field_name = block.get("field")
-    if field_name:
-        text = str(ctx.get_field(field_name))
-    elif template:
-        text = ctx.resolve(template)
+def _compile_text(block: dict, f: _Frame) -> dict:
+    font_size = int(block.get("font_size", 14) * f.scale)
+    margin_x = _margin(block, f, f.screen_w, 0.06)
+    return {"metrics": {
+        "field": block.get("field"),
+        "template": block.get("template", ""),
+        "font_size": font_size,
+        **_font_pair(block.get("font", "noto_serif_regular"), font_size),
+        "align": block.get("align", "center"),
+        "margin_x": margin_x,
+        "max_lines": block.get("max_lines", 3),
+        "max_w": max(20, f.available_width - margin_x * 2),
+    }}
+
+
+def _render_text(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    if m["field"]:
+        text = str(ctx.get_field(m["field"]))
+    elif m["template"]:
+        text = ctx.resolve(m["template"])
     else:
         return
 
     if not text:
         return
 
-    font_size = int(block.get("font_size", 14) * ctx.scale)
-    font_key = block.get("font", "noto_serif_regular")
-    if has_cjk(text):
-        font_key = _pick_cjk_font(font_key)
-    font = load_font(font_key, font_size)
-
-    align = block.get("align", "center")
-    margin_x = block.get("margin_x")
-    if margin_x is not None:
-        margin_x = int(margin_x * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.06)
-    max_lines = block.get("max_lines", 3)
-    max_w = max(20, ctx.available_width - margin_x * 2)
+    font = m["cjk_font"] if has_cjk(text) else m["font"]
+    align = m["align"]
+    margin_x = m["margin_x"]
+    max_lines = m["max_lines"]
 
-    lines = wrap_text(text, font, max_w)
+    lines = ctx.wrap(text, font, m["max_w"])
 
     if max_lines and len(lines) > max_lines:
         lines = lines[:max_lines]
@@ -298,103 +530,136 @@ def _render_text(ctx: RenderContext, block: dict) -> None:
     for line in lines:
         if ctx.y >= ctx.footer_top - 10:
             break
-        bbox = font.getbbox(line)
-        lw = bbox[2] - bbox[0]
-        if align == "center":
-            x = ctx.x_offset + (ctx.available_width - lw) // 2
-        elif align == "right":
-            x = ctx.x_offset + ctx.available_width - margin_x - lw
-        else:
-            x = ctx.x_offset + margin_x
-        ctx.draw.text((x, ctx.y), line, fill=EINK_FG, font=font)
-        ctx.y += font_size + 6
-
-
-def _render_separator(ctx: RenderContext, block: dict) -> None:
+        if not ctx.measure_only:
+            bbox = font.getbbox(line)
+            lw = bbox[2] - bbox[0]
+            if align == "center":
+                x = ctx.x_offset + (ctx.available_width - lw) // 2
+            elif align == "right":
+                x = ctx.x_offset + ctx.available_width - margin_x - lw
+            else:
+                x = ctx.x_offset + margin_x
+            ctx.draw.text((x, ctx.y), line, fill=EINK_FG, font=font)
+        ctx.y += m["font_size"] + 6
+
+
+def _compile_separator(block: dict, f: _Frame) -> dict:
     style = block.get("style", "solid")
-    margin_x = block.get("margin_x")
-    if margin_x is not None:
-        margin_x = int(margin_x * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.06)
-    line_width = block.get("line_width", 1)
-
     if style == "short":
-        w = int(block.get("width", 60) * ctx.scale)
-        x0 = ctx.x_offset + (ctx.available_width - w) // 2
-        ctx.draw.line([(x0, ctx.y), (x0 + w, ctx.y)], fill=EINK_FG, width=line_width)
-    elif style == "dashed":
-        draw_dashed_line(ctx.draw, (ctx.x_offset + margin_x, ctx.y), (ctx.x_offset + ctx.available_width - margin_x, ctx.y),
-                         fill=EINK_FG, width=line_width)
+        w = int(block.get("width", 60) * f.scale)
+        x0 = f.x_offset + (f.available_width - w) // 2
+        x1 = x0 + w
+    else:
+        margin_x = _margin(block, f, f.screen_w, 0.06)
+        x0 = f.x_offset + margin_x
+        x1 = f.x_offset + f.available_width - margin_x
+    return {"metrics": {
+        "style": style,
+        "x0": x0,
+        "x1": x1,
+        "line_width": block.get("line_width", 1),
+    }}
+
+
+def _render_separator(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    x0, x1, line_width = m["x0"], m["x1"], m["line_width"]
+    if ctx.measure_only:
+        pass
+    elif m["style"] == "dashed":
+        draw_dashed_line(ctx.draw, (x0, ctx.y), (x1, ctx.y), fill=EINK_FG, width=line_width)
     else:
-        ctx.draw.line([(ctx.x_offset + margin_x, ctx.y), (ctx.x_offset + ctx.available_width - margin_x, ctx.y)],
-                      fill=EINK_FG, width=line_width)
+        ctx.draw.line([(x0, ctx.y), (x1, ctx.y)], fill=EINK_FG, width=line_width)
     ctx.y += 8 + line_width
 
 
-def _render_section(ctx: RenderContext, block: dict) -> None:
+def _compile_section(block: dict, f: _Frame) -> dict:
     title = block.get("title", "")
-    icon_name = block.get("icon")
     title_font_key = block.get("title_font", "noto_serif_regular")
-    title_font_size = int(block.get("title_font_size", 14) * ctx.scale)
-
+    title_font_size = int(block.get("title_font_size", 14) * f.scale)
     if has_cjk(title):
         title_font_key = _pick_cjk_font(title_font_key)
-    font = load_font(title_font_key, title_font_size)
-
-    margin_x = int(ctx.screen_w * 0.06)
-    x = ctx.x_offset + margin_x
-    icon_size = int(12 * ctx.scale)
-    if icon_name:
-        icon_img = load_icon(icon_name, size=(icon_size, icon_size))
-        if icon_img:
-            ctx.img.paste(icon_img, (x, ctx.y))
-            x += int(16 * ctx.scale)
-
-    ctx.draw.text((x, ctx.y), title, fill=EINK_FG, font=font)
-    ctx.y += title_font_size + int(6 * ctx.scale)
-
-    for child in block.get("children", []):
-        if ctx.y >= ctx.footer_top - 10:
-            break
-        _render_block(ctx, child)
-
-
-def _render_list(ctx: RenderContext, block: dict) -> None:
-    field_name = block.get("field", "")
-    items = ctx.get_field(field_name)
+    icon_name = block.get("icon")
+    icon_size = int(12 * f.scale)
+    return {
+        "metrics": {
+            "title": title,
+            "font": load_font(title_font_key, title_font_size),
+            "icon": load_icon(icon_name, size=(icon_size, icon_size)) if icon_name else None,
+            "icon_advance": int(16 * f.scale),
+            "margin_x": int(f.screen_w * 0.06),
+            "advance": title_font_size + int(6 * f.scale),
+        },
+        "children": _compile_blocks(block.get("children", []), f),
+    }
+
+
+def _render_section(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    if not ctx.measure_only:
+        x = ctx.x_offset + m["margin_x"]
+        if m["icon"]:
+            ctx.img.paste(m["icon"], (x, ctx.y))
+            x += m["icon_advance"]
+        ctx.draw.text((x, ctx.y), m["title"], fill=EINK_FG, font=m["font"])
+    ctx.y += m["advance"]
+
+    _render_children(ctx, plan.children)
+
+
+def _compile_list(block: dict, f: _Frame) -> dict:
+    font_key = _pick_cjk_font(block.get("font", "noto_serif_regular"))
+    margin_x = _margin(block, f, f.screen_w, 0.08)
+    right_field = block.get("right_field")
+    right_col_w = int(80 * f.scale)
+    return {"metrics": {
+        "field": block.get("field", ""),
+        "max_items": block.get("max_items", 8),
+        "template": block.get("item_template", "{name}"),
+        "right_field": right_field,
+        "numbered": block.get("numbered", False),
+        "font": load_font(font_key, int(block.get("font_size", 13) * f.scale)),
+        "more_font": load_font(font_key, int(11 * f.scale)),
+        "spacing": int(block.get("item_spacing", 16) * f.scale),
+        "margin_x": margin_x,
+        "align": block.get("align", "left"),
+        "right_col_w": right_col_w,
+        "max_text_w": (
+            f.available_width - margin_x * 2 if not right_field
+            else f.available_width - margin_x - right_col_w
+        ),
+    }}
+
+
+def _render_list(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    items = ctx.get_field(m["field"])
     if not isinstance(items, list):
         return
 
-    max_items = block.get("max_items", 8)
-    template = block.get("item_template", "{name}")
-    right_field = block.get("right_field")
-    numbered = block.get("numbered", False)
-    font_key = block.get("font", "noto_serif_regular")
-    font_size = int(block.get("font_size", 13) * ctx.scale)
-    spacing = int(block.get("item_spacing", 16) * ctx.scale)
-    margin_x = block.get("margin_x")
-    if margin_x is not None:
-        margin_x = int(margin_x * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.08)
-
-    align = block.get("align", "left")
-
-    font = load_font(_pick_cjk_font(font_key), font_size)
+    template = m["template"]
+    right_field = m["right_field"]
+    font = m["font"]
+    spacing = m["spacing"]
+    margin_x = m["margin_x"]
+    right_col_w = m["right_col_w"]
     item_height = spacing
 
     rendered_count = 0
-    for i, item in enumerate(items[:max_items]):
+    for i, item in enumerate(items[:m["max_items"]]):
         if ctx.y + item_height > ctx.footer_top:
             remaining = len(items) - rendered_count
-            if remaining > 0:
+            if remaining > 0 and not ctx.measure_only:
                 more_text = f"+{remaining} more"
-                more_font = load_font(_pick_cjk_font(font_key), int(11 * ctx.scale))
-                ctx.draw.text((ctx.x_offset + margin_x, ctx.y), more_text, fill=EINK_FG, font=more_font)
+                ctx.draw.text((ctx.x_offset + margin_x, ctx.y), more_text, fill=EINK_FG, font=m["more_font"])
             break
         if ctx.y >= ctx.footer_top - 10:
             break
+        if ctx.measure_only:
+            # Item height is fixed; text only matters when drawing
+            ctx.y += spacing
+            rendered_count += 1
+            continue
 
         if isinstance(item, dict):
             text = template
@@ -406,15 +671,13 @@ def _render_list(ctx: RenderContext, block: dict) -> None:
             if template and "{_value}" in template:
                 text = template.replace("{_value}", str(item))
 
-        if numbered:
+        if m["numbered"]:
             text = f"{i + 1}. {text}"
         text = text.replace("{index}", str(i + 1))
 
-        right_col_w = int(80 * ctx.scale)
-        max_text_w = ctx.available_width - margin_x * 2 if not right_field else ctx.available_width - margin_x - right_col_w
-        lines = wrap_text(text, font, max_text_w)
+        lines = ctx.wrap(text, font, m["max_text_w"])
 
-        if align == "center":
+        if m["align"] == "center":
             for ln in lines[:1]:
                 bbox = font.getbbox(ln)
                 lw = bbox[2] - bbox[0]
@@ -432,23 +695,37 @@ def _render_list(ctx: RenderContext, block: dict) -> None:
         rendered_count += 1
 
 
-def _render_vertical_stack(ctx: RenderContext, block: dict) -> None:
-    spacing = block.get("spacing", 0)
-    for child in block.get("children", []):
+def _compile_vertical_stack(block: dict, f: _Frame) -> dict:
+    return {
+        "metrics": {"spacing": block.get("spacing", 0)},
+        "children": _compile_blocks(block.get("children", []), f),
+    }
+
+
+def _render_vertical_stack(ctx: RenderContext, plan: BlockPlan) -> None:
+    spacing = plan.metrics["spacing"]
+    for child in plan.children:
         if ctx.y >= ctx.footer_top - 10:
             break
-        _render_block(ctx, child)
+        child.render(ctx, child)
         ctx.y += spacing
 
 
-def _render_conditional(ctx: RenderContext, block: dict) -> None:
-    field_name = block.get("field", "")
-    value = ctx.get_field(field_name)
-    conditions = block.get("conditions", [])
+def _compile_conditional(block: dict, f: _Frame) -> dict:
+    return {
+        "metrics": {"field": block.get("field", "")},
+        "branches": tuple(
+            (cond.get("op", "exists"), cond.get("value"), _compile_blocks(cond.get("children", []), f))
+            for cond in block.get("conditions", [])
+        ),
+        "fallback": _compile_blocks(block.get("fallback_children", []), f),
+    }
+
+
+def _render_conditional(ctx: RenderContext, plan: BlockPlan) -> None:
+    value = ctx.get_field(plan.metrics["field"])
 
-    for cond in conditions:
-        op = cond.get("op", "exists")
-        cmp_val = cond.get("value")
+    for op, cmp_val, children in plan.branches:
         matched = False
 
         if op == "exists":
@@ -469,68 +746,76 @@ def _render_conditional(ctx: RenderContext, block: dict) -> None:
             matched = isinstance(value, (list, str)) and len(value) > _num(cmp_val)
 
         if matched:
-            for child in cond.get("children", []):
-                _render_block(ctx, child)
+            _render_children(ctx, children, stop_at_footer=False)
             return
 
-    for child in block.get("fallback_children", []):
-        _render_block(ctx, child)
+    _render_children(ctx, plan.fallback, stop_at_footer=False)
 
 
-def _render_spacer(ctx: RenderContext, block: dict) -> None:
-    ctx.y += int(block.get("height", 12) * ctx.min_scale)
+def _compile_spacer(block: dict, f: _Frame) -> dict:
+    return {"metrics": {"height": int(block.get("height", 12) * f.min_scale)}}
 
 
-def _render_icon_text(ctx: RenderContext, block: dict) -> None:
+def _render_spacer(ctx: RenderContext, plan: BlockPlan) -> None:
+    ctx.y += plan.metrics["height"]
+
+
+def _compile_icon_text(block: dict, f: _Frame) -> dict:
+    font_size = int(block.get("font_size", 14) * f.scale)
+    icon_size = int(block.get("icon_size", 12) * f.scale)
     icon_name = block.get("icon")
-    field_name = block.get("field")
-    text = str(ctx.get_field(field_name)) if field_name else block.get("text", "")
+    return {"metrics": {
+        "field": block.get("field"),
+        "text": block.get("text", ""),
+        "font_size": font_size,
+        **_font_pair(block.get("font", "noto_serif_regular"), font_size),
+        "icon": load_icon(icon_name, size=(icon_size, icon_size)) if icon_name else None,
+        "icon_advance": icon_size + 4,
+        "margin_x": _margin(block, f, f.screen_w, 0.06),
+    }}
+
+
+def _render_icon_text(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    text = str(ctx.get_field(m["field"])) if m["field"] else m["text"]
     text = ctx.resolve(text)
     if not text:
         return
 
-    font_key = block.get("font", "noto_serif_regular")
-    font_size = int(block.get("font_size", 14) * ctx.scale)
-    icon_size = int(block.get("icon_size", 12) * ctx.scale)
-    margin_x = block.get("margin_x")
-    if margin_x is not None:
-        margin_x = int(margin_x * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.06)
-
-    if has_cjk(text):
-        font_key = _pick_cjk_font(font_key)
-    font = load_font(font_key, font_size)
+    if not ctx.measure_only:
+        font = m["cjk_font"] if has_cjk(text) else m["font"]
+        x = ctx.x_offset + m["margin_x"]
+        if m["icon"]:
+            ctx.img.paste(m["icon"], (x, ctx.y))
+            x += m["icon_advance"]
+        ctx.draw.text((x, ctx.y), text, fill=EINK_FG, font=font)
+    ctx.y += m["font_size"] + 6
 
-    x = ctx.x_offset + margin_x
-    if icon_name:
-        icon_img = load_icon(icon_name, size=(icon_size, icon_size))
-        if icon_img:
-            ctx.img.paste(icon_img, (x, ctx.y))
-            x += icon_size + 4
 
-    ctx.draw.text((x, ctx.y), text, fill=EINK_FG, font=font)
-    ctx.y += font_size + 6
+def _compile_big_number(block: dict, f: _Frame) -> dict:
+    font_size = int(block.get("font_size", 42) * f.scale)
+    return {"metrics": {
+        "field": block.get("field", ""),
+        "font_size": font_size,
+        **_font_pair(block.get("font", "lora_bold"), font_size),
+        "align": block.get("align", "center"),
+        "margin_x": _margin(block, f, f.available_width, 0.06),
+    }}
 
 
-def _render_big_number(ctx: RenderContext, block: dict) -> None:
-    field_name = block.get("field", "")
-    text = str(ctx.get_field(field_name))
+def _render_big_number(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    text = str(ctx.get_field(m["field"]))
     if not text:
         return
-    font_size = int(block.get("font_size", 42) * ctx.scale)
-    font_key = block.get("font", "lora_bold")
-    if has_cjk(text):
-        font_key = _pick_cjk_font(font_key)
-    font = load_font(font_key, font_size)
+    if ctx.measure_only:
+        ctx.y += m["font_size"] + 6
+        return
+    font = m["cjk_font"] if has_cjk(text) else m["font"]
     bbox = font.getbbox(text)
     tw = bbox[2] - bbox[0]
-    align = block.get("align", "center")
-    _raw_margin = block.get("margin_x")
-    if _raw_margin is not None:
-        margin_x = int(_raw_margin * ctx.scale)
-    else:
-        margin_x = int(ctx.available_width * 0.06)
+    align = m["align"]
+    margin_x = m["margin_x"]
     if align == "left":
         x = ctx.x_offset + margin_x
     elif align == "right":
@@ -538,21 +823,30 @@ def _render_big_number(ctx: RenderContext, block: dict) -> None:
     else:
         x = ctx.x_offset + (ctx.available_width - tw) // 2
     ctx.draw.text((x, ctx.y), text, fill=EINK_FG, font=font)
-    ctx.y += font_size + 6
+    ctx.y += m["font_size"] + 6
 
 
-def _render_progress_bar(ctx: RenderContext, block: dict) -> None:
-    value = _num(ctx.get_field(block.get("field", "")))
-    max_value = max(_num(ctx.get_field(block.get("max_field", ""))), 1)
+def _compile_progress_bar(block: dict, f: _Frame) -> dict:
+    return {"metrics": {
+        "field": block.get("field", ""),
+        "max_field": block.get("max_field", ""),
+        "width": int(block.get("width", 80) * f.scale),
+        "height": int(block.get("height", 6) * f.scale),
+        "margin_x": _margin(block, f, f.screen_w, 0.06),
+    }}
+
+
+def _render_progress_bar(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    if ctx.measure_only:
+        ctx.y += m["height"] + 6
+        return
+    value = _num(ctx.get_field(m["field"]))
+    max_value = max(_num(ctx.get_field(m["max_field"])), 1)
     ratio = max(0.0, min(1.0, value / max_value))
-    width = int(block.get("width", 80) * ctx.scale)
-    height = int(block.get("height", 6) * ctx.scale)
-    _raw_margin = block.get("margin_x")
-    if _raw_margin is not None:
-        margin_x = int(_raw_margin * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.06)
-    x = ctx.x_offset + margin_x
+    width = m["width"]
+    height = m["height"]
+    x = ctx.x_offset + m["margin_x"]
     y = ctx.y
     ctx.draw.rectangle([x, y, x + width, y + height], outline=EINK_FG, width=1)
     fill_w = int((width - 2) * ratio)
@@ -561,46 +855,58 @@ def _render_progress_bar(ctx: RenderContext, block: dict) -> None:
     ctx.y += height + 6
 
 
-def _render_two_column(ctx: RenderContext, block: dict) -> None:
+def _compile_two_column(block: dict, f: _Frame) -> dict:
     # Auto-downgrade to single column on very short screens
-    if ctx.screen_h < 200:
-        for child in block.get("left", []):
-            if ctx.y >= ctx.footer_top - 10:
-                break
-            _render_block(ctx, child)
-        for child in block.get("right", []):
-            if ctx.y >= ctx.footer_top - 10:
-                break
-            _render_block(ctx, child)
-        return
-
-    left_width = int(block.get("left_width", 120) * ctx.scale)
-    gap = int(block.get("gap", 8) * ctx.scale)
-    left_x = int(block.get("left_x", 0) * ctx.scale) + ctx.x_offset
+    if f.screen_h < 200:
+        return {
+            "metrics": {"stacked": True},
+            "children": _compile_blocks(list(block.get("left", [])) + list(block.get("right", [])), f),
+        }
+
+    left_width = int(block.get("left_width", 120) * f.scale)
+    gap = int(block.get("gap", 8) * f.scale)
+    left_x = int(block.get("left_x", 0) * f.scale) + f.x_offset
     right_x = left_x + left_width + gap
-    left_ctx = RenderContext(
-        draw=ctx.draw, img=ctx.img, content=ctx.content,
-        screen_w=ctx.screen_w, screen_h=ctx.screen_h, y=ctx.y,
-        x_offset=left_x, available_width=left_width,
-        footer_height=ctx.footer_height,
-    )
-    right_ctx = RenderContext(
-        draw=ctx.draw, img=ctx.img, content=ctx.content,
-        screen_w=ctx.screen_w, screen_h=ctx.screen_h, y=ctx.y,
-        x_offset=right_x, available_width=max(0, ctx.screen_w - right_x),
-        footer_height=ctx.footer_height,
+    left_frame = _Frame(f.screen_w, f.screen_h, x_offset=left_x, available_width=left_width)
+    right_frame = _Frame(
+        f.screen_w, f.screen_h, x_offset=right_x, available_width=max(0, f.screen_w - right_x),
     )
-    for child in block.get("left", []):
-        _render_block(left_ctx, child)
-    for child in block.get("right", []):
-        _render_block(right_ctx, child)
+    return {
+        "metrics": {"stacked": False, "left_frame": left_frame, "right_frame": right_frame},
+        "left": _compile_blocks(block.get("left", []), left_frame),
+        "right": _compile_blocks(block.get("right", []), right_frame),
+    }
+
+
+def _render_two_column(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    if m["stacked"]:
+        _render_children(ctx, plan.children)
+        return
+
+    left_frame, right_frame = m["left_frame"], m["right_frame"]
+    left_ctx = ctx.child(x_offset=left_frame.x_offset, available_width=left_frame.available_width)
+    right_ctx = ctx.child(x_offset=right_frame.x_offset, available_width=right_frame.available_width)
+    _render_children(left_ctx, plan.left, stop_at_footer=False)
+    _render_children(right_ctx, plan.right, stop_at_footer=False)
     ctx.y = max(left_ctx.y, right_ctx.y)
 
 
-def _render_key_value(ctx: RenderContext, block: dict) -> None:
-    field_name = block.get("field", "")
-    label = block.get("label", "")
-    value = ctx.get_field(field_name)
+def _compile_key_value(block: dict, f: _Frame) -> dict:
+    font_size = int(block.get("font_size", 12) * f.scale)
+    return {"metrics": {
+        "field": block.get("field", ""),
+        "label": block.get("label", ""),
+        "font_size": font_size,
+        "font": load_font("noto_serif_light", font_size),
+        "margin_x": _margin(block, f, f.screen_w, 0.06),
+    }}
+
+
+def _render_key_value(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    label = m["label"]
+    value = ctx.get_field(m["field"])
     if isinstance(value, dict):
         ordered = [value.get("meat"), value.get("veg"), value.get("staple")]
         parts = [str(v) for v in ordered if v]
@@ -610,82 +916,132 @@ def _render_key_value(ctx: RenderContext, block: dict) -> None:
     else:
         value_text = str(value)
     text = f"{label}: {value_text}" if label else value_text
-    font_size = int(block.get("font_size", 12) * ctx.scale)
-    font = load_font("noto_serif_light", font_size)
-    _raw_margin = block.get("margin_x")
-    if _raw_margin is not None:
-        margin_x = int(_raw_margin * ctx.scale)
-    else:
-        margin_x = int(ctx.screen_w * 0.06)
-    ctx.draw.text((ctx.x_offset + margin_x, ctx.y), text, fill=EINK_FG, font=font)
-    ctx.y += font_size + 4
+    if not ctx.measure_only:
+        ctx.draw.text((ctx.x_offset + m["margin_x"], ctx.y), text, fill=EINK_FG, font=m["font"])
+    ctx.y += m["font_size"] + 4
 
 
-def _render_group(ctx: RenderContext, block: dict) -> None:
+def _compile_group(block: dict, f: _Frame) -> dict:
     title = block.get("title", "")
-    if title:
-        title_font_size = int(block.get("title_font_size", 12) * ctx.scale)
-        title_font = load_font("noto_serif_bold", title_font_size)
-        _raw_margin = block.get("margin_x")
-        if _raw_margin is not None:
-            margin_x = int(_raw_margin * ctx.scale)
-        else:
-            margin_x = int(ctx.available_width * 0.06)
-        ctx.draw.text((ctx.x_offset + margin_x, ctx.y), title, fill=EINK_FG, font=title_font)
-        ctx.y += title_font_size + int(4 * ctx.scale)
-    for child in block.get("children", []):
-        _render_block(ctx, child)
-
-
-def _render_icon_list(ctx: RenderContext, block: dict) -> None:
-    items = ctx.get_field(block.get("field", ""))
+    title_font_size = int(block.get("title_font_size", 12) * f.scale)
+    return {
+        "metrics": {
+            "title": title,
+            "font": load_font("noto_serif_bold", title_font_size) if title else None,
+            "margin_x": _margin(block, f, f.available_width, 0.06),
+            "advance": title_font_size + int(4 * f.scale),
+        },
+        "children": _compile_blocks(block.get("children", []), f),
+    }
+
+
+def _render_group(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    if m["title"]:
+        if not ctx.measure_only:
+            ctx.draw.text((ctx.x_offset + m["margin_x"], ctx.y), m["title"], fill=EINK_FG, font=m["font"])
+        ctx.y += m["advance"]
+    _render_children(ctx, plan.children, stop_at_footer=False)
+
+
+def _compile_icon_list(block: dict, f: _Frame) -> dict:
+    icon_size = int(12 * f.scale)
+    return {"metrics": {
+        "field": block.get("field", ""),
+        "icon_field": block.get("icon_field", "icon"),
+        "text_field": block.get("text_field", "text"),
+        "max_items": int(block.get("max_items", 6)),
+        "font": load_font("noto_serif_regular", int(block.get("font_size", 12) * f.scale)),
+        "margin_x": _margin(block, f, f.available_width, 0.06),
+        "line_h": int(block.get("line_height", 16) * f.scale),
+        "icon_size": (icon_size, icon_size),
+        "icon_advance": int(16 * f.scale),
+    }}
+
+
+def _render_icon_list(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    items = ctx.get_field(m["field"])
     if not isinstance(items, list):
         return
-    icon_field = block.get("icon_field", "icon")
-    text_field = block.get("text_field", "text")
-    max_items = int(block.get("max_items", 6))
-    font_size = int(block.get("font_size", 12) * ctx.scale)
-    font = load_font("noto_serif_regular", font_size)
-    _raw_margin = block.get("margin_x")
-    if _raw_margin is not None:
-        margin_x = int(_raw_margin * ctx.scale)
-    else:
-        margin_x = int(ctx.available_width * 0.06)
-    line_h = int(block.get("line_height", 16) * ctx.scale)
-    for item in items[:max_items]:
+    font = m["font"]
+    for item in items[:m["max_items"]]:
         if not isinstance(item, dict):
             continue
-        icon_name = item.get(icon_field)
-        text = str(item.get(text_field, ""))
-        x = ctx.x_offset + margin_x
-        icon_size = int(12 * ctx.scale)
+        if ctx.measure_only:
+            ctx.y += m["line_h"]
+            continue
+        icon_name = item.get(m["icon_field"])
+        text = str(item.get(m["text_field"], ""))
+        x = ctx.x_offset + m["margin_x"]
         if icon_name:
-            icon_img = load_icon(icon_name, size=(icon_size, icon_size))
+            icon_img = load_icon(icon_name, size=m["icon_size"])
             if icon_img:
                 ctx.img.paste(icon_img, (x, ctx.y))
-                x += int(16 * ctx.scale)
+                x += m["icon_advance"]
         ctx.draw.text((x, ctx.y), text, fill=EINK_FG, font=font)
-        ctx.y += line_h
-
-
-def _render_image(ctx: RenderContext, block: dict) -> None:
-    field_name = block.get("field", "image_url")
+        ctx.y += m["line_h"]
+
+
+def _compile_image(block: dict, f: _Frame) -> dict:
+    width = int(block.get("width", 220) * f.scale)
+    height = int(block.get("height", 140) * f.scale)
+    margin_bottom = block.get("margin_bottom", 6)
+    return {"metrics": {
+        "field": block.get("field", "image_url"),
+        "width": width,
+        "height": height,
+        "x": int(block.get("x", (f.screen_w - width) // 2)),
+        "y": int(block["y"]) if "y" in block else None,
+        "margin_bottom": int(margin_bottom),
+        "placeholder_margin_bottom": int(margin_bottom * f.scale),
+        "placeholder_font": load_font("noto_serif_light", int(12 * f.scale)),
+    }}
+
+
+def _render_image(ctx: RenderContext, plan: BlockPlan) -> None:
+    m = plan.metrics
+    field_name = m["field"]
     image_url = str(ctx.get_field(field_name) or "")
     if not image_url:
         return
-    width = int(block.get("width", 220) * ctx.scale)
-    height = int(block.get("height", 140) * ctx.scale)
-    x = int(block.get("x", (ctx.screen_w - width) // 2))
-    y = int(block.get("y", ctx.y))
+    width, height, x = m["width"], m["height"], m["x"]
+    y = m["y"] if m["y"] is not None else ctx.y
     # Try pre-fetched data first (async download from json_content.py)
     prefetched = ctx.content.get(f"_prefetched_{field_name}")
     if prefetched:
-        from io import BytesIO
-        img = Image.open(BytesIO(prefetched)).convert("L").resize((width, height))
-        mono = img.convert("1")
-        ctx.img.paste(mono, (x, y))
-        ctx.y = y + height + int(block.get("margin_bottom", 6))
+        if not ctx.measure_only:
+            from io import BytesIO
+            img = Image.open(BytesIO(prefetched)).convert("L").resize((width, height))
+            mono = img.convert("1")
+            ctx.img.paste(mono, (x, y))
+        ctx.y = y + height + m["margin_bottom"]
         return
+    # Fetched once per render; the measure pass leaves it for the draw pass
+    key = ("image", image_url, width, height)
+    if key not in ctx.layouts:
+        ctx.layouts[key] = _fetch_image(image_url, width, height)
+    mono = ctx.layouts[key]
+    if mono is not None:
+        if not ctx.measure_only:
+            ctx.img.paste(mono, (x, y))
+        ctx.y = y + height + m["margin_bottom"]
+        return
+    if not ctx.measure_only:
+        ctx.draw.rectangle([x, y, x + width, y + height], outline=EINK_FG, width=1)
+        placeholder_font = m["placeholder_font"]
+        placeholder_text = "Image unavailable"
+        bbox = placeholder_font.getbbox(placeholder_text)
+        tw = bbox[2] - bbox[0]
+        th = bbox[3] - bbox[1]
+        tx = x + (width - tw) // 2
+        ty = y + (height - th) // 2
+        ctx.draw.text((tx, ty), placeholder_text, fill=EINK_FG, font=placeholder_font)
+    ctx.y = y + height + m["placeholder_margin_bottom"]
+
+
+def _fetch_image(image_url: str, width: int, height: int) -> Image.Image | None:
+    """Download and dither an image block, or None if it cannot be fetched."""
     try:
         resp = None
         last_error = None
@@ -711,21 +1067,10 @@ def _render_image(ctx: RenderContext, block: dict) -> None:
             raise last_error if last_error else ValueError("image fetch failed")
         from io import BytesIO
         img = Image.open(BytesIO(resp.content)).convert("L").resize((width, height))
-        mono = img.convert("1")
-        ctx.img.paste(mono, (x, y))
-        ctx.y = y + height + int(block.get("margin_bottom", 6))
+        return img.convert("1")
     except Exception:
         logger.warning("[JSONRenderer] Failed to render image block", exc_info=True)
-        ctx.draw.rectangle([x, y, x + width, y + height], outline=EINK_FG, width=1)
-        placeholder_font = load_font("noto_serif_light", int(12 * ctx.scale))
-        placeholder_text = "Image unavailable"
-        bbox = placeholder_font.getbbox(placeholder_text)
-        tw = bbox[2] - bbox[0]
-        th = bbox[3] - bbox[1]
-        tx = x + (width - tw) // 2
-        ty = y + (height - th) // 2
-        ctx.draw.text((tx, ty), placeholder_text, fill=EINK_FG, font=placeholder_font)
-        ctx.y = y + height + int(block.get("margin_bottom", 6) * ctx.scale)
+        return None
 
 
 # ── Helpers ──────────────────────────────────────────────────
@@ -749,19 +1094,19 @@ def _num(v: Any) -> float:
 
 # ── Register block types ─────────────────────────────────────
 
-_BLOCK_RENDERERS["centered_text"] = _render_centered_text
-_BLOCK_RENDERERS["text"] = _render_text
-_BLOCK_RENDERERS["separator"] = _render_separator
-_BLOCK_RENDERERS["section"] = _render_section
-_BLOCK_RENDERERS["list"] = _render_list
-_BLOCK_RENDERERS["vertical_stack"] = _render_vertical_stack
-_BLOCK_RENDERERS["conditional"] = _render_conditional
-_BLOCK_RENDERERS["spacer"] = _render_spacer
-_BLOCK_RENDERERS["icon_text"] = _render_icon_text
-_BLOCK_RENDERERS["two_column"] = _render_two_column
-_BLOCK_RENDERERS["image"] = _render_image
-_BLOCK_RENDERERS["progress_bar"] = _render_progress_bar
-_BLOCK_RENDERERS["big_number"] = _render_big_number
-_BLOCK_RENDERERS["icon_list"] = _render_icon_list
-_BLOCK_RENDERERS["key_value"] = _render_key_value
-_BLOCK_RENDERERS["group"] = _render_group
+_BLOCK_TYPES["centered_text"] = (_compile_centered_text, _render_centered_text)
+_BLOCK_TYPES["text"] = (_compile_text, _render_text)
+_BLOCK_TYPES["separator"] = (_compile_separator, _render_separator)
+_BLOCK_TYPES["section"] = (_compile_section, _render_section)
+_BLOCK_TYPES["list"] = (_compile_list, _render_list)
+_BLOCK_TYPES["vertical_stack"] = (_compile_vertical_stack, _render_vertical_stack)
+_BLOCK_TYPES["conditional"] = (_compile_conditional, _render_conditional)
+_BLOCK_TYPES["spacer"] = (_compile_spacer, _render_spacer)
+_BLOCK_TYPES["icon_text"] = (_compile_icon_text, _render_icon_text)
+_BLOCK_TYPES["two_column"] = (_compile_two_column, _render_two_column)
+_BLOCK_TYPES["image"] = (_compile_image, _render_image)
+_BLOCK_TYPES["progress_bar"] = (_compile_progress_bar, _render_progress_bar)
+_BLOCK_TYPES["big_number"] = (_compile_big_number, _render_big_number)
+_BLOCK_TYPES["icon_list"] = (_compile_icon_list, _render_icon_list)
+_BLOCK_TYPES["key_value"] = (_compile_key_value, _render_key_value)
+_BLOCK_TYPES["group"] = (_compile_group, _render_group)
@@ -0,0 +1,195 @@
+"""
+LLM 客户端连接池
+按 (服务商, base_url, API Key 摘要) 复用 AsyncOpenAI 客户端及其 HTTP 连接池，
+保持长连接、限制连接数，空闲过久的客户端自动关闭。
+请求期间通过 lease() 借用客户端；被淘汰的客户端等最后一个借用者归还后才关闭。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+from openai import DEFAULT_TIMEOUT, AsyncOpenAI
+
+from .config import (
+    LLM_CLIENT_IDLE_SECONDS,
+    LLM_KEEPALIVE_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_POOL_MAX_CLIENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+PoolKey = tuple[str, str, str]
+
+
+@dataclass
+class _Pooled:
+    client: AsyncOpenAI
+    loop: asyncio.AbstractEventLoop | None
+    last_used: float
+    users: int = 0
+    retired: bool = False
+
+
+def _key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class LLMClientPool:
+    """Shared ``AsyncOpenAI`` clients keyed by (provider, base_url, key digest).
+
+    Each client owns one keep-alive HTTP connection pool, so repeated calls
+    skip DNS, TCP and TLS setup. Clients idle for ``idle_seconds`` and the
+    least recently used beyond ``max_clients`` leave the pool; a client is
+    closed once no :meth:`lease` holds it, so eviction never interrupts a
+    request in flight. A client is tied to the event loop it was created on
+    and is replaced on a different loop.
+    """
+
+    def __init__(
+        self,
+        max_clients: int = LLM_POOL_MAX_CLIENTS,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        keepalive_seconds: float = LLM_KEEPALIVE_SECONDS,
+        idle_seconds: float = LLM_CLIENT_IDLE_SECONDS,
+    ) -> None:
+        self.max_clients = max(1, max_clients)
+        self.max_connections = max(1, max_connections)
+        self.keepalive_seconds = keepalive_seconds
+        self.idle_seconds = idle_seconds
+        self._clients: OrderedDict[PoolKey, _Pooled] = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.deferred_closes = 0
+        self._active_leases = 0
+        # Closes of evicted clients still running; held so they are not collected
+        self._closing: set[asyncio.Task] = set()
+
+    def get(self, provider: str, base_url: str, api_key: str) -> AsyncOpenAI:
+        """The pooled client, untracked; use :meth:`lease` around requests."""
+        return self._checkout(provider, base_url, api_key).client
+
+    @asynccontextmanager
+    async def lease(self, provider: str, base_url: str, api_key: str):
+        """Borrow the pooled client for the duration of a request."""
+        pooled = self._checkout(provider, base_url, api_key)
+        pooled.users += 1
+        self._active_leases += 1
+        try:
+            yield pooled.client
+        finally:
+            pooled.users -= 1
+            self._active_leases -= 1
+            pooled.last_used = time.monotonic()
+            if pooled.retired and not pooled.users:
+                self._close(pooled)
+
+    def _checkout(self, provider: str, base_url: str, api_key: str) -> _Pooled:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        key = (provider, base_url, _key_digest(api_key))
+        pooled = self._clients.get(key)
+        if pooled is not None and pooled.loop is loop:
+            pooled.last_used = now
+            self._clients.move_to_end(key)
+            self.reused += 1
+            return pooled
+        if pooled is not None:
+            # Connections opened on another (closed) loop cannot be reused
+            self._discard(key, close=False)
+
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self._http_client())
+        pooled = self._clients[key] = _Pooled(client, loop, now)
+        self.created += 1
+        while len(self._clients) > self.max_clients:
+            self._discard(next(iter(self._clients)))
+        return pooled
+
+    def _http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_seconds,
+            ),
+        )
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_seconds <= 0:
+            return
+        idle = [
+            key for key, p in self._clients.items()
+            if not p.users and now - p.last_used > self.idle_seconds
+        ]
+        for key in idle:
+            self._discard(key)
+
+    def _discard(self, key: PoolKey, close: bool = True) -> None:
+        pooled = self._clients.pop(key)
+        self.evicted += 1
+        if not close:
+            return
+        if pooled.users:
+            # Closed by the last lease on release
+            pooled.retired = True
+            self.deferred_closes += 1
+        else:
+            self._close(pooled)
+
+    def _close(self, pooled: _Pooled) -> None:
+        if pooled.loop is not None and not pooled.loop.is_closed():
+            try:
+                task = pooled.loop.create_task(pooled.client.close())
+            except RuntimeError:
+                return
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        """Close every pooled client (on shutdown)."""
+        clients, self._clients = self._clients, OrderedDict()
+        for pooled in clients.values():
+            try:
+                await pooled.client.close()
+            except Exception:
+                logger.debug("[LLM] Failed to close pooled client", exc_info=True)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "max_connections": self.max_connections,
+            "http2": HTTP2_AVAILABLE,
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "active_leases": self._active_leases,
+            "deferred_closes": self.deferred_closes,
+        }
+
+
+# Global pool instance
+llm_pool = LLMClientPool()
@@ -0,0 +1,13 @@
+"""
+运行时统计辅助
+缓存、调度器与渲染池在 /api/stats/runtime 中报告的延迟分位数共用此实现。
+"""
+from __future__ import annotations
+
+
+def percentile(sorted_samples: list[float], q: float, digits: int = 1) -> float:
+    """Nearest-rank ``q`` quantile of already sorted samples; 0.0 when empty."""
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return round(sorted_samples[idx], digits)
@@ -8,7 +8,7 @@ import json
 import logging
 import re
 
-from .content import _get_client, _clean_json_response
+from .content import _clean_json_response, _lease_client
 from .mode_registry import _validate_mode_def
 
 logger = logging.getLogger(__name__)
@@ -166,13 +166,13 @@ async def _call_llm_with_messages(
     max_tokens: int = 2048,
 ) -> str:
     """Call LLM with pre-built messages (supports multimodal)."""
-    client, _ = _get_client(provider, model)
-    response = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        max_tokens=max_tokens,
-        temperature=temperature,
-    )
+    async with _lease_client(provider, model) as (client, _):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
     text = response.choices[0].message.content.strip()
 
     finish_reason = response.choices[0].finish_reason
@@ -7,11 +7,17 @@ from __future__ import annotations
 import json
 import logging
 import os
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Awaitable, Callable
+from typing import TYPE_CHECKING, Awaitable, Callable
 
 from PIL import Image
 
+from .config import LAYOUT_PLAN_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from .json_renderer import LayoutPlan
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -71,6 +77,9 @@ class ModeRegistry:
     def __init__(self) -> None:
         self._builtin: dict[str, BuiltinMode] = {}
         self._json_modes: dict[str, JsonMode] = {}
+        # Any w/h in the accepted range can be requested, so plans are an LRU
+        self._plans: OrderedDict[tuple[str, int, int], LayoutPlan] = OrderedDict()
+        self.max_plans = LAYOUT_PLAN_CACHE_SIZE
 
     # ── Registration ─────────────────────────────────────────
 
@@ -134,6 +143,7 @@ class ModeRegistry:
         self._json_modes[mode_id] = JsonMode(
             info=info, definition=definition, file_path=path
         )
+        self._invalidate_plans(mode_id)
         logger.info(f"[Registry] Loaded JSON mode: {mode_id} from {path}")
         return mode_id
 
@@ -156,9 +166,36 @@ class ModeRegistry:
         jm = self._json_modes.get(mode_id)
         if jm and jm.info.source == "custom":
             del self._json_modes[mode_id]
+            self._invalidate_plans(mode_id)
             return True
         return False
 
+    # ── Layout plans ─────────────────────────────────────────
+
+    def get_layout_plan(self, mode_id: str, screen_w: int, screen_h: int) -> LayoutPlan | None:
+        """Compiled layout for a JSON mode at one screen size, built on first use."""
+        from .json_renderer import compile_layout
+
+        mode_id = mode_id.upper()
+        jm = self._json_modes.get(mode_id)
+        if jm is None:
+            return None
+        key = (mode_id, screen_w, screen_h)
+        plan = self._plans.get(key)
+        if plan is not None:
+            self._plans.move_to_end(key)
+            return plan
+        plan = compile_layout(jm.definition, screen_w, screen_h)
+        if self.max_plans > 0:
+            self._plans[key] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def _invalidate_plans(self, mode_id: str) -> None:
+        for key in [k for k in self._plans if k[0] == mode_id]:
+            del self._plans[key]
+
     # ── Queries ──────────────────────────────────────────────
 
     def is_supported(self, mode_id: str) -> bool:
@@ -0,0 +1,92 @@
+"""
+字体对象缓存
+进程级 LRU，按 (字体路径, 字号) 缓存已解析的 FreeTypeFont，
+避免每次渲染重复 os.path.exists + ImageFont.truetype。
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from PIL import ImageFont
+
+from ..config import FONT_CACHE_MAX_ENTRIES
+
+FontLoader = Callable[[], ImageFont.FreeTypeFont]
+
+
+class FontCache:
+    """Bounded LRU of loaded font objects keyed by (path, size).
+
+    Memory is accounted as the on-disk size of each cached face: FreeType
+    maps the font file per face, so this tracks what the cache keeps
+    resident. Fallback (``load_default``) fonts are counted as zero bytes.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self._fonts: OrderedDict[tuple[str, int], tuple[ImageFont.FreeTypeFont, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, size: int, loader: FontLoader) -> ImageFont.FreeTypeFont:
+        key = (path, size)
+        with self._lock:
+            entry = self._fonts.get(key)
+            if entry is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        font = loader()
+        nbytes = _font_file_size(font)
+        with self._lock:
+            if key in self._fonts:
+                # Another thread loaded it meanwhile; keep the resident copy.
+                self._fonts.move_to_end(key)
+                return self._fonts[key][0]
+            self._fonts[key] = (font, nbytes)
+            self._bytes += nbytes
+            while len(self._fonts) > self.max_entries:
+                _, (_, evicted_bytes) = self._fonts.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+        return font
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fonts.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._fonts),
+                "max_entries": self.max_entries,
+                "resident_bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _font_file_size(font: ImageFont.ImageFont) -> int:
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    return 0
+
+
+font_cache = FontCache(max_entries=FONT_CACHE_MAX_ENTRIES)
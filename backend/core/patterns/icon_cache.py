@@ -0,0 +1,181 @@
+"""
+图标缓存
+按 (图标名, 尺寸) 以 LRU 缓存已转换的 1-bit 图标，可选地在启动时
+将全部图标打包成单个二进制图集写入磁盘，重启后直接读取。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from PIL import Image
+
+from ..config import ICON_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+IconKey = tuple[str, Optional[tuple[int, int]]]
+IconLoader = Callable[[], Optional[Image.Image]]
+
+# Atlas layout: magic, format version, index length, JSON index, packed 1-bpp bitmaps
+_ATLAS_MAGIC = b"INKA"
+_ATLAS_VERSION = 1
+_ATLAS_HEADER = struct.Struct("<4sBI")
+
+
+class IconCache:
+    """Bounded LRU of monochrome icons keyed by (name, size).
+
+    Cached images are shared between renders; callers only ``paste`` them
+    and must not draw on them. Unknown names are cached as ``None``; the
+    bound keeps made-up names (icon names come from LLM output) from
+    growing the cache without limit.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max(1, max_entries)
+        self._icons: OrderedDict[IconKey, Optional[Image.Image]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name: str, size: tuple[int, int] | None, loader: IconLoader) -> Image.Image | None:
+        key = (name, tuple(size) if size else None)
+        with self._lock:
+            if key in self._icons:
+                self._icons.move_to_end(key)
+                self.hits += 1
+                return self._icons[key]
+            self.misses += 1
+
+        icon = loader()
+        if icon is not None:
+            icon.load()
+        with self._lock:
+            if key in self._icons:
+                # Another thread converted it meanwhile; keep the resident copy.
+                self._icons.move_to_end(key)
+                return self._icons[key]
+            self._icons[key] = icon
+            self._evict()
+        return icon
+
+    def _evict(self) -> None:
+        while len(self._icons) > self.max_entries:
+            self._icons.popitem(last=False)
+            self.evictions += 1
+
+    def warm(self, keys: Iterable[IconKey], loader_for: Callable[[str, tuple[int, int] | None], IconLoader]) -> int:
+        """Convert every (name, size) in ``keys`` that is not cached yet."""
+        count = 0
+        for name, size in keys:
+            with self._lock:
+                cached = (name, size) in self._icons
+            if not cached:
+                self.get(name, size, loader_for(name, size))
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._icons.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            icons = [img for img in self._icons.values() if img is not None]
+            return {
+                "entries": len(self._icons),
+                "max_entries": self.max_entries,
+                "packed_bytes": sum(((img.width + 7) // 8) * img.height for img in icons),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ── Disk atlas ──────────────────────────────────────────
+
+    def save_atlas(self, path: str, signature: str) -> int:
+        """Write all cached icons to ``path`` as one packed atlas. Returns icon count."""
+        index = []
+        blobs = []
+        offset = 0
+        with self._lock:
+            items = list(self._icons.items())
+        for (name, size), img in sorted(items, key=lambda kv: (kv[0][0], kv[0][1] or (0, 0))):
+            if img is None:
+                continue
+            data = img.convert("1").tobytes()
+            index.append({
+                "name": name,
+                "size": list(size) if size else None,
+                "w": img.width,
+                "h": img.height,
+                "offset": offset,
+                "length": len(data),
+            })
+            blobs.append(data)
+            offset += len(data)
+        header = json.dumps({"signature": signature, "icons": index}).encode("utf-8")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_ATLAS_HEADER.pack(_ATLAS_MAGIC, _ATLAS_VERSION, len(header)))
+            f.write(header)
+            for data in blobs:
+                f.write(data)
+        os.replace(tmp_path, path)
+        return len(index)
+
+    def load_atlas(self, path: str, signature: str) -> int:
+        """Populate the cache from an atlas written by :meth:`save_atlas`.
+
+        Returns the number of icons loaded, or 0 if the file is missing,
+        malformed, or was built from different source icons.
+        """
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            magic, version, header_len = _ATLAS_HEADER.unpack_from(raw, 0)
+            if magic != _ATLAS_MAGIC or version != _ATLAS_VERSION:
+                return 0
+            start = _ATLAS_HEADER.size
+            header = json.loads(raw[start:start + header_len])
+            if header.get("signature") != signature:
+                return 0
+            body = memoryview(raw)[start + header_len:]
+            loaded: dict[IconKey, Image.Image] = {}
+            for entry in header["icons"]:
+                data = bytes(body[entry["offset"]:entry["offset"] + entry["length"]])
+                img = Image.frombytes("1", (entry["w"], entry["h"]), data)
+                size = tuple(entry["size"]) if entry["size"] else None
+                loaded[(entry["name"], size)] = img
+        except (OSError, ValueError, KeyError, struct.error):
+            return 0
+        with self._lock:
+            self._icons.update(loaded)
+            self._evict()
+        return len(loaded)
+
+
+def icon_source_signature(icons_dir: str, sizes: Iterable[tuple[int, int] | None]) -> str:
+    """Hash of the source PNGs (name, mtime, size) and requested sizes."""
+    h = hashlib.sha1()
+    try:
+        names = sorted(f for f in os.listdir(icons_dir) if f.endswith(".png"))
+    except OSError:
+        names = []
+    for fname in names:
+        st = os.stat(os.path.join(icons_dir, fname))
+        h.update(f"{fname}:{st.st_mtime_ns}:{st.st_size};".encode())
+    h.update(repr(sorted(s or (0, 0) for s in set(sizes))).encode())
+    return h.hexdigest()
+
+
+icon_cache = IconCache(max_entries=ICON_CACHE_MAX_ENTRIES)
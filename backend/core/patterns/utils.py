@@ -19,6 +19,9 @@ from ..config import (
     FONTS,
     FONT_SIZES,
 )
+from .font_cache import font_cache
+from .icon_cache import icon_cache, icon_source_signature
+from .text_layout import wrap_lines
 
 FONTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "fonts")
 ICONS_DIR = os.path.join(FONTS_DIR, "icons")
@@ -31,29 +34,34 @@ EINK_FG = EINK_FOREGROUND
 _font_warned: set[str] = set()
 
 
+def _open_font(path: str, size: int, warn_key: str, font_name: str) -> ImageFont.FreeTypeFont:
+    """Resolve a font through the process-wide cache; parse the file at most once."""
+    def _load() -> ImageFont.FreeTypeFont:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, size)
+        if warn_key not in _font_warned:
+            _font_warned.add(warn_key)
+            logger.warning(f"[FONT] Missing {font_name}, run: python scripts/setup_fonts.py")
+        return ImageFont.load_default()
+
+    return font_cache.get(path, size, _load)
+
+
 def load_font(font_key: str, size: int) -> ImageFont.FreeTypeFont:
     """从配置加载字体"""
     font_name = FONTS.get(font_key)
     if not font_name:
-        return ImageFont.load_default()
-    path = os.path.join(FONTS_DIR, font_name)
-    if os.path.exists(path):
-        return ImageFont.truetype(path, size)
-    if font_key not in _font_warned:
-        _font_warned.add(font_key)
-        logger.warning(f"[FONT] Missing {font_name}, run: python scripts/setup_fonts.py")
-    return ImageFont.load_default()
+        return font_cache.get("<default>", 0, ImageFont.load_default)
+    return _open_font(os.path.join(FONTS_DIR, font_name), size, font_key, font_name)
 
 
 def load_font_by_name(name: str, size: int) -> ImageFont.FreeTypeFont:
     """直接通过文件名加载字体（兼容旧代码）"""
-    path = os.path.join(FONTS_DIR, name)
-    if os.path.exists(path):
-        return ImageFont.truetype(path, size)
-    if name not in _font_warned:
-        _font_warned.add(name)
-        logger.warning(f"[FONT] Missing {name}, run: python scripts/setup_fonts.py")
-    return ImageFont.load_default()
+    return _open_font(os.path.join(FONTS_DIR, name), size, name, name)
+
+
+# Alpha → 1-bit lookup: opaque pixels (alpha > 128) become foreground (0).
+_ALPHA_TO_MONO = [255 if a <= 128 else 0 for a in range(256)]
 
 
 def rgba_to_mono(
@@ -63,17 +71,10 @@ def rgba_to_mono(
     if target_size:
         img = img.resize(target_size, Image.LANCZOS)
     img = img.convert("RGBA")
-    mono = Image.new("1", img.size, 1)
-    for x in range(img.width):
-        for y in range(img.height):
-            _, _, _, a = img.getpixel((x, y))
-            if a > 128:
-                mono.putpixel((x, y), 0)
-    return mono
+    return img.getchannel("A").point(_ALPHA_TO_MONO, "1")
 
 
-def load_icon(name: str, size: tuple[int, int] | None = None) -> Image.Image | None:
-    """Load a PNG icon from ICONS_DIR, convert to monochrome, optionally resize."""
+def _load_icon_file(name: str, size: tuple[int, int] | None = None) -> Image.Image | None:
     path = os.path.join(ICONS_DIR, f"{name}.png")
     if os.path.exists(path):
         img = Image.open(path)
@@ -85,6 +86,39 @@ def load_icon(name: str, size: tuple[int, int] | None = None) -> Image.Image | N
     return None
 
 
+def load_icon(name: str, size: tuple[int, int] | None = None) -> Image.Image | None:
+    """Load a PNG icon from ICONS_DIR, convert to monochrome, optionally resize.
+
+    Results are cached per (name, size); the returned image is shared and
+    must only be pasted, never drawn on.
+    """
+    return icon_cache.get(name, size, lambda: _load_icon_file(name, size))
+
+
+def prepare_icon_atlas(sizes: list[tuple[int, int]], atlas_path: str | None = None) -> int:
+    """Pre-convert every icon at ``sizes`` and optionally persist a packed atlas.
+
+    When ``atlas_path`` holds an atlas built from the same source icons and
+    sizes it is loaded instead of converting again. Returns the number of
+    icons resident afterwards.
+    """
+    sizes = sorted({tuple(s) for s in sizes} | set(ICON_SIZES.values()))
+    signature = icon_source_signature(ICONS_DIR, sizes)
+    if atlas_path and icon_cache.load_atlas(atlas_path, signature):
+        return icon_cache.stats()["entries"]
+    names = sorted(f[:-4] for f in os.listdir(ICONS_DIR) if f.endswith(".png"))
+    icon_cache.warm(
+        ((name, size) for name in names for size in sizes),
+        lambda name, size: (lambda: _load_icon_file(name, size)),
+    )
+    if atlas_path:
+        try:
+            icon_cache.save_atlas(atlas_path, signature)
+        except OSError:
+            logger.warning(f"[ICON] Failed to write icon atlas {atlas_path}", exc_info=True)
+    return icon_cache.stats()["entries"]
+
+
 def get_weather_icon(weather_code: int) -> Image.Image | None:
     """Get weather icon image by WMO weather code."""
     icon_name = WEATHER_ICON_MAP.get(weather_code, "cloud")
@@ -255,23 +289,8 @@ def draw_footer(
 
 
 def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
-    """文本换行"""
-    lines = []
-    for paragraph in text.split("\n"):
-        words = list(paragraph)
-        current = ""
-        for ch in words:
-            test = current + ch
-            bbox = font.getbbox(test)
-            if bbox[2] > max_width:
-                if current:
-                    lines.append(current)
-                current = ch
-            else:
-                current = test
-        if current:
-            lines.append(current)
-    return lines
+    """文本换行（字形宽度缓存 + 前缀和断行，结果与逐字贪心一致）"""
+    return wrap_lines(text, font, max_width)
 
 
 def render_quote_body(
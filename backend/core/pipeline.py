@@ -5,7 +5,6 @@
 from __future__ import annotations
 
 import logging
-from PIL import Image
 
 from .config import (
     SCREEN_WIDTH,
@@ -15,6 +14,7 @@ from .config import (
     DEFAULT_LANGUAGE,
     DEFAULT_CONTENT_TONE,
 )
+from .framebuffer import Frame
 
 logger = logging.getLogger(__name__)
 
@@ -28,14 +28,14 @@ async def generate_and_render(
     screen_w: int = SCREEN_WIDTH,
     screen_h: int = SCREEN_HEIGHT,
     mac: str = "",
-) -> tuple[Image.Image, dict | None]:
-    """Generate content for a persona and render to an e-ink image.
+) -> tuple[Frame, dict | None]:
+    """Generate content for a persona and render to an e-ink frame.
 
     Dispatches to either a builtin Python mode or a JSON-defined mode
     via the mode registry.
 
     Returns:
-        Tuple of (rendered image, content dict).
+        Tuple of (packed 1-bit frame, content dict).
     """
     date_str = date_ctx["date_str"]
     time_str = date_ctx.get("time_str", "")
@@ -48,13 +48,13 @@ async def generate_and_render(
         screen_w=screen_w, screen_h=screen_h,
     )
 
-    img = _render_for_persona(
+    frame = await _render_for_persona(
         persona, content,
         date_str=date_str, weather_str=weather_str, battery_pct=battery_pct,
         weather_code=weather_code, time_str=time_str, date_ctx=date_ctx,
         screen_w=screen_w, screen_h=screen_h,
     )
-    return img, content
+    return frame, content
 
 
 async def _generate_content_for_persona(
@@ -128,7 +128,7 @@ async def _generate_content_for_persona(
     raise ValueError(f"Unknown persona: {persona}")
 
 
-def _render_for_persona(
+async def _render_for_persona(
     persona: str,
     content: dict,
     *,
@@ -140,28 +140,34 @@ def _render_for_persona(
     date_ctx: dict | None = None,
     screen_w: int = SCREEN_WIDTH,
     screen_h: int = SCREEN_HEIGHT,
-) -> Image.Image:
-    """Dispatch rendering to the appropriate handler."""
+) -> Frame:
+    """Dispatch rendering to the appropriate handler and return the packed frame.
+
+    JSON modes render and pack in the render pool, off the event loop.
+    """
     from .mode_registry import get_registry
     from .renderer import render_mode
-    from .json_renderer import render_json_mode
+    from .render_pool import render_pool
 
     registry = get_registry()
 
     # JSON-defined mode
     if registry.is_json_mode(persona):
         jm = registry.get_json_mode(persona)
-        return render_json_mode(
-            jm.definition, content,
+        frame = await render_pool.render(
+            persona, jm.definition, content,
             date_str=date_str, weather_str=weather_str, battery_pct=battery_pct,
             weather_code=weather_code, time_str=time_str,
             screen_w=screen_w, screen_h=screen_h,
+            plan=registry.get_layout_plan(persona, screen_w, screen_h),
         )
+        return frame
 
     # Builtin Python mode - use original render_mode dispatcher
-    return render_mode(
+    img = render_mode(
         persona, content,
         date_str=date_str, weather_str=weather_str, battery_pct=battery_pct,
         weather_code=weather_code, time_str=time_str, date_ctx=date_ctx,
         screen_w=screen_w, screen_h=screen_h,
     )
+    return render_pool.pack(img)
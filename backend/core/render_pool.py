@@ -0,0 +1,197 @@
+"""
+渲染执行池
+把 Pillow 排版与绘制移出事件循环：在线程池或进程池中渲染，
+传入内容字典与模式定义，返回打包好的 1-bit 帧，避免渲染阻塞其他请求。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .config import LAYOUT_PLAN_CACHE_SIZE, LOOP_LAG_INTERVAL_MS, RENDER_POOL, RENDER_POOL_WORKERS
+from .framebuffer import Frame
+from .metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+POOL_KINDS = ("inline", "thread", "process")
+# Recent render durations kept for percentile stats
+_TIMING_SAMPLES = 1024
+
+# Layout plans compiled inside pool processes: (mode_id, w, h) -> (mode_def, plan)
+_worker_plans: OrderedDict[tuple[str, int, int], tuple[dict, object]] = OrderedDict()
+
+
+def render_packed(
+    persona: str, mode_def: dict, content: dict, kwargs: dict, plan=None,
+) -> tuple[Frame, int]:
+    """Render one JSON mode and pack it as a 1-bit frame (see :func:`pack_frame`).
+
+    Runs in pool workers, so everything it takes must pickle. Without a
+    ``plan`` (process workers) the layout is compiled once per worker and
+    reused until the definition changes.
+    """
+    from .json_renderer import compile_layout, render_json_mode
+
+    if plan is None:
+        key = (persona, kwargs["screen_w"], kwargs["screen_h"])
+        cached = _worker_plans.get(key)
+        if cached is not None and cached[0] == mode_def:
+            plan = cached[1]
+            _worker_plans.move_to_end(key)
+        else:
+            plan = compile_layout(mode_def, kwargs["screen_w"], kwargs["screen_h"])
+            _worker_plans[key] = (mode_def, plan)
+            _worker_plans.move_to_end(key)
+            while len(_worker_plans) > max(1, LAYOUT_PLAN_CACHE_SIZE):
+                _worker_plans.popitem(last=False)
+    img = render_json_mode(mode_def, content, plan=plan, **kwargs)
+    return pack_frame(img)
+
+
+def pack_frame(img) -> tuple[Frame, int]:
+    """Pack ``img`` as a 1-bit frame; returns it with the nanoseconds spent packing."""
+    start = time.perf_counter_ns()
+    frame = Frame.from_image(img)
+    return frame, time.perf_counter_ns() - start
+
+
+class RenderPool:
+    """Runs JSON-mode renders in a thread or process pool.
+
+    ``kind`` is ``"thread"`` (shares the registry's compiled plans),
+    ``"process"`` (scales with cores; plans are compiled per worker) or
+    ``"inline"`` (render on the event loop, as before). Pillow drawing
+    mostly holds the GIL, so threads keep renders off the event loop but
+    do not add render throughput; only processes do. The executor is
+    created on first use.
+    """
+
+    def __init__(self, kind: str = RENDER_POOL, workers: int = RENDER_POOL_WORKERS) -> None:
+        if kind not in POOL_KINDS:
+            logger.warning(f"[RENDER] Unknown RENDER_POOL {kind!r}, using thread")
+            kind = "thread"
+        self.kind = kind
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._executor: Executor | None = None
+        self._inflight = 0
+        self._renders = 0
+        self._failures = 0
+        self._render_ms: deque[float] = deque(maxlen=_TIMING_SAMPLES)
+        self._encode_ns = 0
+        self._encodes = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="render",
+                )
+        return self._executor
+
+    async def render(
+        self, persona: str, mode_def: dict, content: dict, *, plan=None, **kwargs,
+    ) -> Frame:
+        """Render ``persona`` off the event loop and return the packed frame."""
+        start = time.perf_counter()
+        self._inflight += 1
+        try:
+            if self.kind == "inline":
+                frame, encode_ns = render_packed(persona, mode_def, content, kwargs, plan)
+            else:
+                # Process workers compile their own plans; a plan does not pickle
+                args = (persona, mode_def, content, kwargs, plan if self.kind == "thread" else None)
+                frame, encode_ns = await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), render_packed, *args,
+                )
+        except Exception:
+            self._failures += 1
+            raise
+        finally:
+            self._inflight -= 1
+        self._renders += 1
+        self._render_ms.append((time.perf_counter() - start) * 1000)
+        self._record_encode(encode_ns)
+        return frame
+
+    def pack(self, img) -> Frame:
+        """Pack an image rendered elsewhere (builtin modes), timing the encode."""
+        frame, encode_ns = pack_frame(img)
+        self._record_encode(encode_ns)
+        return frame
+
+    def _record_encode(self, encode_ns: int) -> None:
+        self._encode_ns += encode_ns
+        self._encodes += 1
+
+    @property
+    def avg_encode_us(self) -> float:
+        """Mean cost of packing a rendered image into BMP bytes."""
+        return self._encode_ns / self._encodes / 1000 if self._encodes else 0.0
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        samples = sorted(self._render_ms)
+        return {
+            "kind": self.kind,
+            "workers": self.workers if self.kind != "inline" else 0,
+            "inflight": self._inflight,
+            "renders": self._renders,
+            "failures": self._failures,
+            "render_p50_ms": percentile(samples, 0.50),
+            "render_p95_ms": percentile(samples, 0.95),
+            "avg_encode_us": round(self.avg_encode_us, 1),
+        }
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a periodic timer fires.
+
+    Anything that blocks the loop (synchronous rendering, blocking I/O)
+    shows up directly as lag on every other request.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL_MS / 1000, samples: int = 1200) -> None:
+        self.interval = interval
+        self._lag_ms: deque[float] = deque(maxlen=samples)
+        self._max_ms = 0.0
+
+    async def run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record((time.perf_counter() - start - self.interval) * 1000)
+
+    def record(self, lag_ms: float) -> None:
+        lag_ms = max(0.0, lag_ms)
+        self._lag_ms.append(lag_ms)
+        self._max_ms = max(self._max_ms, lag_ms)
+
+    def stats(self) -> dict:
+        samples = sorted(self._lag_ms)
+        return {
+            "interval_ms": round(self.interval * 1000),
+            "samples": len(samples),
+            "lag_p50_ms": percentile(samples, 0.50, digits=2),
+            "lag_p99_ms": percentile(samples, 0.99, digits=2),
+            "lag_max_ms": round(self._max_ms, 2),
+        }
+
+
+# Global instances
+render_pool = RenderPool()
+loop_lag = LoopLagMonitor()
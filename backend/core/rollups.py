@@ -0,0 +1,140 @@
+"""
+渲染统计汇总表
+按小时 / 按天、按 (设备, 模式) 累计渲染次数、缓存命中、错误数、成功渲染的耗时总和
+与耗时分布；随渲染日志批量写入时在同一事务内增量更新。统计接口读取汇总表，
+不再每次扫描整张 render_logs。已有日志可用 scripts/backfill_rollups.py 重建。
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import aiosqlite
+
+# Upper bounds (ms, inclusive) of the latency histogram buckets; one more
+# bucket counts everything slower
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000)
+_LATENCY_COLUMNS = [f"lat_{ms}" for ms in LATENCY_BUCKETS_MS] + ["lat_inf"]
+_COUNTERS = ["renders", "cache_hits", "errors", "successes", "success_ms"] + _LATENCY_COLUMNS
+# Select list summing the histogram columns, for latency_histogram()
+LATENCY_SUMS = ", ".join(f"SUM({name})" for name in _LATENCY_COLUMNS)
+
+# Rollup table -> length of the created_at prefix naming its bucket
+# ("2026-10-18T09" for hours, "2026-10-18" for days)
+HOURLY = "render_rollup_hourly"
+DAILY = "render_rollup_daily"
+ROLLUP_TABLES = {HOURLY: 13, DAILY: 10}
+
+
+async def create_rollup_tables(db: aiosqlite.Connection) -> None:
+    counters = ",\n".join(f"                {name} INTEGER DEFAULT 0" for name in _COUNTERS)
+    for table in ROLLUP_TABLES:
+        await db.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket TEXT NOT NULL,
+                mac TEXT NOT NULL,
+                persona TEXT NOT NULL,
+{counters},
+                last_at TEXT NOT NULL,
+                PRIMARY KEY (bucket, mac, persona)
+            )
+        """)
+        await db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_mac ON {table}(mac, bucket)")
+
+
+def latency_bucket(render_time_ms: int) -> int:
+    """Index of the histogram bucket ``render_time_ms`` falls into."""
+    return bisect_left(LATENCY_BUCKETS_MS, render_time_ms)
+
+
+def aggregate(render_rows: list[tuple]) -> dict[str, dict[tuple, list]]:
+    """Sum ``render_logs`` rows into per-table ``(bucket, mac, persona) -> counters + [last_at]``.
+
+    Rows are ``(mac, persona, cache_hit, render_time_ms, status, created_at)``
+    as written to ``render_logs``.
+    """
+    out: dict[str, dict[tuple, list]] = {table: {} for table in ROLLUP_TABLES}
+    for mac, persona, cache_hit, render_time_ms, status, created_at in render_rows:
+        for table, prefix in ROLLUP_TABLES.items():
+            key = (created_at[:prefix], mac, persona)
+            acc = out[table].get(key)
+            if acc is None:
+                acc = out[table][key] = [0] * len(_COUNTERS) + [created_at]
+            acc[0] += 1
+            acc[1] += int(cache_hit)
+            if status == "error":
+                acc[2] += 1
+            elif status == "success":
+                acc[3] += 1
+                acc[4] += render_time_ms
+                acc[5 + latency_bucket(render_time_ms)] += 1
+            if created_at > acc[-1]:
+                acc[-1] = created_at
+    return out
+
+
+async def apply_rollups(db: aiosqlite.Connection, render_rows: list[tuple]) -> None:
+    """Add ``render_rows`` to the rollups. Runs in the caller's transaction."""
+    columns = ", ".join(["bucket", "mac", "persona", *_COUNTERS, "last_at"])
+    placeholders = ", ".join("?" * (len(_COUNTERS) + 4))
+    updates = ", ".join(f"{name} = {name} + excluded.{name}" for name in _COUNTERS)
+    for table, groups in aggregate(render_rows).items():
+        await db.executemany(
+            f"""INSERT INTO {table} ({columns}) VALUES ({placeholders})
+                ON CONFLICT(bucket, mac, persona) DO UPDATE SET {updates},
+                    last_at = max(last_at, excluded.last_at)""",
+            [(*key, *acc) for key, acc in groups.items()],
+        )
+
+
+async def rebuild_rollups(db: aiosqlite.Connection) -> int:
+    """Recompute every rollup from ``render_logs``. Returns the log rows aggregated.
+
+    Each table is cleared and refilled in its own transaction, so the write
+    lock is held for one table's aggregation at a time; telemetry flushes
+    that arrive meanwhile wait on ``busy_timeout`` and otherwise retry
+    their rows on the next flush. The count is taken inside the last
+    table's transaction, from the rows it actually aggregated.
+    """
+    bounds = LATENCY_BUCKETS_MS
+    ranges = (
+        [f"render_time_ms <= {bounds[0]}"]
+        + [f"render_time_ms > {low} AND render_time_ms <= {high}" for low, high in zip(bounds, bounds[1:])]
+        + [f"render_time_ms > {bounds[-1]}"]
+    )
+    latency = ", ".join(f"SUM(status = 'success' AND {condition})" for condition in ranges)
+    columns = ", ".join(["bucket", "mac", "persona", *_COUNTERS, "last_at"])
+    count = 0
+    for table, prefix in ROLLUP_TABLES.items():
+        try:
+            await db.execute(f"DELETE FROM {table}")
+            await db.execute(f"""
+                INSERT INTO {table} ({columns})
+                SELECT substr(created_at, 1, {prefix}), mac, persona,
+                       COUNT(*), SUM(cache_hit), SUM(status = 'error'), SUM(status = 'success'),
+                       SUM(CASE WHEN status = 'success' THEN render_time_ms ELSE 0 END),
+                       {latency},
+                       MAX(created_at)
+                FROM render_logs GROUP BY 1, 2, 3
+            """)
+            cursor = await db.execute(f"SELECT COALESCE(SUM(renders), 0) FROM {table}")
+            count = (await cursor.fetchone())[0]
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return count
+
+
+async def prune_hourly(db: aiosqlite.Connection, keep_days: int, now: datetime | None = None) -> int:
+    """Drop hourly rollups older than ``keep_days``; daily rollups are kept."""
+    cutoff = ((now or datetime.now()) - timedelta(days=keep_days)).isoformat()[:13]
+    cursor = await db.execute(f"DELETE FROM {HOURLY} WHERE bucket < ?", (cutoff,))
+    await db.commit()
+    return cursor.rowcount
+
+
+def latency_histogram(counts) -> list[dict]:
+    """``[{"le_ms": 100, "count": n}, ..., {"le_ms": None, "count": n}]`` from bucket counts."""
+    bounds = [*LATENCY_BUCKETS_MS, None]
+    return [{"le_ms": bound, "count": int(count or 0)} for bound, count in zip(bounds, counts)]
@@ -0,0 +1,304 @@
+"""
+渲染任务调度器
+所有内容生成 + 渲染任务经由进程级调度器执行：固定数量的 worker、
+按 LLM 服务商限制并发、按优先级排队（交互请求 > 预取 > 后台预热），
+同一 (mac, 模式, 尺寸, 配置版本) 的并发任务合并为一次执行。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from itertools import count
+from typing import Any, Awaitable, Callable, Hashable
+
+from .config import (
+    DEFAULT_LLM_PROVIDER,
+    RENDER_PROVIDER_CONCURRENCY,
+    RENDER_PROVIDER_DEFAULT_CONCURRENCY,
+    RENDER_WORKERS,
+)
+from .metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+# Recent wait/run durations kept for percentile stats
+_TIMING_SAMPLES = 1024
+
+
+class Priority(IntEnum):
+    """Queue lanes; lower values run first."""
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BACKGROUND = 2
+
+
+@dataclass(eq=False)
+class _Job:
+    key: Hashable | None
+    factory: Callable[[], Awaitable[Any]]
+    priority: Priority
+    provider: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started: bool = False
+
+
+def config_version(config: dict | None) -> Hashable:
+    """Identifies the device config a render is produced from.
+
+    Saved configs carry their row id; an unsaved one is identified by content.
+    """
+    if not config:
+        return None
+    if config.get("id") is not None:
+        return config["id"]
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def render_job_key(
+    mac: str | None,
+    persona: str,
+    screen_w: int,
+    screen_h: int,
+    version: Hashable = None,
+    kind: str = "render",
+) -> tuple:
+    """Dedupe key for rendering one persona for one device at one size and config version."""
+    return (kind, mac, (persona or "").upper(), screen_w, screen_h, version)
+
+
+def parse_provider_limits(spec: str) -> dict[str, int]:
+    """Parse ``"deepseek=4,openai=8"`` into a provider -> concurrency map."""
+    limits: dict[str, int] = {}
+    for item in spec.split(","):
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            limits[name.strip().lower()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"[SCHED] Ignoring bad provider limit {item!r}")
+    return limits
+
+
+class RenderScheduler:
+    """Bounded, prioritised executor for render jobs.
+
+    ``workers`` caps how many jobs run at once; each provider additionally
+    has its own cap. Every provider has its own priority queue and a worker
+    only takes a job from a provider with a free slot, so a saturated
+    provider's backlog never holds a worker while a more urgent job arrives.
+    Jobs sharing a key are coalesced: later submitters get the pending job's
+    future, and a more urgent submitter promotes a job that has not started
+    yet. Workers start lazily on the running loop.
+    """
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        provider_limits: dict[str, int] | None = None,
+        default_provider_limit: int = RENDER_PROVIDER_DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.provider_limits = dict(provider_limits or {})
+        self.default_provider_limit = max(1, default_provider_limit)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queues: dict[str, list[tuple]] = {}
+        self._changed: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: dict[Hashable, _Job] = {}
+        self._seq = count()
+        self._depth = {lane: 0 for lane in Priority}
+        self._running: dict[str, int] = {}
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._deduped = 0
+        self._deduped_by_kind: dict[str, int] = {}
+        self._deduped_by_lane = {lane: 0 for lane in Priority}
+        self._promoted = 0
+        self._wait_ms = {lane: deque(maxlen=_TIMING_SAMPLES) for lane in Priority}
+        self._run_ms: deque[float] = deque(maxlen=_TIMING_SAMPLES)
+
+    async def run(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        key: Hashable | None = None,
+        priority: Priority = Priority.BACKGROUND,
+        provider: str = DEFAULT_LLM_PROVIDER,
+    ) -> Any:
+        """Schedule ``factory()`` and wait for its result.
+
+        A cancelled caller does not cancel the job; others may share it.
+        """
+        return await asyncio.shield(
+            self.submit(factory, key=key, priority=priority, provider=provider)
+        )
+
+    def submit(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        key: Hashable | None = None,
+        priority: Priority = Priority.BACKGROUND,
+        provider: str = DEFAULT_LLM_PROVIDER,
+    ) -> asyncio.Future:
+        self._ensure_started()
+        if key is not None:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._deduped += 1
+                kind = str(key[0]) if isinstance(key, tuple) and key else "other"
+                self._deduped_by_kind[kind] = self._deduped_by_kind.get(kind, 0) + 1
+                self._deduped_by_lane[Priority(priority)] += 1
+                if priority < job.priority and not job.started:
+                    self._depth[job.priority] -= 1
+                    job.priority = priority
+                    self._enqueue(job)
+                    self._promoted += 1
+                return job.future
+
+        job = _Job(
+            key, factory, Priority(priority), (provider or DEFAULT_LLM_PROVIDER).lower(),
+            self._loop.create_future(),
+        )
+        if key is not None:
+            self._jobs[key] = job
+        self._submitted += 1
+        self._enqueue(job)
+        return job.future
+
+    def _enqueue(self, job: _Job) -> None:
+        # A promoted job is queued again; its old entry is skipped when popped
+        self._depth[job.priority] += 1
+        heapq.heappush(self._queues.setdefault(job.provider, []), (job.priority, next(self._seq), job))
+        self._changed.set()
+
+    def _limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, self.default_provider_limit)
+
+    def _pop_runnable(self) -> _Job | None:
+        """Most urgent queued job whose provider has a free slot, marked running."""
+        best = None
+        for provider, queue in self._queues.items():
+            while queue and (queue[0][2].started or queue[0][0] != queue[0][2].priority):
+                heapq.heappop(queue)
+            if queue and self._running.get(provider, 0) < self._limit(provider):
+                if best is None or queue[0][:2] < best[:2]:
+                    best = queue[0]
+        if best is None:
+            return None
+        job = best[2]
+        heapq.heappop(self._queues[job.provider])
+        job.started = True
+        self._depth[job.priority] -= 1
+        self._running[job.provider] = self._running.get(job.provider, 0) + 1
+        return job
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # First use, or a new event loop (tests, reloads): start afresh on it
+        self._loop = loop
+        self._queues = {}
+        self._changed = asyncio.Event()
+        self._jobs.clear()
+        self._running.clear()
+        self._depth = {lane: 0 for lane in Priority}
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers and any job that has not finished."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for job in self._jobs.values():
+            job.future.cancel()
+        for queue in self._queues.values():
+            for _, _, job in queue:
+                job.future.cancel()
+        self._queues = {}
+        self._jobs.clear()
+        self._loop = None
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._pop_runnable()
+            if job is None:
+                # Woken by a new job or a freed provider slot
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            self._wait_ms[job.priority].append((time.perf_counter() - job.enqueued_at) * 1000)
+            start = time.perf_counter()
+            try:
+                result = await job.factory()
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                self._failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self._completed += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._run_ms.append((time.perf_counter() - start) * 1000)
+                self._running[job.provider] -= 1
+                self._changed.set()
+                if job.key is not None and self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            if job.future.done() and not job.future.cancelled():
+                # Mark the exception retrieved when no caller is left to await it
+                job.future.exception()
+
+    def stats(self) -> dict:
+        """Queue depth per lane, throughput counters and wait/run percentiles."""
+        waits = sorted(ms for lane in Priority for ms in self._wait_ms[lane])
+        runs = sorted(self._run_ms)
+        return {
+            "workers": self.workers,
+            "running": sum(self._running.values()),
+            "running_by_provider": {p: n for p, n in self._running.items() if n},
+            "provider_limits": {
+                p: self._limit(p) for p in sorted(set(self.provider_limits) | set(self._queues))
+            },
+            "queued": {lane.name.lower(): self._depth[lane] for lane in Priority},
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "deduped": self._deduped,
+            "deduped_by_kind": dict(self._deduped_by_kind),
+            "deduped_by_lane": {lane.name.lower(): n for lane, n in self._deduped_by_lane.items()},
+            "promoted": self._promoted,
+            "wait_p50_ms": percentile(waits, 0.50),
+            "wait_p95_ms": percentile(waits, 0.95),
+            "wait_p95_ms_by_lane": {
+                lane.name.lower(): percentile(sorted(self._wait_ms[lane]), 0.95) for lane in Priority
+            },
+            "run_p50_ms": percentile(runs, 0.50),
+            "run_p95_ms": percentile(runs, 0.95),
+        }
+
+
+# Global scheduler instance
+render_scheduler = RenderScheduler(
+    provider_limits=parse_provider_limits(RENDER_PROVIDER_CONCURRENCY),
+)
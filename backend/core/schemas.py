@@ -8,7 +8,7 @@ import re
 from typing import Optional
 from pydantic import BaseModel, Field, field_validator
 
-from .config import get_supported_modes
+from .config import MAX_DEVICE_MODES, MAX_REFRESH_INTERVAL, get_supported_modes
 
 # MAC 地址格式：AA:BB:CC:DD:EE:FF
 _MAC_RE = re.compile(r"^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
@@ -42,14 +42,14 @@ class ConfigRequest(BaseModel):
     modes: list[str] = Field(
         default=["STOIC"],
         min_length=1,
-        max_length=10,
+        max_length=MAX_DEVICE_MODES,
         description="启用的内容模式列表",
     )
     refreshStrategy: str = Field(
         default="random", description="刷新策略: random / cycle"
     )
     refreshInterval: int = Field(
-        default=60, ge=10, le=1440, description="刷新间隔(分钟), 10~1440"
+        default=60, ge=10, le=MAX_REFRESH_INTERVAL, description="刷新间隔(分钟), 10~1440"
     )
     language: str = Field(default="zh", description="语言: zh / en / mixed")
     contentTone: str = Field(default="neutral", description="调性: positive / neutral / deep / humor")
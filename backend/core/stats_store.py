@@ -1,6 +1,7 @@
 """
 Statistics data collection and querying.
 Stores render logs, content history, and device heartbeats in SQLite.
+Render stats are read from the hourly / daily rollups (see rollups.py).
 """
 from __future__ import annotations
 
@@ -14,6 +15,8 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 from .db import get_main_db
+from .rollups import DAILY, HOURLY, LATENCY_SUMS, create_rollup_tables, latency_histogram, rebuild_rollups
+from .telemetry import telemetry
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "inksight.db")
 
@@ -70,73 +73,46 @@ async def init_stats_db():
         await db.execute("CREATE INDEX IF NOT EXISTS idx_content_history_mac ON content_history(mac)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_content_history_hash ON content_history(mac, mode_id, content_hash)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_habit_mac ON habit_records(mac)")
+        await create_rollup_tables(db)
         await db.commit()
 
-
-async def log_render(
-    mac: str,
-    persona: str,
-    cache_hit: bool,
-    render_time_ms: int,
-    status: str = "success",
-):
-    now = datetime.now().isoformat()
-    db = await get_main_db()
-    await db.execute(
-        """INSERT INTO render_logs (mac, persona, cache_hit, render_time_ms, status, created_at)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (mac, persona, int(cache_hit), render_time_ms, status, now),
-    )
-    await db.commit()
-
-
-async def log_heartbeat(mac: str, battery_voltage: float, wifi_rssi: int | None = None):
-    now = datetime.now().isoformat()
-    db = await get_main_db()
-    await db.execute(
-        """INSERT INTO device_heartbeats (mac, battery_voltage, wifi_rssi, created_at)
-           VALUES (?, ?, ?, ?)""",
-        (mac, battery_voltage, wifi_rssi, now),
-    )
-    # Keep only the latest 1000 heartbeats per device
-    await db.execute(
-        """DELETE FROM device_heartbeats
-           WHERE mac = ? AND id NOT IN (
-               SELECT id FROM device_heartbeats WHERE mac = ?
-               ORDER BY created_at DESC LIMIT 1000
-           )""",
-        (mac, mac),
-    )
-    await db.commit()
+        # Databases from before the rollups existed: backfill once from the logs
+        cursor = await db.execute(f"SELECT EXISTS(SELECT 1 FROM {DAILY})")
+        has_rollups = (await cursor.fetchone())[0]
+        cursor = await db.execute("SELECT EXISTS(SELECT 1 FROM render_logs)")
+        has_logs = (await cursor.fetchone())[0]
+        if has_logs and not has_rollups:
+            count = await rebuild_rollups(db)
+            logger.info(f"[STATS] Backfilled render rollups from {count} render logs")
 
 
 async def get_device_stats(mac: str) -> dict:
     """Get comprehensive stats for a device."""
+    await telemetry.flush()
     db = await get_main_db()
-    # Total renders
-    cursor = await db.execute(
-        "SELECT COUNT(*) FROM render_logs WHERE mac = ?", (mac,)
-    )
-    total_renders = (await cursor.fetchone())[0]
-
-    # Cache hit rate
+    # Totals, average render time and latency histogram
     cursor = await db.execute(
-        "SELECT COUNT(*) FROM render_logs WHERE mac = ? AND cache_hit = 1", (mac,)
+        f"""SELECT SUM(renders), SUM(cache_hits), SUM(errors), SUM(successes), SUM(success_ms),
+                   {LATENCY_SUMS}
+            FROM {DAILY} WHERE mac = ?""",
+        (mac,),
     )
-    cache_hits = (await cursor.fetchone())[0]
+    totals = await cursor.fetchone()
+    total_renders, cache_hits, error_count, successes, success_ms = (v or 0 for v in totals[:5])
     cache_hit_rate = round(cache_hits / total_renders * 100, 1) if total_renders > 0 else 0
+    avg_render_time = round(success_ms / successes) if successes > 0 else 0
 
     # Mode frequency
     cursor = await db.execute(
-        """SELECT persona, COUNT(*) as cnt FROM render_logs
-           WHERE mac = ? GROUP BY persona ORDER BY cnt DESC""",
+        f"""SELECT persona, SUM(renders) as cnt FROM {DAILY}
+            WHERE mac = ? GROUP BY persona ORDER BY cnt DESC""",
         (mac,),
     )
     mode_frequency = {row[0]: row[1] for row in await cursor.fetchall()}
 
     # Last render
     cursor = await db.execute(
-        "SELECT persona, created_at FROM render_logs WHERE mac = ? ORDER BY created_at DESC LIMIT 1",
+        f"SELECT persona, last_at FROM {DAILY} WHERE mac = ? ORDER BY last_at DESC LIMIT 1",
         (mac,),
     )
     last_render_row = await cursor.fetchone()
@@ -156,9 +132,8 @@ async def get_device_stats(mac: str) -> dict:
 
     # Daily render counts (last 30 days)
     cursor = await db.execute(
-        """SELECT DATE(created_at) as day, COUNT(*) as cnt
-           FROM render_logs WHERE mac = ?
-           GROUP BY day ORDER BY day DESC LIMIT 30""",
+        f"""SELECT bucket, SUM(renders) FROM {DAILY} WHERE mac = ?
+            GROUP BY bucket ORDER BY bucket DESC LIMIT 30""",
         (mac,),
     )
     daily_renders = [
@@ -167,19 +142,17 @@ async def get_device_stats(mac: str) -> dict:
     ]
     daily_renders.reverse()
 
-    # Average render time
-    cursor = await db.execute(
-        "SELECT AVG(render_time_ms) FROM render_logs WHERE mac = ? AND status = 'success'",
-        (mac,),
-    )
-    avg_render_time = round((await cursor.fetchone())[0] or 0)
-
-    # Error count
+    # Hourly render counts (last 24 hours with renders)
     cursor = await db.execute(
-        "SELECT COUNT(*) FROM render_logs WHERE mac = ? AND status = 'error'",
+        f"""SELECT bucket, SUM(renders) FROM {HOURLY} WHERE mac = ?
+            GROUP BY bucket ORDER BY bucket DESC LIMIT 24""",
         (mac,),
     )
-    error_count = (await cursor.fetchone())[0]
+    hourly_renders = [
+        {"hour": row[0], "count": row[1]}
+        for row in await cursor.fetchall()
+    ]
+    hourly_renders.reverse()
 
     return {
         "mac": mac,
@@ -189,41 +162,35 @@ async def get_device_stats(mac: str) -> dict:
         "last_render": last_render,
         "heartbeats": heartbeats,
         "daily_renders": daily_renders,
+        "hourly_renders": hourly_renders,
         "avg_render_time_ms": avg_render_time,
         "error_count": error_count,
+        "latency_histogram": latency_histogram(totals[5:]),
     }
 
 
 async def get_stats_overview() -> dict:
     """Get global overview stats across all devices."""
+    await telemetry.flush()
     db = await get_main_db()
-    # Total devices
-    cursor = await db.execute(
-        "SELECT COUNT(DISTINCT mac) FROM render_logs"
-    )
-    total_devices = (await cursor.fetchone())[0]
-
-    # Total renders
-    cursor = await db.execute("SELECT COUNT(*) FROM render_logs")
-    total_renders = (await cursor.fetchone())[0]
-
-    # Global cache hit rate
+    # Totals and global latency histogram
     cursor = await db.execute(
-        "SELECT COUNT(*) FROM render_logs WHERE cache_hit = 1"
+        f"SELECT COUNT(DISTINCT mac), SUM(renders), SUM(cache_hits), {LATENCY_SUMS} FROM {DAILY}"
     )
-    cache_hits = (await cursor.fetchone())[0]
+    totals = await cursor.fetchone()
+    total_devices, total_renders, cache_hits = (v or 0 for v in totals[:3])
     cache_hit_rate = round(cache_hits / total_renders * 100, 1) if total_renders > 0 else 0
 
     # Global mode frequency
     cursor = await db.execute(
-        "SELECT persona, COUNT(*) as cnt FROM render_logs GROUP BY persona ORDER BY cnt DESC"
+        f"SELECT persona, SUM(renders) as cnt FROM {DAILY} GROUP BY persona ORDER BY cnt DESC"
     )
     mode_frequency = {row[0]: row[1] for row in await cursor.fetchall()}
 
     # Recent active devices
     cursor = await db.execute(
-        """SELECT mac, MAX(created_at) as last_seen, COUNT(*) as renders
-           FROM render_logs GROUP BY mac ORDER BY last_seen DESC LIMIT 20"""
+        f"""SELECT mac, MAX(last_at) as last_seen, SUM(renders) as renders
+            FROM {DAILY} GROUP BY mac ORDER BY last_seen DESC LIMIT 20"""
     )
     devices = [
         {"mac": row[0], "last_seen": row[1], "total_renders": row[2]}
@@ -236,11 +203,13 @@ async def get_stats_overview() -> dict:
         "cache_hit_rate": cache_hit_rate,
         "mode_frequency": mode_frequency,
         "devices": devices,
+        "latency_histogram": latency_histogram(totals[3:]),
     }
 
 
 async def get_render_history(mac: str, limit: int = 50, offset: int = 0) -> list[dict]:
     """Get render history for a device with pagination."""
+    await telemetry.flush()
     db = await get_main_db()
     cursor = await db.execute(
         """SELECT persona, cache_hit, render_time_ms, status, created_at
@@ -0,0 +1,199 @@
+"""
+渲染日志 / 心跳写缓冲
+请求路径只把记录追加到内存，按固定间隔或攒够一批后在一个事务里批量写入
+render_logs 与 device_heartbeats，并同时累加小时 / 天汇总表；心跳保留条数与
+小时汇总的清理由定时任务统一执行，不再每次请求都 DELETE。
+写入使用独立的数据库连接和显式事务，不会提交或回滚其他协程在共享连接上的写入。
+统计查询前会先写入积压记录，读到的数据不滞后。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from .config import (
+    ROLLUP_HOURLY_RETENTION_DAYS,
+    TELEMETRY_BATCH_SIZE,
+    TELEMETRY_FLUSH_INTERVAL_MS,
+    TELEMETRY_HEARTBEATS_PER_DEVICE,
+    TELEMETRY_MAX_PENDING,
+    TELEMETRY_TRIM_INTERVAL_SECONDS,
+)
+from .db import get_telemetry_db
+from .rollups import apply_rollups, prune_hourly
+
+logger = logging.getLogger(__name__)
+
+_INSERT_RENDER = """INSERT INTO render_logs (mac, persona, cache_hit, render_time_ms, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)"""
+_INSERT_HEARTBEAT = """INSERT INTO device_heartbeats (mac, battery_voltage, wifi_rssi, created_at)
+                       VALUES (?, ?, ?, ?)"""
+_TRIM_HEARTBEATS = """DELETE FROM device_heartbeats WHERE id IN (
+                          SELECT id FROM (
+                              SELECT id, ROW_NUMBER() OVER (
+                                  PARTITION BY mac ORDER BY created_at DESC, id DESC
+                              ) AS rn
+                              FROM device_heartbeats
+                          ) WHERE rn > ?
+                      )"""
+
+
+class TelemetryBuffer:
+    """Write-behind buffer for render logs and device heartbeats.
+
+    ``record_render`` appends in memory. Rows are written in one transaction
+    every ``flush_interval`` seconds (see :meth:`run`) or as soon as
+    ``batch_size`` rows are pending. A failed flush keeps its rows for the
+    next attempt, dropping the oldest beyond ``max_pending``.
+    ``flush_interval <= 0`` writes every record before returning.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = TELEMETRY_FLUSH_INTERVAL_MS / 1000,
+        batch_size: int = TELEMETRY_BATCH_SIZE,
+        max_pending: int = TELEMETRY_MAX_PENDING,
+        heartbeats_per_device: int = TELEMETRY_HEARTBEATS_PER_DEVICE,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.heartbeats_per_device = heartbeats_per_device
+        self._renders: list[tuple] = []
+        self._heartbeats: list[tuple] = []
+        self._lock = asyncio.Lock()
+        self._background: set[asyncio.Task] = set()
+        self._recorded = 0
+        self._written = 0
+        self._flushes = 0
+        self._errors = 0
+        self._dropped = 0
+        self._trimmed = 0
+        self._last_flush_ms = 0.0
+
+    async def record_render(
+        self,
+        mac: str,
+        persona: str,
+        cache_hit: bool,
+        render_time_ms: int,
+        status: str = "success",
+        battery_voltage: Optional[float] = None,
+        wifi_rssi: Optional[int] = None,
+    ) -> None:
+        """Queue a render log row and, with a voltage, the device heartbeat."""
+        now = datetime.now().isoformat()
+        self._renders.append((mac, persona, int(cache_hit), render_time_ms, status, now))
+        if battery_voltage is not None:
+            self._heartbeats.append((mac, battery_voltage, wifi_rssi, now))
+        self._recorded += 1
+        if self.flush_interval <= 0:
+            await self.flush()
+        elif self.pending >= self.batch_size and not self._background:
+            task = asyncio.create_task(self.flush())
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    @property
+    def pending(self) -> int:
+        return len(self._renders) + len(self._heartbeats)
+
+    async def flush(self) -> int:
+        """Write all pending rows in one transaction. Returns the rows written."""
+        async with self._lock:
+            if not self._renders and not self._heartbeats:
+                return 0
+            renders, self._renders = self._renders, []
+            heartbeats, self._heartbeats = self._heartbeats, []
+            start = time.perf_counter()
+            db = await get_telemetry_db()
+            try:
+                await db.execute("BEGIN IMMEDIATE")
+                if renders:
+                    await db.executemany(_INSERT_RENDER, renders)
+                    await apply_rollups(db, renders)
+                if heartbeats:
+                    await db.executemany(_INSERT_HEARTBEAT, heartbeats)
+                await db.commit()
+            except Exception:
+                self._errors += 1
+                logger.warning(
+                    f"[TELEMETRY] Failed to write {len(renders) + len(heartbeats)} rows, will retry",
+                    exc_info=True,
+                )
+                try:
+                    await db.rollback()
+                except Exception:
+                    pass
+                self._renders = renders + self._renders
+                self._heartbeats = heartbeats + self._heartbeats
+                self._drop_overflow()
+                return 0
+            self._flushes += 1
+            self._written += len(renders) + len(heartbeats)
+            self._last_flush_ms = (time.perf_counter() - start) * 1000
+            return len(renders) + len(heartbeats)
+
+    def _drop_overflow(self) -> None:
+        while self.pending > self.max_pending:
+            longer = self._renders if len(self._renders) >= len(self._heartbeats) else self._heartbeats
+            excess = min(len(longer), self.pending - self.max_pending)
+            del longer[:excess]
+            self._dropped += excess
+
+    async def trim(self) -> int:
+        """Keep the newest ``heartbeats_per_device`` heartbeats of every device
+        and ``ROLLUP_HOURLY_RETENTION_DAYS`` of hourly rollups. Returns the rows deleted."""
+        await self.flush()
+        async with self._lock:
+            db = await get_telemetry_db()
+            cursor = await db.execute(_TRIM_HEARTBEATS, (self.heartbeats_per_device,))
+            await db.commit()
+            deleted = cursor.rowcount
+            if ROLLUP_HOURLY_RETENTION_DAYS > 0:
+                deleted += await prune_hourly(db, ROLLUP_HOURLY_RETENTION_DAYS)
+            self._trimmed += deleted
+            return deleted
+
+    async def run(self, trim_interval: float = TELEMETRY_TRIM_INTERVAL_SECONDS) -> None:
+        """Flush every ``flush_interval`` and trim every ``trim_interval`` until cancelled."""
+        interval = self.flush_interval if self.flush_interval > 0 else 1.0
+        next_trim = time.monotonic() + trim_interval if trim_interval > 0 else None
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+                if next_trim is not None and time.monotonic() >= next_trim:
+                    trimmed = await self.trim()
+                    next_trim = time.monotonic() + trim_interval
+                    logger.info(f"[TELEMETRY] Trimmed {trimmed} old heartbeats and hourly rollups")
+            except Exception:
+                logger.warning("[TELEMETRY] Flush failed", exc_info=True)
+
+    async def aclose(self) -> None:
+        """Flush what is left; called on shutdown."""
+        for task in list(self._background):
+            await asyncio.gather(task, return_exceptions=True)
+        written = await self.flush()
+        if written:
+            logger.info(f"[TELEMETRY] Flushed {written} rows on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "recorded": self._recorded,
+            "written": self._written,
+            "flushes": self._flushes,
+            "rows_per_flush": round(self._written / self._flushes, 1) if self._flushes else 0.0,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "errors": self._errors,
+            "dropped": self._dropped,
+            "trimmed": self._trimmed,
+        }
+
+
+# Global telemetry buffer instance
+telemetry = TelemetryBuffer()
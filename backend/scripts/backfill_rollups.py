@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+渲染统计汇总表重建
+从 render_logs 全量重算按小时 / 按天的汇总表（render_rollup_hourly / render_rollup_daily）。
+服务启动时若汇总表为空会自动回填；手动修改过 render_logs 或升级了汇总逻辑后用本脚本重建。
+每张汇总表在各自的事务内先清空再写入，写锁一次只覆盖一张表的聚合。
+服务运行时也可执行：期间的遥测批量写入会等待锁（busy_timeout 5 秒），
+超时的批次保留在内存中、下次刷新时重试；日志量很大时建议在低峰期执行。
+
+用法:
+    python scripts/backfill_rollups.py                      # 默认主数据库
+    python scripts/backfill_rollups.py --db /path/to/inksight.db
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core import db as db_mod  # noqa: E402
+from core import stats_store  # noqa: E402
+from core.rollups import DAILY, HOURLY, rebuild_rollups  # noqa: E402
+
+
+async def main_async(path: str) -> None:
+    with patch.object(db_mod, "_MAIN_DB_PATH", path), patch.object(stats_store, "DB_PATH", path):
+        await stats_store.init_stats_db()
+        db = await db_mod.get_main_db()
+        start = time.perf_counter()
+        count = await rebuild_rollups(db)
+        elapsed = (time.perf_counter() - start) * 1000
+        sizes = {}
+        for table in (HOURLY, DAILY):
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+            sizes[table] = (await cursor.fetchone())[0]
+        await db_mod.close_all()
+    print(f"rebuilt from {count} render logs in {elapsed:.1f} ms")
+    for table, rows in sizes.items():
+        print(f"  {table}: {rows} rows")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild render rollups from render_logs")
+    parser.add_argument("--db", default=db_mod._MAIN_DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"database not found: {args.db}", file=sys.stderr)
+        return 1
+    asyncio.run(main_async(os.path.abspath(args.db)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+帧响应格式体积基准
+用所有内置 JSON 模式的 fallback 内容渲染，对比 /api/render 各响应格式的字节数
+与服务端编码耗时：bmp（默认）、raw1（紧凑行）、raw1rle（PackBits），
+并列出 zlib 作为参考。不访问网络、不调用 LLM。
+
+用法:
+    python scripts/bench_frame_formats.py                 # 默认 400x300
+    python scripts/bench_frame_formats.py --size 800x480 -n 50
+    python scripts/bench_frame_formats.py --mode STOIC --mode ZEN
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import zlib
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core.framebuffer import Frame  # noqa: E402
+from core.json_content import _get_fallback  # noqa: E402
+from core.json_renderer import render_json_mode  # noqa: E402
+from core.mode_registry import get_registry  # noqa: E402
+
+FORMATS = ("bmp", "raw1", "raw1rle")
+
+RENDER_KW = dict(
+    date_str="2月3日 周一",
+    weather_str="晴 12°C",
+    battery_pct=80,
+    weather_code=0,
+    time_str="10:00",
+)
+
+
+def encode_ms(frame: Frame, fmt: str, iterations: int) -> float:
+    """Mean milliseconds to produce ``fmt`` from a freshly decoded cache payload."""
+    payload = frame.to_payload()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        Frame.from_payload(payload).encode(fmt)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Byte size of /api/render response formats")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--size", default="400x300", help="WxH, e.g. 400x300")
+    parser.add_argument("--mode", action="append", default=[], help="Limit to mode_id (repeatable)")
+    args = parser.parse_args()
+
+    w, h = (int(x) for x in args.size.lower().split("x"))
+    registry = get_registry()
+    wanted = {m.upper() for m in args.mode}
+    modes = [
+        info.mode_id for info in registry.list_modes()
+        if info.source == "builtin_json" and (not wanted or info.mode_id in wanted)
+    ]
+
+    print(f"{len(modes)} builtin modes at {w}x{h}, bytes per response\n")
+    print(f"{'mode':<12}" + "".join(f"{fmt:>10}" for fmt in FORMATS) + f"{'zlib':>10}{'rle/bmp':>10}")
+    totals = dict.fromkeys(FORMATS + ("zlib",), 0)
+    timings = dict.fromkeys(FORMATS, 0.0)
+    for mode_id in modes:
+        definition = registry.get_json_mode(mode_id).definition
+        img = render_json_mode(definition, _get_fallback(definition["content"]), screen_w=w, screen_h=h, **RENDER_KW)
+        frame = Frame.from_image(img)
+        sizes = {fmt: len(frame.encode(fmt)) for fmt in FORMATS}
+        sizes["zlib"] = len(zlib.compress(frame.rows, 9))
+        for key, size in sizes.items():
+            totals[key] += size
+        for fmt in FORMATS:
+            timings[fmt] += encode_ms(frame, fmt, args.iterations)
+        print(f"{mode_id:<12}" + "".join(f"{sizes[k]:>10}" for k in FORMATS + ("zlib",))
+              + f"{sizes['raw1rle'] / sizes['bmp']:>9.1%}")
+
+    if modes:
+        print(f"\n{'total':<12}" + "".join(f"{totals[k]:>10}" for k in FORMATS + ("zlib",))
+              + f"{totals['raw1rle'] / totals['bmp']:>9.1%}")
+        print(f"{'encode ms':<12}" + "".join(f"{timings[fmt] / len(modes):>10.3f}" for fmt in FORMATS))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+LLM 客户端池基准
+在本地启动一个兼容 OpenAI 接口的假服务，对比每次调用新建 AsyncOpenAI
+客户端（旧行为）与复用连接池客户端的单次调用耗时和新建连接数。
+本地回环没有 TLS 握手与网络往返，线上节省的建连开销会更大。
+
+用法:
+    python scripts/bench_llm_pool.py                       # 200 次调用，并发 8
+    python scripts/bench_llm_pool.py --calls 500 --concurrency 16 --server-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from openai import AsyncOpenAI  # noqa: E402
+
+from core.llm_pool import LLMClientPool  # noqa: E402
+
+connections: set[tuple[str, int]] = set()
+
+
+def _fake_server(server_ms: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        connections.add((request.client.host, request.client.port))
+        body = await request.json()
+        await asyncio.sleep(server_ms / 1000)
+        return {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "行动胜于空谈。"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 8, "total_tokens": 18},
+        }
+
+    return app
+
+
+def _start_server(server_ms: float) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(_fake_server(server_ms), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+async def _call(client: AsyncOpenAI) -> None:
+    await client.chat.completions.create(
+        model="deepseek-chat",
+        messages=[{"role": "user", "content": "hi"}],
+        max_tokens=16,
+    )
+
+
+async def run(base_url: str, pooled: bool, calls: int, concurrency: int) -> list[float]:
+    pool = LLMClientPool()
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with sem:
+            start = time.perf_counter()
+            if pooled:
+                client = pool.get("deepseek", base_url, "sk-bench")
+            else:
+                client = AsyncOpenAI(api_key="sk-bench", base_url=base_url)
+            await _call(client)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    await pool.aclose()
+    return latencies
+
+
+def _summary(latencies: list[float]) -> str:
+    s = sorted(latencies)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]  # noqa: E731
+    return f"mean {sum(s) / len(s):7.2f} ms   p50 {pick(0.5):7.2f} ms   p95 {pick(0.95):7.2f} ms"
+
+
+async def main_async(args) -> None:
+    base_url = _start_server(args.server_ms)
+    print(f"{args.calls} calls, concurrency {args.concurrency}, server {args.server_ms} ms, {base_url}\n")
+    for label, pooled in (("new client", False), ("pooled", True)):
+        connections.clear()
+        latencies = await run(base_url, pooled, args.calls, args.concurrency)
+        print(f"{label:<11} {_summary(latencies)}   connections {len(connections)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pooled vs per-call LLM client benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--server-ms", type=float, default=5.0, help="Simulated completion latency")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
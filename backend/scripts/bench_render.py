@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+渲染性能基准
+用所有内置 JSON 模式的 fallback 内容反复渲染，对比单次渲染 CPU 耗时：
+  --compare wrap     逐字贪心换行 vs 字形宽度缓存换行引擎（默认）
+  --compare measure  居中布局先整体绘制到临时画布再重绘 vs 仅测量单遍布局
+不访问网络、不调用 LLM。
+
+用法:
+    python scripts/bench_render.py                 # 默认 400x300，每模式 20 次
+    python scripts/bench_render.py -n 50 --size 800x480
+    python scripts/bench_render.py --mode STOIC --mode ZEN
+    python scripts/bench_render.py --compare measure
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core import json_renderer  # noqa: E402
+from core.json_renderer import RenderContext, compile_layout, render_json_mode  # noqa: E402
+from core.mode_registry import get_registry  # noqa: E402
+from core.patterns.text_layout import clear_glyph_cache, glyph_cache_info  # noqa: E402
+
+
+def legacy_wrap_text(text, font, max_width):
+    """The original per-character greedy wrap_text, kept for comparison."""
+    lines = []
+    for paragraph in text.split("\n"):
+        current = ""
+        for ch in paragraph:
+            test = current + ch
+            if font.getbbox(test)[2] > max_width:
+                if current:
+                    lines.append(current)
+                current = ch
+            else:
+                current = test
+        if current:
+            lines.append(current)
+    return lines
+
+
+@contextmanager
+def legacy_wrap():
+    with patch("core.json_renderer.wrap_text", legacy_wrap_text):
+        yield
+
+
+_post_init = RenderContext.__post_init__
+
+
+def _legacy_post_init(self):
+    """Turn measure-only contexts back into full renders on a throwaway canvas."""
+    _post_init(self)
+    if self.measure_only:
+        self.img = Image.new("1", (self.screen_w, self.screen_h), 1)
+        self.draw = ImageDraw.Draw(self.img)
+        self.measure_only = False
+
+
+@contextmanager
+def legacy_measure():
+    """The original two-pass centering: rasterize everything twice, wrap twice."""
+    with patch.object(RenderContext, "__post_init__", _legacy_post_init), \
+            patch.object(RenderContext, "wrap", lambda self, text, font, w: json_renderer.wrap_text(text, font, w)):
+        yield
+
+
+LEGACY = {"wrap": legacy_wrap, "measure": legacy_measure}
+
+
+def fallback_content(definition: dict) -> dict:
+    content_cfg = definition.get("content", {})
+    pool = content_cfg.get("fallback_pool")
+    if pool:
+        return dict(pool[0])
+    return dict(content_cfg.get("fallback", {}))
+
+
+def render_once(definition: dict, content: dict, w: int, h: int):
+    return render_json_mode(
+        definition, content,
+        date_str="2月16日 周一", weather_str="12°C", battery_pct=85,
+        weather_code=1, time_str="09:30", screen_w=w, screen_h=h,
+    )
+
+
+def time_mode(definition: dict, content: dict, w: int, h: int, iterations: int) -> float:
+    """Return mean milliseconds per render after one warm-up render."""
+    render_once(definition, content, w, h)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render_once(definition, content, w, h)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="InkSight render micro-benchmark")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--size", default="400x300", help="WxH, e.g. 400x300")
+    parser.add_argument("--mode", action="append", default=[], help="Limit to mode_id (repeatable)")
+    parser.add_argument("--compare", choices=sorted(LEGACY), default="wrap",
+                        help="Legacy path to compare against (measure: centered-body modes only)")
+    args = parser.parse_args()
+
+    w, h = (int(x) for x in args.size.lower().split("x"))
+    registry = get_registry()
+    wanted = {m.upper() for m in args.mode}
+    modes = [
+        info.mode_id for info in registry.list_modes()
+        if info.source == "builtin_json" and (not wanted or info.mode_id in wanted)
+    ]
+    if args.compare == "measure":
+        modes = [
+            mode_id for mode_id in modes
+            if compile_layout(registry.get_json_mode(mode_id).definition, w, h).body_mode == "center"
+        ]
+
+    print(f"Rendering {len(modes)} builtin modes at {w}x{h}, {args.iterations} iterations each\n")
+    print(f"{'mode':<12}{'legacy ms':>12}{'engine ms':>12}{'speedup':>10}")
+    total_legacy = total_engine = 0.0
+    clear_glyph_cache()
+    for mode_id in modes:
+        definition = registry.get_json_mode(mode_id).definition
+        content = fallback_content(definition)
+        with LEGACY[args.compare]():
+            legacy_ms = time_mode(definition, content, w, h, args.iterations)
+        engine_ms = time_mode(definition, content, w, h, args.iterations)
+        total_legacy += legacy_ms
+        total_engine += engine_ms
+        speedup = legacy_ms / engine_ms if engine_ms else 0.0
+        print(f"{mode_id:<12}{legacy_ms:>12.2f}{engine_ms:>12.2f}{speedup:>9.2f}x")
+
+    if modes:
+        print(f"\n{'total':<12}{total_legacy:>12.2f}{total_engine:>12.2f}"
+              f"{total_legacy / total_engine if total_engine else 0.0:>9.2f}x")
+    print(f"\nGlyph cache: {glyph_cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+渲染执行池基准
+并发渲染内置 JSON 模式，对比 inline（在事件循环内渲染）、thread、process
+三种执行方式的吞吐量与事件循环延迟。
+
+用法:
+    python scripts/bench_render_pool.py                        # 每种方式 200 次渲染
+    python scripts/bench_render_pool.py --renders 500 --workers 4 --kinds thread,process
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core.json_content import _get_fallback  # noqa: E402
+from core.mode_registry import get_registry  # noqa: E402
+from core.render_pool import LoopLagMonitor, RenderPool  # noqa: E402
+
+RENDER_KW = dict(
+    date_str="2月3日 周一",
+    weather_str="晴 12°C",
+    battery_pct=80,
+    weather_code=0,
+    time_str="10:00",
+)
+
+
+def _jobs(width: int, height: int) -> list[tuple[str, dict, dict, object]]:
+    registry = get_registry()
+    jobs = []
+    for info in registry.list_modes():
+        if info.source != "builtin_json":
+            continue
+        mode_def = registry.get_json_mode(info.mode_id).definition
+        plan = registry.get_layout_plan(info.mode_id, width, height)
+        jobs.append((info.mode_id, mode_def, _get_fallback(mode_def["content"]), plan))
+    return jobs
+
+
+async def run(kind: str, workers: int, renders: int, width: int, height: int) -> tuple[float, dict]:
+    jobs = _jobs(width, height)
+    pool = RenderPool(kind, workers)
+    monitor = LoopLagMonitor(interval=0.005)
+    lag_task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0)
+    # Start the executor (and process workers) before timing
+    mode_id, mode_def, content, plan = jobs[0]
+    await pool.render(mode_id, mode_def, content, plan=plan, screen_w=width, screen_h=height, **RENDER_KW)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        pool.render(mode_id, mode_def, content, plan=plan, screen_w=width, screen_h=height, **RENDER_KW)
+        for mode_id, mode_def, content, plan in (jobs[i % len(jobs)] for i in range(renders))
+    ))
+    elapsed = time.perf_counter() - start
+    # Let a timer delayed by the last renders report in
+    await asyncio.sleep(monitor.interval * 2)
+    lag_task.cancel()
+    pool.shutdown()
+    return elapsed, monitor.stats()
+
+
+async def main_async(args) -> None:
+    print(f"{args.renders} renders at {args.width}x{args.height}, {args.workers} workers, "
+          f"{os.cpu_count()} CPUs\n")
+    for kind in args.kinds.split(","):
+        elapsed, lag = await run(kind, args.workers, args.renders, args.width, args.height)
+        print(f"{kind:<8} {args.renders / elapsed:8.1f} renders/s   "
+              f"loop lag p99 {lag['lag_p99_ms']:8.2f} ms   max {lag['lag_max_ms']:8.2f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Render pool throughput and event-loop lag benchmark")
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--kinds", default="inline,thread,process")
+    parser.add_argument("--width", type=int, default=400)
+    parser.add_argument("--height", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
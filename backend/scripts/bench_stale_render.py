@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+过期缓存渲染延迟基准
+模拟设备在缓存条目刚过期后请求 /api/render：宽限期为 0 时请求需同步等待
+LLM 生成；开启宽限期后直接返回旧帧并在后台重新生成。生成耗时为模拟值，
+不访问真实 LLM 与数据库。
+
+用法:
+    python scripts/bench_stale_render.py                      # 200 台设备，生成 800 ms
+    python scripts/bench_stale_render.py --devices 500 --generate-ms 1500 --grace 60
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from PIL import Image  # noqa: E402
+
+from core.cache import ContentCache  # noqa: E402
+from core.context import context_service  # noqa: E402
+from core.framebuffer import Frame  # noqa: E402
+
+CONFIG = {"modes": ["STOIC"], "refresh_interval": 60}
+
+
+async def serve(cache: ContentCache, mac: str, grace: int, generate_ms: float) -> Frame:
+    """The cache branch of ``api.index._build_image`` with a simulated generator."""
+    frame = await cache.get_frame(mac, "STOIC", CONFIG)
+    if frame is None and grace > 0:
+        frame = cache.get_stale_frame(mac, "STOIC", CONFIG, grace)
+        if frame is not None:
+            cache.revalidate(mac, "STOIC", CONFIG)
+    if frame is None:
+        await asyncio.sleep(generate_ms / 1000)
+        frame = Frame.from_image(Image.new("1", (400, 300), 1))
+        cache._cache[cache._get_cache_key(mac, "STOIC")] = (frame, datetime.now())
+    return frame
+
+
+async def run(devices: int, grace: int, generate_ms: float) -> list[float]:
+    cache = ContentCache()
+    frame = Frame.from_image(Image.new("1", (400, 300), 1))
+    expired = datetime.now() - timedelta(minutes=cache._get_ttl_minutes(CONFIG) + 1)
+    macs = [f"AA:BB:CC:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}:00" for i in range(devices)]
+    for mac in macs:
+        cache._cache[cache._get_cache_key(mac, "STOIC")] = (frame, expired)
+
+    async def slow_generate(mac, persona, *args, **kwargs):
+        await asyncio.sleep(generate_ms / 1000)
+        cache._cache[cache._get_cache_key(mac, persona)] = (frame, datetime.now())
+        return True
+
+    latencies: list[float] = []
+
+    async def poll(mac: str) -> None:
+        start = time.perf_counter()
+        await serve(cache, mac, grace, generate_ms)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    with patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=None), \
+         patch.object(cache, "_generate_single_mode", side_effect=slow_generate), \
+         patch.object(context_service, "date_context", new_callable=AsyncMock, return_value={}), \
+         patch.object(context_service, "weather", new_callable=AsyncMock, return_value={}):
+        await asyncio.gather(*(poll(mac) for mac in macs))
+        await asyncio.gather(*list(cache._background))
+    return latencies
+
+
+def _summary(latencies: list[float]) -> str:
+    s = sorted(latencies)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]  # noqa: E731
+    return f"p50 {pick(0.5):9.3f} ms   p95 {pick(0.95):9.3f} ms   max {s[-1]:9.3f} ms"
+
+
+async def main_async(args) -> None:
+    print(f"{args.devices} devices with expired entries, generation {args.generate_ms} ms\n")
+    for label, grace in (("grace 0", 0), (f"grace {args.grace}", args.grace)):
+        latencies = await run(args.devices, grace, args.generate_ms)
+        print(f"{label:<10} {_summary(latencies)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stale-while-revalidate render latency benchmark")
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--generate-ms", type=float, default=800.0, help="Simulated generate_and_render latency")
+    parser.add_argument("--grace", type=int, default=120, help="Stale grace window in minutes")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
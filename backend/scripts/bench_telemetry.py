@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+渲染日志写入基准
+模拟大量设备并发请求 /api/render 时的日志写入：对比每个请求同步
+INSERT + 清理心跳 + 两次 commit（旧行为）与写缓冲批量写入的每秒请求数。
+使用临时 SQLite 数据库，预先写入每台设备的历史心跳，使清理语句的开销接近真实情况。
+
+用法:
+    python scripts/bench_telemetry.py                       # 200 台设备，5000 个请求
+    python scripts/bench_telemetry.py --devices 1000 --requests 20000 --concurrency 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core import db as db_mod  # noqa: E402
+from core import stats_store  # noqa: E402
+from core.telemetry import TelemetryBuffer  # noqa: E402
+
+
+async def legacy_log(mac: str, persona: str, cache_hit: bool, elapsed_ms: int, voltage: float, rssi: int):
+    """The original per-request log_render + log_heartbeat."""
+    now = datetime.now().isoformat()
+    db = await db_mod.get_main_db()
+    await db.execute(
+        """INSERT INTO render_logs (mac, persona, cache_hit, render_time_ms, status, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (mac, persona, int(cache_hit), elapsed_ms, "success", now),
+    )
+    await db.commit()
+    await db.execute(
+        """INSERT INTO device_heartbeats (mac, battery_voltage, wifi_rssi, created_at)
+           VALUES (?, ?, ?, ?)""",
+        (mac, voltage, rssi, now),
+    )
+    await db.execute(
+        """DELETE FROM device_heartbeats
+           WHERE mac = ? AND id NOT IN (
+               SELECT id FROM device_heartbeats WHERE mac = ?
+               ORDER BY created_at DESC LIMIT 1000
+           )""",
+        (mac, mac),
+    )
+    await db.commit()
+
+
+async def seed(macs: list[str], heartbeats: int) -> None:
+    db = await db_mod.get_main_db()
+    start = datetime.now() - timedelta(days=30)
+    for mac in macs:
+        await db.executemany(
+            "INSERT INTO device_heartbeats (mac, battery_voltage, wifi_rssi, created_at) VALUES (?, ?, ?, ?)",
+            [(mac, 3.3, -60, (start + timedelta(minutes=i)).isoformat()) for i in range(heartbeats)],
+        )
+    await db.commit()
+
+
+async def run(label: str, log, macs: list[str], requests: int, concurrency: int) -> float:
+    queue = [random.choice(macs) for _ in range(requests)]
+    sem = asyncio.Semaphore(concurrency)
+
+    async def request(mac: str) -> None:
+        async with sem:
+            await log(mac, "STOIC", True, 12, 3.1, -60)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(mac) for mac in queue))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {requests / elapsed:10.0f} req/s   {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+async def main_async(args) -> None:
+    macs = [f"AA:BB:CC:{i >> 8 & 0xFF:02X}:{i & 0xFF:02X}:00" for i in range(args.devices)]
+    print(f"{args.requests} requests from {args.devices} devices, concurrency {args.concurrency}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        with patch.object(db_mod, "_MAIN_DB_PATH", path), patch.object(stats_store, "DB_PATH", path):
+            await stats_store.init_stats_db()
+            await seed(macs, args.heartbeats)
+
+            await run("per request", legacy_log, macs, args.requests, args.concurrency)
+
+            buffer = TelemetryBuffer(flush_interval=args.flush_ms / 1000)
+            flusher = asyncio.create_task(buffer.run(trim_interval=0))
+
+            async def buffered_log(mac, persona, cache_hit, elapsed_ms, voltage, rssi):
+                await buffer.record_render(mac, persona, cache_hit, elapsed_ms, "success", voltage, rssi)
+
+            await run("buffered", buffered_log, macs, args.requests, args.concurrency)
+            flusher.cancel()
+            await buffer.aclose()
+            start = time.perf_counter()
+            trimmed = await buffer.trim()
+            print(f"\nbuffer: {buffer.stats()}")
+            print(f"trim: {trimmed} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+            await db_mod.close_all()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-request vs buffered render log writes")
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--heartbeats", type=int, default=1000, help="Seeded heartbeats per device")
+    parser.add_argument("--flush-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+天气请求聚合基准
+模拟大量设备（分布在若干城市）同时请求渲染：对比每台设备各自请求天气
+（旧行为）与按城市坐标聚合、合并多坐标请求后的出站请求数和耗时。
+Open-Meteo 响应为模拟值，不访问网络。
+
+用法:
+    python scripts/bench_weather.py                             # 1000 台设备，20 个城市
+    python scripts/bench_weather.py --devices 5000 --cities 40 --api-ms 120
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core import context  # noqa: E402
+from core.config import CITY_COORDINATES  # noqa: E402
+
+calls = 0
+
+
+def _fake_open_meteo(api_ms: float):
+    async def fetch(url: str, params: dict):
+        global calls
+        calls += 1
+        await asyncio.sleep(api_ms / 1000)
+        count = len(params["latitude"].split(","))
+        items = [{"current": {"temperature_2m": 20.0, "weather_code": 1}} for _ in range(count)]
+        return items if count > 1 else items[0]
+
+    return fetch
+
+
+async def per_device(cities: list[str]) -> None:
+    async def one(city: str) -> None:
+        await context._fetch_current_weather([context._resolve_city(city)])
+
+    await asyncio.gather(*(one(city) for city in cities))
+
+
+async def aggregated(cities: list[str]) -> None:
+    service = context.ContextService()
+    await asyncio.gather(*(service.weather(city=city) for city in cities))
+
+
+async def main_async(args) -> None:
+    global calls
+    names = list(CITY_COORDINATES)[: args.cities]
+    devices = [random.choice(names) + random.choice(["", "市"]) for _ in range(args.devices)]
+    print(f"{args.devices} devices across {len(names)} cities, API {args.api_ms} ms\n")
+    with patch.object(context, "_fetch_weather_data", _fake_open_meteo(args.api_ms)):
+        for label, run in (("per device", per_device), ("aggregated", aggregated)):
+            calls = 0
+            start = time.perf_counter()
+            await run(devices)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{label:<11} requests {calls:6d}   {elapsed:8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-device vs city-aggregated weather benchmark")
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--api-ms", type=float, default=80.0, help="Simulated Open-Meteo latency")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+日历索引构建脚本
+离线生成农历 / 节日日历索引（默认写入 CALENDAR_INDEX_PATH），部署时随包分发即可
+省去启动时的构建；与当前年份或节日表不匹配的索引会在启动时自动重建。
+
+用法:
+    python scripts/build_calendar_index.py                      # 从今年起 CALENDAR_INDEX_YEARS 年
+    python scripts/build_calendar_index.py --years 5 --path /tmp/calendar_index.json
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core.calendar_index import CalendarIndex  # noqa: E402
+from core.config import CALENDAR_INDEX_PATH, CALENDAR_INDEX_YEARS  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the lunar / festival calendar index")
+    parser.add_argument("--years", type=int, default=CALENDAR_INDEX_YEARS)
+    parser.add_argument("--path", default=CALENDAR_INDEX_PATH)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        os.remove(args.path)
+    start = time.perf_counter()
+    index = CalendarIndex(path=args.path, years=args.years)
+    days = index.load_or_build()
+    stats = index.stats()
+    print(f"{days} days ({stats['start']} .. {stats['end']}) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"-> {os.path.abspath(args.path)} ({os.path.getsize(args.path) / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
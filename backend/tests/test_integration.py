@@ -2,15 +2,21 @@
 Integration tests for InkSight API -> render pipeline.
 Uses httpx.AsyncClient with FastAPI TestClient, mocking LLM calls.
 """
+import io
 import json
+from datetime import datetime, timedelta
 import pytest
 from unittest.mock import patch, AsyncMock
 from httpx import AsyncClient, ASGITransport
+from PIL import Image
 
 from api.index import app
 from core.cache import content_cache
+from core.delta import apply_delta
+from core.framebuffer import decode_raw1
 from core.config_store import init_db
 from core.stats_store import init_stats_db
+from core.telemetry import telemetry
 from core.cache import init_cache_db
 
 
@@ -44,7 +50,8 @@ async def client(tmp_path):
         async with AsyncClient(transport=transport, base_url="http://test") as c:
             yield c
 
-        # Clean up connections after each test
+        # Write buffered render logs into this test's database, then clean up connections
+        await telemetry.aclose()
         await db_mod.close_all()
 
 
@@ -216,6 +223,205 @@ async def test_cache_hit(client):
         assert resp2.content[:2] == b"BM"
         # LLM should NOT have been called again for the second render
         assert mock_llm.call_count == first_call_count
+        # Hits serve the stored bytes and their validator unchanged
+        frame, _ = content_cache._cache[content_cache._get_cache_key("BB:CC:DD:EE:FF:00", "STOIC")]
+        assert resp2.content == frame.bmp
+        assert resp2.headers["etag"] == frame.etag
+
+
+@pytest.mark.asyncio
+async def test_conditional_render_returns_304(client):
+    """A device sending the ETag of the frame it shows gets a bodiless 304."""
+    mac = "BB:CC:DD:EE:FF:04"
+    await client.post("/api/config", json={
+        "mac": mac, "modes": ["STOIC"], "refreshInterval": 60,
+        "llmProvider": "deepseek", "llmModel": "deepseek-chat",
+    })
+    params = {"mac": mac, "persona": "STOIC", "v": "3.85", "w": "400", "h": "300"}
+
+    with patch("core.json_content._call_llm", new_callable=AsyncMock, return_value=MOCK_LLM_RESPONSE), \
+         patch.object(content_cache, "check_and_regenerate_all", new_callable=AsyncMock):
+        first = await client.get("/api/render", params=params)
+        etag = first.headers["etag"]
+        assert first.headers["x-inksight-hash"] == etag.strip('"')
+
+        same = await client.get("/api/render", params=params, headers={"If-None-Match": etag})
+        assert same.status_code == 304
+        assert same.content == b""
+        assert same.headers["etag"] == etag
+        assert same.headers["x-inksight-hash"] == etag.strip('"')
+
+        weak = await client.get("/api/render", params=params, headers={"If-None-Match": f'"other", W/{etag}'})
+        assert weak.status_code == 304
+
+        changed = await client.get("/api/render", params=params, headers={"If-None-Match": '"other"'})
+        assert changed.status_code == 200
+        assert changed.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_render_raw_formats_match_bmp(client):
+    """raw1 / raw1rle carry the same pixels as the BMP, top-down and unpadded."""
+    mac = "BB:CC:DD:EE:FF:05"
+    await client.post("/api/config", json={
+        "mac": mac, "modes": ["STOIC"], "refreshInterval": 60,
+        "llmProvider": "deepseek", "llmModel": "deepseek-chat",
+    })
+    params = {"mac": mac, "persona": "STOIC", "v": "3.85", "w": "400", "h": "300"}
+
+    with patch("core.json_content._call_llm", new_callable=AsyncMock, return_value=MOCK_LLM_RESPONSE), \
+         patch.object(content_cache, "check_and_regenerate_all", new_callable=AsyncMock):
+        bmp = await client.get("/api/render", params=params)
+        expected = Image.open(io.BytesIO(bmp.content)).convert("1").tobytes()
+        for fmt in ("raw1", "raw1rle"):
+            resp = await client.get("/api/render", params={**params, "fmt": fmt})
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "application/octet-stream"
+            assert resp.headers["etag"] == bmp.headers["etag"]
+            assert decode_raw1(resp.content) == (400, 300, expected)
+        assert len(resp.content) < len(bmp.content)
+
+        bad = await client.get("/api/render", params={**params, "fmt": "png"})
+        assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_render_delta_against_reported_frame(client):
+    """delta1 sends changed rects against the frame the device reports showing."""
+    mac = "BB:CC:DD:EE:FF:06"
+    params = {"mac": mac, "persona": "STOIC", "w": "400", "h": "300", "fmt": "delta1"}
+
+    with patch("core.json_content._call_llm", new_callable=AsyncMock, return_value=MOCK_LLM_RESPONSE):
+        # Nothing remembered yet: a full raw1rle frame
+        first = await client.get("/api/render", params={**params, "v": "3.30"})
+        assert first.status_code == 200
+        _, _, rows = decode_raw1(first.content)
+        assert "x-inksight-base" not in first.headers
+
+        # Only the battery indicator changes
+        second = await client.get(
+            "/api/render", params={**params, "v": "2.00"}, headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert second.status_code == 200
+        assert second.content[:4] == b"INKD"
+        assert second.headers["x-inksight-base"] == first.headers["x-inksight-hash"]
+        assert len(second.content) < len(first.content)
+        rows, rects = apply_delta(rows, second.content)
+        assert rects
+
+        full = await client.get("/api/render", params={**params, "v": "2.00", "fmt": "bmp"})
+        assert rows == Image.open(io.BytesIO(full.content)).convert("1").tobytes()
+        assert full.headers["etag"] == second.headers["etag"]
+
+        # An unknown base falls back to the full frame
+        stale = await client.get("/api/render", params={**params, "v": "2.00"}, headers={"If-None-Match": '"other"'})
+        assert stale.content[:4] == b"INK1"
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_served_stale_while_revalidating(client):
+    """An expired-but-present render is returned at once and refreshed in the background."""
+    mock_llm = AsyncMock(return_value=MOCK_LLM_RESPONSE)
+    mac = "BB:CC:DD:EE:FF:01"
+    await client.post("/api/config", json={
+        "mac": mac, "modes": ["STOIC"], "refreshInterval": 60,
+        "llmProvider": "deepseek", "llmModel": "deepseek-chat",
+    })
+    params = {"mac": mac, "persona": "STOIC", "v": "3.85", "w": "400", "h": "300"}
+
+    # Keep background regeneration from refreshing the entry under the test
+    with patch("core.json_content._call_llm", mock_llm), \
+         patch.object(content_cache, "check_and_regenerate_all", new_callable=AsyncMock):
+        resp1 = await client.get("/api/render", params=params)
+        assert resp1.status_code == 200
+        calls = mock_llm.call_count
+
+        key = content_cache._get_cache_key(mac, "STOIC")
+        frame, _ = content_cache._cache[key]
+        content_cache._cache[key] = (frame, datetime.now() - timedelta(minutes=90))
+
+        with patch.object(content_cache, "revalidate") as mock_revalidate:
+            resp2 = await client.get("/api/render", params=params)
+        assert resp2.status_code == 200
+        assert resp2.content == frame.bmp
+        assert mock_llm.call_count == calls
+        mock_revalidate.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_next_cycle_persona_is_prerendered(client):
+    """With the cycle strategy the following persona is scheduled after each render."""
+    mock_llm = AsyncMock(return_value=MOCK_LLM_RESPONSE)
+    mac = "BB:CC:DD:EE:FF:02"
+    await client.post("/api/config", json={
+        "mac": mac, "modes": ["STOIC", "ZEN"], "refreshStrategy": "cycle",
+        "refreshInterval": 60, "llmProvider": "deepseek", "llmModel": "deepseek-chat",
+    })
+    params = {"mac": mac, "v": "3.85", "w": "400", "h": "300"}
+
+    with patch("core.json_content._call_llm", mock_llm), \
+         patch.object(content_cache, "check_and_regenerate_all", new_callable=AsyncMock), \
+         patch.object(content_cache, "prerender", return_value=True) as mock_prerender:
+        resp = await client.get("/api/render", params=params)
+        assert resp.status_code == 200
+        assert mock_prerender.call_args.args[:2] == (mac, "ZEN")
+
+        await client.get("/api/render", params=params)
+        assert mock_prerender.call_args.args[:2] == (mac, "STOIC")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_misses_generate_once(client):
+    """Retries racing the first render of a (mac, persona, size) share one generation."""
+    import asyncio
+    from core.scheduler import render_scheduler
+
+    async def slow_llm(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return MOCK_LLM_RESPONSE
+
+    mock_llm = AsyncMock(side_effect=slow_llm)
+    mac = "BB:CC:DD:EE:FF:03"
+    await client.post("/api/config", json={
+        "mac": mac, "modes": ["STOIC"], "refreshInterval": 60,
+        "llmProvider": "deepseek", "llmModel": "deepseek-chat",
+    })
+    params = {"mac": mac, "persona": "STOIC", "v": "3.85", "w": "400", "h": "300"}
+    deduped = render_scheduler.stats()["deduped"]
+
+    with patch("core.json_content._call_llm", mock_llm), \
+         patch.object(content_cache, "check_and_regenerate_all", new_callable=AsyncMock), \
+         patch.object(content_cache, "prerender", return_value=False):
+        responses = await asyncio.gather(*(client.get("/api/render", params=params) for _ in range(3)))
+
+    assert [r.status_code for r in responses] == [200] * 3
+    assert len({r.content for r in responses}) == 1
+    assert mock_llm.call_count == 1
+    assert render_scheduler.stats()["deduped"] - deduped == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_anonymous_previews_keep_their_battery(client):
+    """Mac-less renders only coalesce when the battery indicator matches."""
+    import asyncio
+    from core.scheduler import render_scheduler
+
+    async def slow_llm(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return MOCK_LLM_RESPONSE
+
+    mock_llm = AsyncMock(side_effect=slow_llm)
+    deduped = render_scheduler.stats()["deduped"]
+    with patch("core.json_content._call_llm", mock_llm):
+        responses = await asyncio.gather(*(
+            client.get("/api/render", params={"persona": "STOIC", "v": v})
+            for v in ("3.30", "3.30", "2.00")
+        ))
+
+    assert [r.status_code for r in responses] == [200] * 3
+    assert responses[0].content == responses[1].content
+    assert responses[0].content != responses[2].content
+    assert render_scheduler.stats()["deduped"] - deduped == 1
 
 
 # ---------------------------------------------------------------------------
@@ -7,6 +7,9 @@ from unittest.mock import AsyncMock, patch, MagicMock
 from PIL import Image
 
 from core.cache import ContentCache
+from core.context import context_service
+from core.framebuffer import Frame
+from core.render_pool import RenderPool
 
 
 def _make_image() -> Image.Image:
@@ -49,7 +52,7 @@ class TestContentCache:
 
         # Manually expire the entry
         key = cache._get_cache_key("AA:BB:CC:DD:EE:FF", "STOIC")
-        cache._cache[key] = (img, datetime.now() - timedelta(hours=10))
+        cache._cache[key] = (Frame.from_image(img), datetime.now() - timedelta(hours=10))
 
         # Simulate persistent cache miss to validate in-memory TTL expiry behavior.
         with patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=None):
@@ -94,7 +97,7 @@ class TestContentCache:
         await cache.set("AA:BB:CC:DD:EE:FF", "STOIC", img)
         await cache.set("AA:BB:CC:DD:EE:FF", "ROAST", img)
 
-        with patch.object(cache, "_generate_all_modes", new_callable=AsyncMock) as mock_gen:
+        with patch.object(cache, "_generate_modes", new_callable=AsyncMock) as mock_gen:
             result = await cache.check_and_regenerate_all(
                 "AA:BB:CC:DD:EE:FF", config, 3.3
             )
@@ -103,16 +106,17 @@ class TestContentCache:
 
     @pytest.mark.asyncio
     async def test_check_and_regenerate_all_triggers_on_miss(self, cache, config):
-        with patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=None), \
-             patch.object(cache, "_generate_all_modes", new_callable=AsyncMock) as mock_gen:
+        with patch.object(cache, "_get_many_from_db", new_callable=AsyncMock, return_value={}), \
+             patch.object(cache, "_generate_modes", new_callable=AsyncMock) as mock_gen:
             result = await cache.check_and_regenerate_all(
                 "AA:BB:CC:DD:EE:FF", config, 3.3
             )
             # Background rebuild returns False (non-blocking)
             assert result is False
-            # Background task spawned; await it to verify _generate_all_modes was called
+            # Background task spawned; await it to verify _generate_modes was called
             import asyncio
             await asyncio.sleep(0.1)  # Give background task a chance to run
+            assert mock_gen.call_args.args[2] == ["STOIC", "ROAST"]
 
     @pytest.mark.asyncio
     async def test_check_and_regenerate_returns_false_for_no_cacheable_modes(self, cache):
@@ -130,16 +134,16 @@ class TestGenerateSingleMode:
 
     @pytest.mark.asyncio
     async def test_success(self, cache, sample_config, sample_date_ctx, sample_weather):
-        mock_img = _make_image()
+        frame = Frame.from_image(_make_image())
         with patch("core.cache.generate_and_render", new_callable=AsyncMock) as mock_gar:
-            mock_gar.return_value = (mock_img, {"test": True})
+            mock_gar.return_value = (frame, {"test": True})
             result = await cache._generate_single_mode(
                 "AA:BB:CC:DD:EE:FF", "STOIC", 85.0,
                 sample_config, sample_date_ctx, sample_weather,
             )
             assert result is True
-            cached = await cache.get("AA:BB:CC:DD:EE:FF", "STOIC", sample_config)
-            assert cached is not None
+            cached = await cache.get_frame("AA:BB:CC:DD:EE:FF", "STOIC", sample_config)
+            assert cached is frame  # stored as rendered, not repacked
 
     @pytest.mark.asyncio
     async def test_failure_returns_false(self, cache, sample_config, sample_date_ctx, sample_weather):
@@ -150,3 +154,492 @@ class TestGenerateSingleMode:
                 sample_config, sample_date_ctx, sample_weather,
             )
             assert result is False
+
+
+class TestPersistentTier:
+    """cache.db round trips through the packed frame payload."""
+
+    @pytest.fixture
+    async def cache_db(self, tmp_path):
+        from core import db as db_mod
+        from core.cache import init_cache_db
+
+        await db_mod.close_all()
+        path = str(tmp_path / "cache.db")
+        with patch.object(db_mod, "_CACHE_DB_PATH", path), \
+             patch("core.cache._CACHE_DB_PATH", path):
+            await init_cache_db()
+            yield db_mod
+            await db_mod.close_all()
+
+    async def test_db_round_trip_is_packed(self, cache_db):
+        cache = ContentCache()
+        img = _make_image()
+        await cache.set("AA:BB", "STOIC", img)
+        db = await cache_db.get_cache_db()
+        row = await (await db.execute("SELECT image_data FROM image_cache")).fetchone()
+        assert row[0][:4] == b"INKF"
+
+        frame, created_at = await ContentCache()._get_from_db("AA:BB:STOIC")
+        assert frame == Frame.from_image(img)
+        assert datetime.now() - created_at < timedelta(minutes=1)
+
+    async def test_batched_lookup_loads_rows_into_memory(self, cache_db):
+        writer = ContentCache()
+        await writer.set("AA:BB", "STOIC", _make_image())
+        await writer.set("AA:BB", "ZEN", _make_image())
+
+        cache = ContentCache()
+        config = {"modes": ["STOIC", "ZEN", "ROAST"], "refresh_interval": 60}
+        plan = await cache.plan_regeneration("AA:BB", config)
+        assert plan.missing == ("ROAST",)
+        assert cache.stats()["db_reads"] == 1
+        assert "AA:BB:STOIC" in cache._cache and "AA:BB:ZEN" in cache._cache
+
+    async def test_legacy_png_row_is_read_and_migrated(self, cache_db):
+        import io
+        from core.renderer import image_to_bmp_bytes
+
+        img = _make_image()
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        db = await cache_db.get_cache_db()
+        await db.execute(
+            "INSERT INTO image_cache (cache_key, image_data, created_at) VALUES (?, ?, ?)",
+            ("AA:BB:STOIC", buf.getvalue(), datetime.now().isoformat()),
+        )
+        await db.commit()
+
+        frame = await ContentCache().get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]})
+        assert frame.bmp == image_to_bmp_bytes(img)
+        row = await (await db.execute("SELECT image_data FROM image_cache")).fetchone()
+        assert row[0][:4] == b"INKF"
+
+
+class TestMemoryTier:
+    """Byte-budgeted in-memory tier and hit statistics."""
+
+    @staticmethod
+    def _frame(w=400, h=300) -> Frame:
+        return Frame.from_image(Image.new("1", (w, h), 1))
+
+    def test_resident_bytes_tracked(self):
+        cache = ContentCache(max_bytes=10**6)
+        frame = self._frame()
+        cache._cache["a"] = (frame, datetime.now())
+        cache._cache["a"] = (frame, datetime.now())
+        assert cache._cache.resident_bytes == len(frame.bmp)
+        del cache._cache["a"]
+        assert cache._cache.resident_bytes == 0
+
+    def test_budget_evicts_oldest(self):
+        frame = self._frame()
+        cache = ContentCache(max_bytes=len(frame.bmp) * 2)
+        for key in ("a", "b", "c"):
+            cache._cache[key] = (frame, datetime.now())
+        assert "a" not in cache._cache
+        assert "b" in cache._cache and "c" in cache._cache
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["resident_bytes"] <= cache.stats()["max_bytes"]
+
+    def test_clear_resets_bytes(self):
+        cache = ContentCache()
+        cache._cache["a"] = (self._frame(), datetime.now())
+        cache._cache.clear()
+        assert cache.stats()["resident_bytes"] == 0
+
+    async def test_hit_returns_stored_frame_without_copy(self):
+        cache = ContentCache()
+        with patch.object(cache, "_save_to_db", new_callable=AsyncMock):
+            stored = await cache.set("AA:BB", "STOIC", _make_image())
+        hit = await cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]})
+        assert hit is stored
+        assert hit.etag.startswith('"') and len(hit.etag) == 34
+
+    async def test_stats_counts_hits_and_misses(self):
+        cache = ContentCache()
+        with patch.object(cache, "_save_to_db", new_callable=AsyncMock), \
+             patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=None):
+            await cache.set("AA:BB", "STOIC", _make_image())
+            await cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]})
+            await cache.get_frame("AA:BB", "ZEN", {"modes": ["ZEN"]})
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["avg_encode_us"] > 0
+        assert stats["saved_ms"] >= 0
+
+    async def test_encode_cost_comes_from_the_render_pool(self):
+        cache = ContentCache()
+        pool = RenderPool("inline")
+        pool.pack(_make_image())
+        with patch("core.cache.render_pool", pool), \
+             patch.object(cache, "_save_to_db", new_callable=AsyncMock):
+            await cache.set("AA:BB", "STOIC", Frame.from_image(_make_image()))
+            await cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]})
+            await cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]})
+            stats = cache.stats()
+        assert stats["avg_encode_us"] == round(pool.avg_encode_us, 1) > 0
+        assert stats["saved_ms"] == round(2 * pool.avg_encode_us / 1000, 1)
+
+
+class TestConcurrency:
+    """Lock-free reads, coalesced misses and per-key write locking."""
+
+    async def test_concurrent_misses_share_one_db_read(self):
+        import asyncio
+
+        cache = ContentCache()
+        frame = Frame.from_image(_make_image())
+
+        async def slow_read(key, ttl_minutes=None):
+            await asyncio.sleep(0.02)
+            return frame, datetime.now()
+
+        with patch.object(cache, "_get_from_db", side_effect=slow_read) as mock_read:
+            results = await asyncio.gather(*[
+                cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]}) for _ in range(20)
+            ])
+        assert mock_read.call_count == 1
+        assert all(r is frame for r in results)
+        stats = cache.stats()
+        assert stats["db_reads"] == 1
+        assert stats["coalesced_reads"] == 19
+        assert stats["inflight_reads"] == 0
+
+    async def test_slow_db_read_does_not_block_memory_hits(self):
+        import asyncio
+
+        cache = ContentCache()
+        gate = asyncio.Event()
+
+        async def blocked_read(key, ttl_minutes=None):
+            await gate.wait()
+            return None
+
+        with patch.object(cache, "_save_to_db", new_callable=AsyncMock):
+            await cache.set("AA:BB", "ZEN", _make_image())
+        with patch.object(cache, "_get_from_db", side_effect=blocked_read):
+            miss = asyncio.create_task(cache.get_frame("CC:DD", "STOIC", {"modes": ["STOIC"]}))
+            await asyncio.sleep(0)
+            hit = await asyncio.wait_for(
+                cache.get_frame("AA:BB", "ZEN", {"modes": ["ZEN"]}), timeout=0.5,
+            )
+            assert hit is not None
+            gate.set()
+            assert await miss is None
+
+    async def test_failed_db_read_releases_waiters(self):
+        import asyncio
+
+        cache = ContentCache()
+
+        async def failing_read(key, ttl_minutes=None):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("disk I/O error")
+
+        with patch.object(cache, "_get_from_db", side_effect=failing_read):
+            results = await asyncio.gather(*[
+                cache.get_frame("AA:BB", "STOIC", {"modes": ["STOIC"]}) for _ in range(3)
+            ])
+        assert results == [None, None, None]
+        assert cache.stats()["misses"] == 3
+
+    async def test_same_key_writes_are_serialized_and_measured(self):
+        import asyncio
+
+        cache = ContentCache()
+        order = []
+
+        async def slow_save(key, frame):
+            order.append(("start", key))
+            await asyncio.sleep(0.01)
+            order.append(("end", key))
+
+        with patch.object(cache, "_save_to_db", side_effect=slow_save):
+            await asyncio.gather(
+                cache.set("AA:BB", "STOIC", _make_image()),
+                cache.set("AA:BB", "STOIC", _make_image()),
+            )
+        assert order == [("start", "AA:BB:STOIC"), ("end", "AA:BB:STOIC")] * 2
+        stats = cache.stats()
+        assert stats["lock_waits"] == 1
+        assert stats["lock_wait_ms"] > 0
+        assert stats["lookup_p99_us"] >= 0
+
+
+class TestEviction:
+    """LRU bounds and the background sweeper."""
+
+    @staticmethod
+    def _entry(age_minutes: float = 0):
+        frame = Frame.from_image(_make_image())
+        return frame, datetime.now() - timedelta(minutes=age_minutes)
+
+    def test_entry_bound_evicts_least_recently_used(self):
+        cache = ContentCache(max_entries=2)
+        cache._cache["a"] = self._entry()
+        cache._cache["b"] = self._entry()
+        cache._cache.get("a")  # a is now most recently used
+        cache._cache["c"] = self._entry()
+        assert "b" not in cache._cache
+        assert "a" in cache._cache and "c" in cache._cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_expire_drops_old_entries(self):
+        cache = ContentCache()
+        cache._cache["old"] = self._entry(age_minutes=120)
+        cache._cache["new"] = self._entry()
+        assert cache._cache.expire(timedelta(minutes=60)) == 1
+        assert "old" not in cache._cache
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["resident_bytes"] == len(cache._cache["new"][0].bmp)
+
+    async def test_sweep_covers_both_tiers(self):
+        cache = ContentCache()
+        cache._cache["old"] = self._entry(age_minutes=120)
+        with patch.object(cache, "cleanup_expired", new_callable=AsyncMock, return_value=3) as mock_db:
+            removed = await cache.sweep(memory_max_age_minutes=60, db_max_age_hours=12)
+        assert removed == (1, 3)
+        mock_db.assert_awaited_once_with(12)
+        stats = cache.stats()
+        assert stats["sweeps"] == 1
+        assert stats["db_expired"] == 3
+        assert stats["last_sweep_at"] is not None
+
+    async def test_default_sweep_keeps_entries_within_longest_ttl(self):
+        cache = ContentCache()
+        # A 1440-minute interval over 3 modes gives a 79h TTL
+        config = {"refresh_interval": 1440, "modes": ["STOIC", "ZEN", "DAILY"]}
+        ttl = cache._get_ttl_minutes(config)
+        assert ttl > 72 * 60
+        cache._cache["valid"] = self._entry(age_minutes=ttl - 10)
+        cache._cache["ancient"] = self._entry(age_minutes=cache._max_age_minutes() + 10)
+        with patch.object(cache, "cleanup_expired", new_callable=AsyncMock, return_value=0) as mock_db:
+            removed = await cache.sweep()
+        assert removed == (1, 0)
+        assert "valid" in cache._cache and "ancient" not in cache._cache
+        assert mock_db.await_args.args[0] * 60 >= cache._max_age_minutes() > ttl
+
+    async def test_run_sweeper_repeats_until_cancelled(self):
+        import asyncio
+
+        cache = ContentCache()
+        with patch.object(cache, "sweep", new_callable=AsyncMock) as mock_sweep:
+            task = asyncio.create_task(cache.run_sweeper(0.01))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert mock_sweep.await_count >= 2
+
+    async def test_cleanup_expired_deletes_old_rows(self, tmp_path):
+        from core import db as db_mod
+        from core.cache import init_cache_db
+
+        await db_mod.close_all()
+        path = str(tmp_path / "cache.db")
+        with patch.object(db_mod, "_CACHE_DB_PATH", path), patch("core.cache._CACHE_DB_PATH", path):
+            await init_cache_db()
+            db = await db_mod.get_cache_db()
+            payload = Frame.from_image(_make_image()).to_payload()
+            for key, age in (("old", 72), ("new", 1)):
+                await db.execute(
+                    "INSERT INTO image_cache (cache_key, image_data, created_at) VALUES (?, ?, ?)",
+                    (key, payload, (datetime.now() - timedelta(hours=age)).isoformat()),
+                )
+            await db.commit()
+            assert await ContentCache().cleanup_expired(48) == 1
+            rows = await (await db.execute("SELECT cache_key FROM image_cache")).fetchall()
+            assert rows == [("new",)]
+            await db_mod.close_all()
+
+
+class TestStaleWhileRevalidate:
+    """Serving expired frames within a grace window while regenerating."""
+
+    CONFIG = {"modes": ["STOIC"], "refresh_interval": 60}  # TTL 66 min
+
+    @staticmethod
+    def _store(cache, age_minutes):
+        frame = Frame.from_image(_make_image())
+        key = cache._get_cache_key("AA:BB", "STOIC")
+        cache._cache[key] = (frame, datetime.now() - timedelta(minutes=age_minutes))
+        return frame
+
+    async def test_expired_entry_served_within_grace(self):
+        cache = ContentCache()
+        frame = self._store(cache, age_minutes=90)
+        with patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=None):
+            assert await cache.get_frame("AA:BB", "STOIC", self.CONFIG) is None
+        assert cache.get_stale_frame("AA:BB", "STOIC", self.CONFIG, grace_minutes=60) is frame
+        assert cache.stats()["stale_served"] == 1
+
+    def test_entry_beyond_grace_not_served(self):
+        cache = ContentCache()
+        self._store(cache, age_minutes=200)
+        assert cache.get_stale_frame("AA:BB", "STOIC", self.CONFIG, grace_minutes=60) is None
+
+    async def test_persisted_age_is_kept_on_load(self):
+        cache = ContentCache()
+        frame = Frame.from_image(_make_image())
+        old = datetime.now() - timedelta(minutes=90)
+        with patch.object(cache, "_get_from_db", new_callable=AsyncMock, return_value=(frame, old)):
+            assert await cache.get_frame("AA:BB", "STOIC", self.CONFIG) is None
+        assert cache.get_stale_frame("AA:BB", "STOIC", self.CONFIG, grace_minutes=60) is frame
+
+    async def test_revalidate_runs_once_per_key(self):
+        import asyncio
+
+        cache = ContentCache()
+        gate = asyncio.Event()
+
+        async def slow_generate(*args, **kwargs):
+            await gate.wait()
+            return True
+
+        with patch.object(cache, "_generate_single_mode", side_effect=slow_generate) as mock_gen, \
+             patch.object(context_service, "date_context", new_callable=AsyncMock, return_value={}), \
+             patch.object(context_service, "weather", new_callable=AsyncMock, return_value={}):
+            assert cache.revalidate("AA:BB", "STOIC", self.CONFIG) is True
+            assert cache.revalidate("AA:BB", "STOIC", self.CONFIG) is False
+            await asyncio.sleep(0.01)
+            assert cache.stats()["revalidating"] == 1
+            gate.set()
+            await asyncio.sleep(0.01)
+        assert mock_gen.call_count == 1
+        assert cache.stats()["revalidating"] == 0
+        assert cache.stats()["revalidations"] == 1
+
+    def test_revalidate_skipped_during_device_regeneration(self):
+        cache = ContentCache()
+        cache._regenerating["AA:BB"] = {cache._get_cache_key("AA:BB", "STOIC")}
+        assert cache.revalidate("AA:BB", "STOIC", self.CONFIG) is False
+
+
+class TestRegenerationPlanner:
+    """Only missing or soon-to-expire modes are regenerated."""
+
+    MAC = "AA:BB"
+    # 3 cacheable modes × 60 min × 1.1 = 198 min TTL
+    CONFIG = {"modes": ["STOIC", "ROAST", "ZEN"], "refresh_interval": 60}
+
+    @pytest.fixture
+    def cache(self):
+        cache = ContentCache()
+        patcher = patch.object(cache, "_get_many_from_db", new_callable=AsyncMock, return_value={})
+        patcher.start()
+        yield cache
+        patcher.stop()
+
+    def _store(self, cache, persona, age_minutes):
+        key = cache._get_cache_key(self.MAC, persona)
+        cache._cache[key] = (Frame.from_image(_make_image()), datetime.now() - timedelta(minutes=age_minutes))
+
+    async def test_classifies_modes(self, cache):
+        self._store(cache, "STOIC", 10)
+        self._store(cache, "ROAST", 170)  # expires within the next refresh
+        plan = await cache.plan_regeneration(self.MAC, self.CONFIG)
+        assert plan.fresh == ("STOIC",)
+        assert plan.expiring == ("ROAST",)
+        assert plan.missing == ("ZEN",)
+        assert plan.due == ("ZEN", "ROAST")
+
+    async def test_expiring_modes_are_spread_across_passes(self, cache):
+        self._store(cache, "STOIC", 150)
+        self._store(cache, "ROAST", 180)
+        self._store(cache, "ZEN", 160)
+        plan = await cache.plan_regeneration(self.MAC, self.CONFIG)
+        assert set(plan.expiring) == {"STOIC", "ROAST", "ZEN"}
+        assert plan.due == ("ROAST",)
+
+    async def test_only_due_modes_are_regenerated(self, cache):
+        import asyncio
+
+        self._store(cache, "STOIC", 10)
+        self._store(cache, "ROAST", 10)
+        with patch.object(cache, "_generate_modes", new_callable=AsyncMock) as mock_gen:
+            result = await cache.check_and_regenerate_all(self.MAC, self.CONFIG)
+            await asyncio.sleep(0.01)
+        assert result is False
+        assert mock_gen.call_args.args[2] == ["ZEN"]
+        stats = cache.stats()
+        assert stats["regen_planned"] == 1
+        assert stats["regen_skipped"] == 2
+
+    async def test_keys_under_revalidation_are_not_planned(self, cache):
+        cache._revalidating.add(cache._get_cache_key(self.MAC, "ZEN"))
+        for persona in ("STOIC", "ROAST"):
+            self._store(cache, persona, 10)
+        plan = await cache.plan_regeneration(self.MAC, self.CONFIG)
+        assert plan.missing == ("ZEN",)
+        assert plan.due == ()
+
+
+class TestPrerender:
+    """Predicted next personas are rendered ahead and scored on the next request."""
+
+    CONFIG = {"modes": ["STOIC", "ZEN"], "refresh_interval": 60}  # TTL 132 min
+
+    def _store(self, cache, persona, age_minutes):
+        key = cache._get_cache_key("AA:BB", persona)
+        cache._cache[key] = (Frame.from_image(_make_image()), datetime.now() - timedelta(minutes=age_minutes))
+
+    def test_entry_fresh_at_next_wake_is_left_alone(self):
+        cache = ContentCache()
+        self._store(cache, "ZEN", 30)
+        with patch.object(cache, "_start_regeneration") as mock_start:
+            assert cache.prerender("AA:BB", "ZEN", self.CONFIG) is False
+        mock_start.assert_not_called()
+
+    def test_entry_expiring_before_next_wake_is_rendered(self):
+        cache = ContentCache()
+        self._store(cache, "ZEN", 100)
+        with patch.object(cache, "_start_regeneration", return_value=True) as mock_start:
+            assert cache.prerender("AA:BB", "ZEN", self.CONFIG) is True
+        assert mock_start.call_args.args[:2] == ("AA:BB", "ZEN")
+        assert cache.stats()["prerender_scheduled"] == 1
+
+    def test_next_request_is_scored(self):
+        cache = ContentCache()
+        with patch.object(cache, "_start_regeneration", return_value=True):
+            cache.prerender("AA:BB", "ZEN", self.CONFIG)
+            cache.record_served("AA:BB", "ZEN", warm=True)
+            cache.prerender("AA:BB", "STOIC", self.CONFIG)
+            cache.record_served("AA:BB", "ZEN", warm=False)
+        # Requests without a pending prediction are not scored
+        cache.record_served("AA:BB", "ZEN", warm=False)
+        stats = cache.stats()
+        assert stats["prerender_predictions"] == 2
+        assert stats["prerender_prediction_hits"] == 1
+        assert stats["next_request_warm"] == 1
+        assert stats["next_request_warm_rate"] == 0.5
+
+    async def test_regeneration_of_other_modes_does_not_drop_prediction(self):
+        import asyncio
+
+        cache = ContentCache()
+        cache._regenerating["AA:BB"] = {cache._get_cache_key("AA:BB", "STOIC")}
+        with patch.object(cache, "_revalidate", new_callable=AsyncMock) as mock_revalidate:
+            assert cache.prerender("AA:BB", "ZEN", self.CONFIG) is True
+            assert cache.prerender("AA:BB", "STOIC", self.CONFIG) is False
+            await asyncio.sleep(0)
+        assert mock_revalidate.await_args.args[2] == "ZEN"
+
+    async def test_sweep_forgets_stale_predictions(self):
+        cache = ContentCache()
+        with patch.object(cache, "_start_regeneration", return_value=True), \
+             patch.object(cache, "cleanup_expired", new_callable=AsyncMock, return_value=0):
+            cache.prerender("AA:01", "ZEN", self.CONFIG)
+            cache.prerender("AA:02", "ZEN", self.CONFIG)
+            cache._predicted["AA:01"] = ("ZEN", datetime.now() - timedelta(minutes=90))
+            await cache.sweep(memory_max_age_minutes=60, db_max_age_hours=1)
+        assert list(cache._predicted) == ["AA:02"]
+
+    def test_predictions_are_bounded(self):
+        cache = ContentCache(max_entries=2)
+        with patch.object(cache, "_start_regeneration", return_value=True):
+            for mac in ("AA:01", "AA:02", "AA:03"):
+                cache.prerender(mac, "ZEN", self.CONFIG)
+        assert list(cache._predicted) == ["AA:02", "AA:03"]
@@ -0,0 +1,81 @@
+"""
+Unit tests for the precomputed lunar / festival calendar index.
+"""
+from datetime import date
+from unittest.mock import patch
+
+from core.calendar_index import CalendarIndex, build_days
+
+CONFIRMED = {"is_holiday": False, "holiday_name": "", "is_workday": True}
+
+
+class TestBuildDays:
+    def test_festivals_and_lunar_dates(self):
+        days = build_days(date(2026, 1, 1), date(2027, 1, 1))
+        assert len(days) == 365
+        assert days["2026-02-17"]["festival"] == "春节"
+        assert days["2026-02-17"]["lunar"] == [1, 1]
+        assert days["2026-09-25"]["festival"] == "中秋节"
+        assert days["2026-08-19"]["festival"] == "七夕节"
+
+    def test_workday_estimate(self):
+        days = build_days(date(2026, 1, 1), date(2027, 1, 1))
+        assert days["2026-01-02"]["is_workday"]  # Friday
+        assert days["2026-01-03"]["is_holiday"]  # Saturday
+        assert days["2026-10-01"]["is_holiday"]  # National Day on a Thursday
+        assert not any(d["confirmed"] for d in days.values())
+
+    def test_next_holiday_distance(self):
+        days = build_days(date(2026, 1, 1), date(2027, 1, 1))
+        assert days["2026-01-02"]["upcoming"]["holiday_name"] == "春节"
+        assert days["2026-01-02"]["upcoming"]["days_until"] == 46
+        assert days["2026-02-17"]["upcoming"]["holiday_name"] == "劳动节"
+        # Looks past the end of the range
+        assert days["2026-12-31"]["upcoming"]["holiday_name"] == "元旦"
+        assert days["2026-12-31"]["upcoming"]["days_until"] == 1
+
+
+class TestCalendarIndex:
+    def test_built_once_then_loaded_from_disk(self, tmp_path):
+        path = str(tmp_path / "calendar.json")
+        first = CalendarIndex(path=path, years=2)
+        assert first.load_or_build(date(2026, 5, 1)) == 730
+        assert first.stats()["source"] == "built"
+
+        second = CalendarIndex(path=path, years=2)
+        with patch("core.calendar_index.build_days", side_effect=AssertionError("rebuilt")):
+            second.load_or_build(date(2026, 5, 1))
+        assert second.stats()["source"] == "disk"
+        assert second.get(date(2027, 2, 6))["festival"] == "春节"
+
+    def test_different_range_rebuilds(self, tmp_path):
+        path = str(tmp_path / "calendar.json")
+        CalendarIndex(path=path, years=1).load_or_build(date(2026, 5, 1))
+        index = CalendarIndex(path=path, years=2)
+        index.load_or_build(date(2026, 5, 1))
+        assert index.stats()["source"] == "built"
+
+    def test_lookup_outside_range_rebuilds_for_that_year(self):
+        index = CalendarIndex(path=None, years=1)
+        index.load_or_build(date(2026, 5, 1))
+        assert index.get(date(2028, 1, 1))["festival"] == "元旦"
+        assert index.stats()["start"] == "2028-01-01"
+
+    def test_confirmed_flags_persist(self, tmp_path):
+        path = str(tmp_path / "calendar.json")
+        index = CalendarIndex(path=path, years=1)
+        upcoming = {"days_until": 4, "holiday_name": "清明节", "date": "04月04日", "holiday_duration": 3}
+        record = index.confirm(date(2026, 3, 31), CONFIRMED, upcoming)
+        index.save()
+        assert record["confirmed"] and record["upcoming"]["holiday_name"] == "清明节"
+
+        reloaded = CalendarIndex(path=path, years=1)
+        reloaded.load_or_build(date(2026, 3, 31))
+        assert reloaded.get(date(2026, 3, 31)) == record
+        assert reloaded.stats()["confirmed"] == 1
+
+    def test_confirm_keeps_offline_upcoming_when_api_has_none(self):
+        index = CalendarIndex(path=None, years=1)
+        empty = {"days_until": 0, "holiday_name": "", "date": "", "holiday_duration": 0}
+        record = index.confirm(date(2026, 1, 2), CONFIRMED, empty)
+        assert record["upcoming"]["holiday_name"] == "春节"
@@ -167,26 +167,18 @@ class TestFetchHNStories:
                     return make_story_response(sid)
             return MagicMock(status_code=404)
 
-        with patch("core.content.httpx.AsyncClient") as MockClient:
-            instance = AsyncMock()
-            instance.get = mock_get
-            instance.__aenter__ = AsyncMock(return_value=instance)
-            instance.__aexit__ = AsyncMock(return_value=False)
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get = mock_get
+        with patch("core.content.get_http_client", return_value=instance):
             stories = await fetch_hn_top_stories(limit=3)
             assert len(stories) == 3
             assert stories[0]["title"] == "Story 100"
 
     @pytest.mark.asyncio
     async def test_failure_returns_empty(self):
-        with patch("core.content.httpx.AsyncClient") as MockClient:
-            instance = AsyncMock()
-            instance.get = AsyncMock(side_effect=Exception("Network error"))
-            instance.__aenter__ = AsyncMock(return_value=instance)
-            instance.__aexit__ = AsyncMock(return_value=False)
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get = AsyncMock(side_effect=Exception("Network error"))
+        with patch("core.content.get_http_client", return_value=instance):
             stories = await fetch_hn_top_stories()
             assert stories == []
 
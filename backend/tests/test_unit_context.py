@@ -1,11 +1,15 @@
 """
 Unit tests for context helpers (battery, city, weather).
 """
+import asyncio
+from datetime import datetime
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 
-from core.context import calc_battery_pct, _resolve_city, get_weather
-from core.config import DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+from core.calendar_index import CalendarIndex
+from core.context import ContextService, WeatherBatcher, calc_battery_pct, _resolve_city, get_weather
+from core.config import CITY_COORDINATES, DEFAULT_LATITUDE, DEFAULT_LONGITUDE
 
 
 class TestCalcBatteryPct:
@@ -42,6 +46,20 @@ class TestResolveCity:
         assert lat == DEFAULT_LATITUDE
         assert lon == DEFAULT_LONGITUDE
 
+    def test_index_matches_substring_scan(self):
+        def scan(city):
+            if city in CITY_COORDINATES:
+                return CITY_COORDINATES[city]
+            for name, c in CITY_COORDINATES.items():
+                if name in city or city in name:
+                    return c
+            return DEFAULT_LATITUDE, DEFAULT_LONGITUDE
+
+        queries = list(CITY_COORDINATES) + ["杭", "州", "浙江杭州市", "北京市朝阳区", "广州深圳", "阿特兰蒂斯", "京"]
+        queries += [name[1:] + "市" for name in CITY_COORDINATES]
+        for city in queries:
+            assert _resolve_city(city) == scan(city), city
+
 
 class TestGetWeather:
     @pytest.mark.asyncio
@@ -56,13 +74,9 @@ class TestGetWeather:
             }
         }
 
-        with patch("core.context.httpx.AsyncClient") as MockClient:
-            instance = AsyncMock()
-            instance.get = AsyncMock(return_value=mock_resp)
-            instance.__aenter__ = AsyncMock(return_value=instance)
-            instance.__aexit__ = AsyncMock(return_value=False)
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get = AsyncMock(return_value=mock_resp)
+        with patch("core.context.get_http_client", return_value=instance):
             result = await get_weather(city="杭州")
             assert result["temp"] == 15
             assert result["weather_code"] == 2
@@ -70,13 +84,152 @@ class TestGetWeather:
 
     @pytest.mark.asyncio
     async def test_failure_returns_default(self):
-        with patch("core.context.httpx.AsyncClient") as MockClient:
-            instance = AsyncMock()
-            instance.get = AsyncMock(side_effect=Exception("timeout"))
-            instance.__aenter__ = AsyncMock(return_value=instance)
-            instance.__aexit__ = AsyncMock(return_value=False)
-            MockClient.return_value = instance
-
+        instance = AsyncMock()
+        instance.get = AsyncMock(side_effect=Exception("timeout"))
+        with patch("core.context.get_http_client", return_value=instance):
             result = await get_weather(city="杭州")
             assert result["temp"] == 0
             assert result["weather_str"] == "--°C"
+
+
+WEATHER = {"temp": 15, "weather_code": 2, "weather_str": "15°C"}
+NO_HOLIDAYS = (
+    {"is_holiday": False, "holiday_name": "", "is_workday": True},
+    {"days_until": 3, "holiday_name": "元旦", "date": "01月01日", "holiday_duration": 1},
+)
+
+
+class TestContextService:
+    async def test_repeat_lookups_served_from_memory(self):
+        svc = ContextService()
+        with patch("core.context._load_weather", new_callable=AsyncMock, return_value=WEATHER) as load:
+            assert await svc.weather(city="杭州") == WEATHER
+            assert await svc.weather(city="杭州市") == WEATHER
+        load.assert_awaited_once()
+        assert svc.stats()["hits"] == 1
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        svc = ContextService()
+
+        async def slow_load(lat, lon):
+            await asyncio.sleep(0.01)
+            return WEATHER
+
+        with patch("core.context._load_weather", side_effect=slow_load) as load:
+            results = await asyncio.gather(*(svc.weather(city="北京") for _ in range(5)))
+        assert results == [WEATHER] * 5
+        assert load.call_count == 1
+        assert svc.stats()["coalesced"] == 4
+
+    async def test_results_are_copies(self):
+        svc = ContextService()
+        with patch("core.context._load_weather", new_callable=AsyncMock, return_value=WEATHER):
+            (await svc.weather(city="杭州"))["temp"] = 99
+            assert (await svc.weather(city="杭州"))["temp"] == 15
+
+    async def test_refreshes_in_background_before_expiry(self):
+        svc = ContextService()
+        fresh = dict(WEATHER, temp=20)
+        with patch("core.context._load_weather", new_callable=AsyncMock, side_effect=[WEATHER, fresh]) as load:
+            await svc.weather(city="杭州")
+            key, (value, _, expires_at) = next(iter(svc._entries.items()))
+            svc._entries[key] = (value, 0.0, expires_at)
+            assert (await svc.weather(city="杭州"))["temp"] == 15
+            await asyncio.sleep(0)
+            assert (await svc.weather(city="杭州"))["temp"] == 20
+        assert load.await_count == 2
+        assert svc.stats()["refreshes"] == 1
+
+    async def test_failure_falls_back_and_is_not_retried_immediately(self):
+        svc = ContextService()
+        with patch("core.context._load_weather", new_callable=AsyncMock, side_effect=Exception("down")) as load:
+            assert (await svc.weather(city="杭州"))["weather_str"] == "--°C"
+            assert (await svc.weather(city="杭州"))["weather_str"] == "--°C"
+        load.assert_awaited_once()
+        assert svc.stats()["errors"] == 1
+
+    async def test_failed_refresh_keeps_last_value(self):
+        svc = ContextService()
+        with patch("core.context._load_weather", new_callable=AsyncMock, side_effect=[WEATHER, Exception("down")]):
+            await svc.weather(city="杭州")
+            key, (value, _, _) = next(iter(svc._entries.items()))
+            svc._entries[key] = (value, 0.0, 0.0)
+            assert await svc.weather(city="杭州") == WEATHER
+
+    async def test_date_context_served_from_calendar_index(self, tmp_path):
+        index = CalendarIndex(path=str(tmp_path / "calendar.json"), years=1)
+        svc = ContextService()
+        with patch("core.context.calendar_index", index), \
+             patch("core.context._load_holidays", new_callable=AsyncMock, return_value=NO_HOLIDAYS) as load:
+            morning = await svc.date_context(datetime(2025, 12, 29, 8, 0))
+            assert morning["upcoming_holiday"] == "元旦"
+            assert morning["days_until_holiday"] == 3
+            await asyncio.gather(*svc._inflight.values())
+            evening = await svc.date_context(datetime(2025, 12, 29, 20, 30))
+            await svc.date_context(datetime(2025, 12, 30, 8, 0))
+            await asyncio.gather(*svc._inflight.values())
+        assert load.await_count == 2
+        assert morning["hour"] == 8 and evening["hour"] == 20
+        assert morning["is_workday"] and evening["is_workday"]
+        assert index.get(datetime(2025, 12, 29).date())["confirmed"]
+
+    async def test_failed_holiday_lookup_is_not_retried_immediately(self, tmp_path):
+        index = CalendarIndex(path=None, years=1)
+        svc = ContextService()
+        with patch("core.context.calendar_index", index), \
+             patch("core.context._load_holidays", new_callable=AsyncMock, side_effect=Exception("down")) as load:
+            for _ in range(3):
+                ctx = await svc.date_context(datetime(2026, 1, 1, 9, 0))
+                await asyncio.gather(*svc._inflight.values())
+        load.assert_awaited_once()
+        assert ctx["festival"] == "元旦" and ctx["is_holiday"]
+
+def _open_meteo(params):
+    lats = params["latitude"].split(",")
+    items = [{"current": {"temperature_2m": float(i), "weather_code": 0}} for i in range(len(lats))]
+    return items if len(items) > 1 else items[0]
+
+
+class TestWeatherBatcher:
+    async def test_locations_share_one_request(self):
+        batcher = WeatherBatcher(window=0.01)
+        with patch("core.context._fetch_weather_data", new_callable=AsyncMock,
+                   side_effect=lambda url, params: _open_meteo(params)) as fetch:
+            results = await asyncio.gather(
+                batcher.get(30.27, 120.15), batcher.get(39.9, 116.4), batcher.get(30.27, 120.15),
+            )
+        fetch.assert_awaited_once()
+        assert fetch.call_args.args[1]["latitude"] == "30.27,39.9"
+        assert [r["temp"] for r in results] == [0, 1, 0]
+        assert batcher.stats() == {"requests": 1, "locations": 2, "locations_per_request": 2.0}
+
+    async def test_single_location_response_is_an_object(self):
+        batcher = WeatherBatcher(window=0)
+        with patch("core.context._fetch_weather_data", new_callable=AsyncMock,
+                   side_effect=lambda url, params: _open_meteo(params)):
+            assert (await batcher.get(30.27, 120.15))["weather_str"] == "0°C"
+
+    async def test_batches_are_capped(self):
+        batcher = WeatherBatcher(window=0.01, max_batch=2)
+        with patch("core.context._fetch_weather_data", new_callable=AsyncMock,
+                   side_effect=lambda url, params: _open_meteo(params)) as fetch:
+            await asyncio.gather(*(batcher.get(float(i), 0.0) for i in range(5)))
+        assert fetch.await_count == 3
+
+    async def test_failure_reaches_every_waiter(self):
+        batcher = WeatherBatcher(window=0.01)
+        with patch("core.context._fetch_weather_data", new_callable=AsyncMock, side_effect=ValueError("down")):
+            results = await asyncio.gather(
+                batcher.get(1.0, 1.0), batcher.get(2.0, 2.0), return_exceptions=True,
+            )
+        assert all(isinstance(r, ValueError) for r in results)
+
+    async def test_refresh_fetches_each_city_once(self):
+        svc = ContextService()
+        with patch("core.context._fetch_weather_data", new_callable=AsyncMock,
+                   side_effect=lambda url, params: _open_meteo(params)) as fetch:
+            cities = ["杭州", "杭州市", "北京", "北京", "上海", None]
+            assert await svc.refresh_weather(cities) == 3
+            assert await svc.refresh_weather(cities) == 0
+            await svc.weather(city="杭州市")
+        fetch.assert_awaited_once()
@@ -0,0 +1,130 @@
+"""
+Unit tests for frame deltas: tile diffing and reconstructing full frames from deltas.
+"""
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from core.delta import DELTA_MAGIC, FrameHistory, apply_delta, crop_rows, diff_rects, encode_delta
+from core.framebuffer import Frame
+from core.json_renderer import render_json_mode
+from core.mode_registry import get_registry
+
+
+def _frame(img: Image.Image) -> Frame:
+    return Frame.from_image(img)
+
+
+def _mode_frame(mode_id: str, time_str: str, battery_pct: int = 80, w=400, h=300) -> Frame:
+    definition = get_registry().get_json_mode(mode_id).definition
+    content_cfg = definition.get("content", {})
+    pool = content_cfg.get("fallback_pool")
+    content = dict(pool[0]) if pool else dict(content_cfg.get("fallback", {}))
+    img = render_json_mode(
+        definition, content,
+        date_str="2月3日 周一", weather_str="晴 12°C", battery_pct=battery_pct,
+        weather_code=0, time_str=time_str, screen_w=w, screen_h=h,
+    )
+    return Frame.from_image(img)
+
+
+def _reconstruct(base: Frame, frame: Frame) -> tuple[bytes, list]:
+    delta = encode_delta(base, frame)
+    assert delta[:4] == DELTA_MAGIC
+    return apply_delta(base.rows, delta)
+
+
+def test_identical_frames_have_no_rects():
+    frame = _frame(Image.new("1", (400, 300), 1))
+    assert diff_rects(frame.rows, frame.rows, 400, 300) == []
+    rows, rects = _reconstruct(frame, frame)
+    assert rows == frame.rows and rects == []
+
+
+def test_single_pixel_change_is_one_tile():
+    img = Image.new("1", (400, 300), 1)
+    base = _frame(img)
+    img.putpixel((100, 50), 0)
+    assert diff_rects(base.rows, _frame(img).rows, 400, 300, 32, 16) == [(96, 48, 32, 16)]
+
+
+def test_adjacent_tiles_merge_and_clip_to_edges():
+    img = Image.new("1", (401, 77), 1)
+    base = _frame(img)
+    ImageDraw.Draw(img).rectangle((330, 60, 400, 76), fill=0)
+    rects = diff_rects(base.rows, _frame(img).rows, 401, 77, 32, 16)
+    assert rects == [(320, 48, 81, 29)]
+
+
+@pytest.mark.parametrize("mode_id", ["STOIC", "ZEN", "LIFEBAR", "COUNTDOWN"])
+def test_clock_tick_reconstructs_with_small_delta(mode_id):
+    base = _mode_frame(mode_id, "09:30")
+    frame = _mode_frame(mode_id, "09:31")
+    rows, rects = _reconstruct(base, frame)
+    assert rows == frame.rows
+    if base.rows != frame.rows:
+        assert sum(w * h for _, _, w, h in rects) < 400 * 300 // 10
+        assert len(encode_delta(base, frame)) < len(frame.encode("raw1rle")) // 4
+
+
+def test_mode_switch_reconstructs():
+    base = _mode_frame("STOIC", "09:30", w=296, h=128)
+    frame = _mode_frame("ZEN", "09:30", battery_pct=20, w=296, h=128)
+    rows, _ = _reconstruct(base, frame)
+    assert rows == frame.rows
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_reconstruct(seed):
+    rng = random.Random(seed)
+    w, h = rng.choice([(400, 300), (296, 128), (64, 9)])
+    img = Image.new("1", (w, h), 1)
+    draw = ImageDraw.Draw(img)
+    draw.text((5, 5), "InkSight", fill=0)
+    base = _frame(img)
+    for _ in range(rng.randint(1, 8)):
+        x0, y0 = rng.randrange(w), rng.randrange(h)
+        draw.rectangle((x0, y0, x0 + rng.randint(0, 40), y0 + rng.randint(0, 20)), fill=rng.choice([0, 1]))
+    frame = _frame(img)
+    rows, rects = _reconstruct(base, frame)
+    assert rows == frame.rows
+    for x, y, rw, rh in rects:
+        assert x % 8 == 0 and x + rw <= w and y + rh <= h
+        assert crop_rows(rows, w, (x, y, rw, rh)) == crop_rows(frame.rows, w, (x, y, rw, rh))
+
+
+def test_bad_deltas_rejected():
+    img = Image.new("1", (400, 300), 1)
+    base = _frame(img)
+    ImageDraw.Draw(img).line((0, 0, 399, 299), fill=0)
+    delta = encode_delta(base, _frame(img))
+    with pytest.raises(ValueError):
+        apply_delta(base.rows, b"INK1" + delta[4:])
+    with pytest.raises(ValueError):
+        apply_delta(base.rows, delta[:-3])
+    with pytest.raises(ValueError):
+        apply_delta(base.rows[:-50], delta)
+    with pytest.raises(ValueError):
+        encode_delta(base, _frame(Image.new("1", (296, 128), 1)))
+
+
+def test_history_prefers_smaller_body_and_is_bounded():
+    history = FrameHistory(max_devices=2)
+    blank = _frame(Image.new("1", (400, 300), 1))
+    noise = Image.effect_noise((400, 300), 128).convert("1")
+    busy = _frame(noise)
+
+    body, is_delta = history.encode(busy, None)
+    assert not is_delta and body == busy.encode("raw1rle")
+    # A delta from blank to noise is bigger than the full frame
+    body, is_delta = history.encode(busy, blank)
+    assert not is_delta
+    body, is_delta = history.encode(blank, blank)
+    assert is_delta and apply_delta(blank.rows, body)[0] == blank.rows
+
+    for mac in ("A", "B", "C"):
+        history.remember(mac, blank)
+    assert history.get("A") is None and history.get("C") is blank
+    stats = history.stats()
+    assert (stats["devices"], stats["deltas"], stats["full_frames"]) == (2, 1, 2)
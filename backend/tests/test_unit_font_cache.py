@@ -0,0 +1,99 @@
+"""
+Unit tests for the process-wide font object cache.
+"""
+from unittest.mock import MagicMock
+
+from core.json_renderer import warm_font_cache
+from core.mode_registry import get_registry
+from core.patterns.font_cache import FontCache, font_cache
+from core.patterns.utils import load_font, load_font_by_name
+
+
+def _loader(path=None):
+    font = MagicMock()
+    font.path = path
+    return MagicMock(return_value=font)
+
+
+class TestFontCache:
+    def test_loader_called_once_per_key(self):
+        cache = FontCache(max_entries=4)
+        loader = _loader()
+        a = cache.get("/fonts/a.ttf", 12, loader)
+        b = cache.get("/fonts/a.ttf", 12, loader)
+        assert a is b
+        assert loader.call_count == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_sizes_are_distinct_entries(self):
+        cache = FontCache(max_entries=4)
+        cache.get("/fonts/a.ttf", 12, _loader())
+        cache.get("/fonts/a.ttf", 14, _loader())
+        assert cache.stats()["entries"] == 2
+
+    def test_lru_eviction(self):
+        cache = FontCache(max_entries=2)
+        cache.get("a", 10, _loader())
+        cache.get("b", 10, _loader())
+        cache.get("a", 10, _loader())  # touch a → b is now LRU
+        cache.get("c", 10, _loader())
+        assert cache.stats()["evictions"] == 1
+        reload_b = _loader()
+        cache.get("b", 10, reload_b)
+        assert reload_b.call_count == 1
+        reload_a = _loader()
+        cache.get("a", 10, reload_a)
+        assert reload_a.call_count == 1  # a was evicted by b's reload
+
+    def test_resident_bytes_tracks_font_files(self, tmp_path):
+        font_file = tmp_path / "face.ttf"
+        font_file.write_bytes(b"\0" * 2048)
+        cache = FontCache(max_entries=1)
+        cache.get(str(font_file), 10, _loader(str(font_file)))
+        assert cache.stats()["resident_bytes"] == 2048
+        cache.get("other", 10, _loader())
+        assert cache.stats()["resident_bytes"] == 0
+
+    def test_clear(self):
+        cache = FontCache()
+        cache.get("a", 10, _loader())
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["misses"] == 0
+
+
+class TestLoadFontCaching:
+    def test_load_font_returns_cached_object(self):
+        font_cache.clear()
+        first = load_font("noto_serif_light", 17)
+        second = load_font("noto_serif_light", 17)
+        assert first is second
+        assert font_cache.stats()["hits"] >= 1
+
+    def test_unknown_key_falls_back_to_default(self):
+        font = load_font("does_not_exist", 12)
+        assert font is load_font("does_not_exist", 30)
+
+    def test_load_font_by_name_cached(self):
+        a = load_font_by_name("NotoSerifSC-Light.ttf", 19)
+        b = load_font_by_name("NotoSerifSC-Light.ttf", 19)
+        assert a is b
+
+    def test_warm_up_covers_builtin_modes(self):
+        font_cache.clear()
+        registry = get_registry()
+        defs = [
+            registry.get_json_mode(info.mode_id).definition
+            for info in registry.list_modes()
+            if info.source == "builtin_json"
+        ]
+        count = warm_font_cache(defs)
+        assert count > 0
+        assert font_cache.stats()["entries"] > 0
+        misses = font_cache.stats()["misses"]
+        # Status bar fonts at the default size are warm afterwards
+        load_font("noto_serif_extralight", 11)
+        assert font_cache.stats()["misses"] == misses
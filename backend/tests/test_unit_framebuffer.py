@@ -0,0 +1,149 @@
+"""
+Unit tests for packed 1-bit frames and the cache payload format.
+"""
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from core.framebuffer import (
+    PAYLOAD_VERSION,
+    RAW1_HEADER,
+    RAW1_PACKBITS,
+    RAW1_PLAIN,
+    EncodingCache,
+    Frame,
+    bmp_header,
+    bmp_stride,
+    decode_raw1,
+    is_legacy_payload,
+    packbits,
+    unpackbits,
+)
+from core.renderer import image_to_bmp_bytes
+
+
+def _drawn_image(w=400, h=300) -> Image.Image:
+    img = Image.new("1", (w, h), 1)
+    draw = ImageDraw.Draw(img)
+    draw.line((0, 0, w - 1, h - 1), fill=0, width=3)
+    draw.rectangle((10, 10, 60, 40), outline=0)
+    draw.text((20, h // 2), "InkSight 墨水屏", fill=0)
+    return img
+
+
+@pytest.mark.parametrize("size", [(400, 300), (296, 128), (401, 77), (800, 480)])
+def test_bmp_bytes_match_pillow(size):
+    img = _drawn_image(*size)
+    frame = Frame.from_image(img)
+    assert frame.bmp == image_to_bmp_bytes(img)
+    assert len(frame.pixels) == bmp_stride(size[0]) * size[1]
+
+
+def test_image_round_trip():
+    img = _drawn_image()
+    assert Frame.from_image(img).to_image().tobytes() == img.tobytes()
+
+
+def test_non_mono_images_are_converted():
+    img = _drawn_image().convert("L")
+    assert Frame.from_image(img).bmp == image_to_bmp_bytes(img.convert("1"))
+
+
+def test_payload_round_trip():
+    frame = Frame.from_image(_drawn_image(296, 128))
+    payload = frame.to_payload()
+    assert payload[4] == PAYLOAD_VERSION
+    assert len(payload) < 400 * 300 // 8 + 200
+    assert Frame.from_payload(payload) == frame
+
+
+def test_legacy_png_payload_is_read():
+    img = _drawn_image()
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    legacy = buf.getvalue()
+    assert is_legacy_payload(legacy)
+    assert Frame.from_payload(legacy).bmp == image_to_bmp_bytes(img)
+
+
+def test_bad_payloads_rejected():
+    payload = Frame.from_image(_drawn_image()).to_payload()
+    with pytest.raises(ValueError):
+        Frame.from_payload(b"XXXX" + payload[4:])
+    with pytest.raises(ValueError):
+        Frame.from_payload(payload[:-10])
+
+
+def test_header_is_cached_per_size():
+    assert bmp_header(400, 300) is bmp_header(400, 300)
+    assert len(bmp_header(400, 300)) == 62
+
+
+@pytest.mark.parametrize("size", [(400, 300), (296, 128), (401, 77)])
+def test_rows_are_top_down_and_unpadded(size):
+    img = _drawn_image(*size)
+    frame = Frame.from_image(img)
+    assert frame.rows == img.tobytes()
+    assert len(frame.rows) == (size[0] + 7) // 8 * size[1]
+
+
+def test_encodings_are_not_memoised_on_the_frame():
+    frame = Frame.from_image(_drawn_image(400, 300))
+    frame.encode("raw1")
+    frame.encode("raw1rle")
+    assert set(vars(frame)) == {"width", "height", "bmp", "etag"}
+    assert frame.encode("raw1rle") is frame.encode("raw1rle")
+
+
+def test_encoding_cache_is_byte_bounded():
+    cache = EncodingCache(max_bytes=40_000)
+    frames = [Frame.from_image(_drawn_image(400, 300 - i)) for i in range(4)]
+    for frame in frames:
+        cache.get(frame, "rows", frame._build_rows)
+    assert cache.resident_bytes <= 40_000
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["entries"] == 2
+    cache.get(frames[-1], "rows", frames[-1]._build_rows)
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"\xff",
+    b"\xff" * 1000,
+    b"\x00\x01" * 300,
+    b"ab" + b"\xff" * 2 + b"cd" + b"\x00" * 129 + b"e",
+    bytes(range(256)) * 3,
+])
+def test_packbits_round_trip(data):
+    assert unpackbits(packbits(data)) == data
+
+
+def test_packbits_compresses_white_runs():
+    assert packbits(b"\xff" * 256) == b"\x81\xff\x81\xff"
+    # Pairs stay literal; worst case grows by one byte per 128
+    assert len(packbits(bytes(range(256)))) == 258
+
+
+def test_raw1_header_and_decode():
+    img = _drawn_image()
+    frame = Frame.from_image(img)
+    for fmt, encoding in (("raw1", RAW1_PLAIN), ("raw1rle", RAW1_PACKBITS)):
+        data = frame.encode(fmt)
+        magic, width, height, enc, _, length = RAW1_HEADER.unpack_from(data, 0)
+        assert (magic, width, height, enc) == (b"INK1", 400, 300, encoding)
+        assert length == len(data) - RAW1_HEADER.size
+        assert decode_raw1(data) == (400, 300, img.tobytes())
+    assert len(frame.encode("raw1rle")) < len(frame.encode("raw1")) < len(frame.encode("bmp"))
+    assert frame.encode("raw1rle") is frame.encode("raw1rle")
+
+
+def test_bad_raw1_rejected():
+    data = Frame.from_image(_drawn_image()).encode("raw1rle")
+    with pytest.raises(ValueError):
+        decode_raw1(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        decode_raw1(data[:-5])
+    with pytest.raises(ValueError):
+        Frame.from_image(_drawn_image()).encode("png")
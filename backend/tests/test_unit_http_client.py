@@ -0,0 +1,101 @@
+"""
+Unit tests for the shared outbound HTTP client.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+
+from core.content import fetch_v2ex_hot
+from core.http_client import _HostLimitedTransport, close_http_client, get_http_client
+
+
+async def test_client_is_shared_on_one_loop():
+    client = get_http_client()
+    assert get_http_client() is client
+    await close_http_client()
+    assert get_http_client() is not client
+    await close_http_client()
+
+
+async def test_client_from_another_loop_is_closed():
+    from core import http_client as http_client_mod
+
+    client = get_http_client()
+    gone = asyncio.new_event_loop()
+    gone.close()
+    http_client_mod._client_loop = gone  # as if opened on a loop that has since closed
+    replacement = get_http_client()
+    assert replacement is not client
+    await asyncio.gather(*http_client_mod._closing)
+    assert client.is_closed
+    await close_http_client()
+
+
+async def test_per_host_limit(monkeypatch):
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def fake_send(self, request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", fake_send)
+    async with httpx.AsyncClient(transport=_HostLimitedTransport(2)) as client:
+        responses = await asyncio.gather(*(
+            client.get(f"https://{host}/x") for host in ["a.example", "b.example"] * 5
+        ))
+    assert all(r.status_code == 200 and r.content == b"ok" for r in responses)
+    assert peak == {"a.example": 2, "b.example": 2}
+
+
+async def test_slot_released_on_error(monkeypatch):
+    async def failing_send(self, request):
+        raise httpx.ConnectError("down", request=request)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", failing_send)
+    transport = _HostLimitedTransport(1)
+    async with httpx.AsyncClient(transport=transport) as client:
+        for _ in range(3):
+            try:
+                await asyncio.wait_for(client.get("https://a.example/"), 1)
+            except httpx.ConnectError:
+                pass
+    assert transport._hosts["a.example"]._value == 1
+
+
+async def test_fetchers_use_injected_client():
+    resp = MagicMock(status_code=200)
+    resp.json.return_value = [{"title": "T", "node": {"title": "N"}}]
+    client = AsyncMock()
+    client.get = AsyncMock(return_value=resp)
+    assert await fetch_v2ex_hot(client=client) == [{"title": "T", "node": "N"}]
+    client.get.assert_awaited_once()
+
+
+async def test_saturated_host_hits_pool_timeout(monkeypatch):
+    gate = asyncio.Event()
+
+    async def slow_send(self, request):
+        await gate.wait()
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", slow_send)
+    transport = _HostLimitedTransport(1)
+    timeout = httpx.Timeout(5, pool=0.05)
+    async with httpx.AsyncClient(transport=transport, timeout=timeout) as client:
+        first = asyncio.create_task(client.get("https://a.example/"))
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(client.get("https://a.example/"), 1)
+        except httpx.PoolTimeout:
+            pass
+        else:
+            raise AssertionError("expected PoolTimeout")
+        gate.set()
+        assert (await first).status_code == 200
+    assert transport._hosts["a.example"]._value == 1
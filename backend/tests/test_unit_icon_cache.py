@@ -0,0 +1,108 @@
+"""
+Unit tests for monochrome icon conversion and the icon atlas.
+"""
+import os
+
+import pytest
+from PIL import Image
+
+from core.patterns.icon_cache import IconCache, icon_cache, icon_source_signature
+from core.patterns.utils import ICONS_DIR, load_icon, prepare_icon_atlas, rgba_to_mono
+
+
+def _reference_mono(img, target_size=None):
+    """The original getpixel/putpixel conversion."""
+    if target_size:
+        img = img.resize(target_size, Image.LANCZOS)
+    img = img.convert("RGBA")
+    mono = Image.new("1", img.size, 1)
+    for x in range(img.width):
+        for y in range(img.height):
+            if img.getpixel((x, y))[3] > 128:
+                mono.putpixel((x, y), 0)
+    return mono
+
+
+@pytest.mark.parametrize("name", ["sunny", "book", "electric_bolt", "food"])
+@pytest.mark.parametrize("size", [None, (12, 12), (16, 16), (19, 19)])
+def test_rgba_to_mono_matches_reference(name, size):
+    src = Image.open(os.path.join(ICONS_DIR, f"{name}.png"))
+    expected = _reference_mono(src, size)
+    actual = rgba_to_mono(Image.open(os.path.join(ICONS_DIR, f"{name}.png")), size)
+    assert actual.mode == "1"
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_alpha_threshold():
+    img = Image.new("RGBA", (3, 1))
+    img.putdata([(0, 0, 0, 128), (0, 0, 0, 129), (255, 255, 255, 255)])
+    mono = rgba_to_mono(img)
+    assert list(mono.getdata()) == [255, 0, 0]
+
+
+def test_load_icon_is_cached():
+    icon_cache.clear()
+    first = load_icon("sunny", size=(16, 16))
+    second = load_icon("sunny", size=(16, 16))
+    assert first is second
+    assert icon_cache.stats()["hits"] == 1
+
+
+def test_missing_icon_cached_as_none():
+    icon_cache.clear()
+    assert load_icon("no_such_icon", size=(12, 12)) is None
+    assert load_icon("no_such_icon", size=(12, 12)) is None
+    assert icon_cache.stats()["misses"] == 1
+
+
+def test_unknown_names_are_bounded():
+    cache = IconCache(max_entries=4)
+    for i in range(10):
+        assert cache.get(f"made_up_{i}", (12, 12), lambda: None) is None
+    stats = cache.stats()
+    assert stats["entries"] == 4
+    assert stats["evictions"] == 6
+    assert [name for name, _ in cache._icons] == [f"made_up_{i}" for i in range(6, 10)]
+
+
+def test_hit_refreshes_recency():
+    cache = IconCache(max_entries=2)
+    cache.get("a", None, lambda: None)
+    cache.get("b", None, lambda: None)
+    cache.get("a", None, lambda: None)
+    cache.get("c", None, lambda: None)
+    assert set(cache._icons) == {("a", None), ("c", None)}
+
+
+class TestAtlas:
+    def test_round_trip(self, tmp_path):
+        icon_cache.clear()
+        path = str(tmp_path / "atlas.bin")
+        count = prepare_icon_atlas([(12, 12), (19, 19)], path)
+        assert count > 0
+        assert os.path.exists(path)
+        expected = load_icon("rainy", size=(19, 19)).tobytes()
+
+        icon_cache.clear()
+        assert prepare_icon_atlas([(12, 12), (19, 19)], path) == count
+        assert icon_cache.stats()["misses"] == 0
+        assert load_icon("rainy", size=(19, 19)).tobytes() == expected
+        assert icon_cache.stats()["misses"] == 0
+
+    def test_signature_mismatch_ignored(self, tmp_path):
+        cache = IconCache()
+        cache.get("dot", (2, 2), lambda: Image.new("1", (2, 2), 0))
+        path = str(tmp_path / "atlas.bin")
+        cache.save_atlas(path, "sig-a")
+        assert IconCache().load_atlas(path, "sig-b") == 0
+        fresh = IconCache()
+        assert fresh.load_atlas(path, "sig-a") == 1
+        assert fresh.get("dot", (2, 2), lambda: None).tobytes() == Image.new("1", (2, 2), 0).tobytes()
+
+    def test_corrupt_atlas_ignored(self, tmp_path):
+        path = tmp_path / "atlas.bin"
+        path.write_bytes(b"garbage")
+        assert IconCache().load_atlas(str(path), "sig") == 0
+
+    def test_signature_depends_on_sizes(self):
+        assert icon_source_signature(ICONS_DIR, [(12, 12)]) != icon_source_signature(ICONS_DIR, [(16, 16)])
@@ -0,0 +1,220 @@
+"""
+Unit tests for compiled JSON layout plans and their registry cache.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from core.json_content import _get_fallback
+from core import json_renderer
+from core.json_renderer import BlockPlan, LayoutPlan, RenderContext, compile_layout, render_json_mode
+from core.mode_registry import ModeRegistry, get_registry
+
+RENDER_KW = dict(
+    date_str="2月3日 周一",
+    weather_str="晴 12°C",
+    battery_pct=80,
+    weather_code=0,
+    time_str="10:00",
+)
+
+SIZES = [(400, 300), (296, 128), (800, 480)]
+
+
+def _mode_def(**layout_extra):
+    return {
+        "mode_id": "PLAN_TEST",
+        "content": {"type": "static", "static_data": {"text": "hello"}},
+        "layout": {
+            "body": [
+                {"type": "text", "field": "text", "font_size": 20},
+                {"type": "separator", "style": "short", "width": 60},
+            ],
+            "footer": {"label": "PLAN", "height": 30},
+            **layout_extra,
+        },
+    }
+
+
+def _builtin_ids():
+    registry = get_registry()
+    return [info.mode_id for info in registry.list_modes() if info.source == "builtin_json"]
+
+
+class TestCompileLayout:
+    def test_plan_is_immutable(self):
+        plan = compile_layout(_mode_def(), 400, 300)
+        assert isinstance(plan, LayoutPlan)
+        assert all(isinstance(b, BlockPlan) for b in plan.body)
+        with pytest.raises(AttributeError):
+            plan.footer_height = 0
+        with pytest.raises(TypeError):
+            plan.body[0].metrics["font_size"] = 1
+
+    def test_metrics_are_scaled(self):
+        small = compile_layout(_mode_def(), 400, 300)
+        large = compile_layout(_mode_def(), 800, 480)
+        assert small.body[0].metrics["font_size"] == 20
+        assert large.body[0].metrics["font_size"] == 40
+        sep = large.body[1].metrics
+        assert sep["x1"] - sep["x0"] == 120
+        assert large.footer_top == 480 - int(30 * 1.6)
+
+    def test_layout_overrides_applied(self):
+        mode_def = _mode_def()
+        mode_def["layout_overrides"] = {"296x128": {"body": [{"type": "spacer", "height": 10}]}}
+        assert [b.type for b in compile_layout(mode_def, 296, 128).body] == ["spacer"]
+        assert [b.type for b in compile_layout(mode_def, 400, 300).body] == ["text", "separator"]
+
+    def test_body_mode(self):
+        assert compile_layout(_mode_def(), 400, 300).body_mode == "center"
+        assert compile_layout(_mode_def(body_align="top"), 400, 300).body_mode == "top"
+        single = _mode_def()
+        single["layout"]["body"] = [{"type": "centered_text", "field": "text"}]
+        assert compile_layout(single, 400, 300).body_mode == "full_center"
+
+    def test_unknown_block_type_is_skipped(self):
+        mode_def = _mode_def()
+        mode_def["layout"]["body"].append({"type": "no_such_block"})
+        plan = compile_layout(mode_def, 400, 300)
+        assert plan.body[-1].type == "no_such_block"
+        img = render_json_mode(mode_def, {"text": "hi"}, plan=plan, **RENDER_KW)
+        assert img.size == (400, 300)
+
+
+class TestPlanRendering:
+    @pytest.mark.parametrize("mode_id", _builtin_ids())
+    def test_plan_matches_on_the_fly_compile(self, mode_id):
+        registry = get_registry()
+        mode_def = registry.get_json_mode(mode_id).definition
+        content = _get_fallback(mode_def["content"])
+        for w, h in SIZES:
+            plan = registry.get_layout_plan(mode_id, w, h)
+            with_plan = render_json_mode(mode_def, content, plan=plan, **RENDER_KW)
+            without = render_json_mode(mode_def, content, screen_w=w, screen_h=h, **RENDER_KW)
+            assert with_plan.size == (w, h)
+            assert with_plan.tobytes() == without.tobytes()
+
+    @pytest.mark.parametrize("size", [(296, 128), (400, 300)])
+    def test_centered_text_below_min_font_size(self, size):
+        # The baseline renderer raised UnboundLocalError when the scaled
+        # font size started below 10; it now draws at that size unshrunk.
+        mode_def = {
+            "mode_id": "TINY",
+            "content": {"type": "static", "static_data": {"text": "hello world"}},
+            "layout": {
+                "body_align": "center",
+                "body": [{"type": "centered_text", "field": "text", "font_size": 8}],
+                "footer": {"label": "TINY", "height": 20},
+            },
+        }
+        w, h = size
+        plan = compile_layout(mode_def, w, h)
+        assert plan.body[0].metrics["font_size"] < 10
+        drawn = render_json_mode(mode_def, {"text": "hello world"}, plan=plan, **RENDER_KW)
+        blank = render_json_mode(mode_def, {"text": ""}, plan=plan, **RENDER_KW)
+        assert drawn.size == (w, h)
+        assert drawn.tobytes() != blank.tobytes()
+
+
+class TestMeasurePass:
+    def test_measure_only_does_not_draw(self):
+        plan = compile_layout(_mode_def(), 400, 300)
+        img = Image.new("1", (400, 300), 1)
+        ctx = RenderContext(
+            draw=ImageDraw.Draw(img), img=img, content={"text": "hello world"},
+            y=40, measure_only=True,
+        )
+        for block in plan.body:
+            block.render(ctx, block)
+        assert ctx.y > 40
+        assert img.tobytes() == Image.new("1", (400, 300), 1).tobytes()
+
+    def test_centered_body_wraps_each_text_once(self):
+        mode_def = _mode_def()
+        mode_def["layout"]["body"].append({"type": "text", "template": "{text} again"})
+        calls = []
+        real_wrap = json_renderer.wrap_text
+
+        def counting_wrap(text, font, max_width):
+            calls.append(text)
+            return real_wrap(text, font, max_width)
+
+        with patch("core.json_renderer.wrap_text", counting_wrap):
+            render_json_mode(mode_def, {"text": "hello"}, **RENDER_KW)
+        assert sorted(calls) == ["hello", "hello again"]
+
+    def test_measured_height_matches_drawn_height(self):
+        registry = get_registry()
+        for mode_id in _builtin_ids():
+            plan = registry.get_layout_plan(mode_id, 400, 300)
+            if plan.body_mode != "center":
+                continue
+            content = _get_fallback(registry.get_json_mode(mode_id).definition["content"])
+            heights = []
+            for measure_only in (True, False):
+                img = Image.new("1", (400, 300), 1)
+                ctx = RenderContext(
+                    draw=ImageDraw.Draw(img), img=img, content=content,
+                    y=plan.status_bar_bottom, footer_height=plan.footer_height,
+                    measure_only=measure_only,
+                )
+                json_renderer._render_children(ctx, plan.body)
+                heights.append(ctx.y)
+            assert heights[0] == heights[1], mode_id
+
+
+class TestRegistryPlanCache:
+    def _write(self, path, label):
+        mode_def = _mode_def()
+        mode_def["layout"]["footer"]["label"] = label
+        path.write_text(json.dumps(mode_def), encoding="utf-8")
+
+    def test_plan_cached_per_size(self, tmp_path):
+        registry = ModeRegistry()
+        path = tmp_path / "plan_test.json"
+        self._write(path, "A")
+        registry.load_json_mode(str(path))
+        first = registry.get_layout_plan("plan_test", 400, 300)
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300) is first
+        assert registry.get_layout_plan("PLAN_TEST", 296, 128) is not first
+
+    def test_plan_cache_is_lru_bounded(self, tmp_path):
+        registry = ModeRegistry()
+        registry.max_plans = 2
+        path = tmp_path / "plan_test.json"
+        self._write(path, "A")
+        registry.load_json_mode(str(path))
+        first = registry.get_layout_plan("PLAN_TEST", 400, 300)
+        registry.get_layout_plan("PLAN_TEST", 296, 128)
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300) is first  # now most recent
+        registry.get_layout_plan("PLAN_TEST", 800, 480)
+        assert list(registry._plans) == [("PLAN_TEST", 400, 300), ("PLAN_TEST", 800, 480)]
+
+    def test_unknown_mode_has_no_plan(self):
+        assert ModeRegistry().get_layout_plan("MISSING", 400, 300) is None
+
+    def test_resave_invalidates_plan(self, tmp_path):
+        registry = ModeRegistry()
+        path = tmp_path / "plan_test.json"
+        self._write(path, "A")
+        registry.load_json_mode(str(path))
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300).footer_label == "A"
+
+        self._write(path, "B")
+        registry.unregister_custom("PLAN_TEST")
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300) is None
+        registry.load_json_mode(str(path))
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300).footer_label == "B"
+
+    def test_reload_without_unregister_invalidates_plan(self, tmp_path):
+        registry = ModeRegistry()
+        path = tmp_path / "plan_test.json"
+        self._write(path, "A")
+        registry.load_json_mode(str(path))
+        registry.get_layout_plan("PLAN_TEST", 400, 300)
+        self._write(path, "B")
+        registry.load_json_mode(str(path))
+        assert registry.get_layout_plan("PLAN_TEST", 400, 300).footer_label == "B"
@@ -0,0 +1,109 @@
+"""
+Unit tests for the pooled LLM clients.
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from core.content import _lease_client
+from core.llm_pool import LLMClientPool
+
+BASE = "https://api.example.com/v1"
+
+
+class TestLLMClientPool:
+    async def test_same_key_reuses_client(self):
+        pool = LLMClientPool()
+        first = pool.get("deepseek", BASE, "sk-a")
+        assert pool.get("deepseek", BASE, "sk-a") is first
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["reused"] == 1
+        await pool.aclose()
+
+    async def test_key_includes_provider_url_and_api_key(self):
+        pool = LLMClientPool()
+        clients = {
+            id(pool.get("deepseek", BASE, "sk-a")),
+            id(pool.get("deepseek", BASE, "sk-b")),
+            id(pool.get("moonshot", BASE, "sk-a")),
+            id(pool.get("deepseek", BASE + "/x", "sk-a")),
+        }
+        assert len(clients) == 4
+        await pool.aclose()
+
+    async def test_api_key_is_not_stored_in_key(self):
+        pool = LLMClientPool()
+        pool.get("deepseek", BASE, "sk-secret")
+        assert all("sk-secret" not in part for key in pool._clients for part in key)
+        await pool.aclose()
+
+    async def test_lru_bound(self):
+        pool = LLMClientPool(max_clients=2)
+        first = pool.get("deepseek", BASE, "sk-1")
+        pool.get("deepseek", BASE, "sk-2")
+        pool.get("deepseek", BASE, "sk-3")
+        assert pool.stats()["clients"] == 2
+        assert pool.stats()["evicted"] == 1
+        assert pool.get("deepseek", BASE, "sk-1") is not first
+        await pool.aclose()
+
+    async def test_idle_clients_are_evicted(self):
+        pool = LLMClientPool(idle_seconds=10)
+        with patch("core.llm_pool.time.monotonic", return_value=100.0):
+            first = pool.get("deepseek", BASE, "sk-a")
+        with patch("core.llm_pool.time.monotonic", return_value=200.0):
+            assert pool.get("deepseek", BASE, "sk-a") is not first
+        assert pool.stats()["evicted"] == 1
+        await pool.aclose()
+
+    async def test_evicted_client_closes_after_last_lease(self):
+        pool = LLMClientPool(max_clients=1)
+        leased = pool.get("deepseek", BASE, "sk-1")
+        with patch.object(leased, "close", new_callable=AsyncMock) as close:
+            async with pool.lease("deepseek", BASE, "sk-1"):
+                pool.get("deepseek", BASE, "sk-2")  # evicts sk-1 while in use
+                await asyncio.sleep(0)
+                close.assert_not_awaited()
+                assert pool.stats()["deferred_closes"] == 1
+                assert pool.stats()["active_leases"] == 1
+            assert len(pool._closing) == 1  # the close task is referenced until it finishes
+            await asyncio.sleep(0)
+            close.assert_awaited_once()
+        await asyncio.sleep(0)
+        assert not pool._closing
+        assert pool.stats()["active_leases"] == 0
+        await pool.aclose()
+
+    async def test_leased_client_is_not_idle_evicted(self):
+        pool = LLMClientPool(idle_seconds=10)
+        with patch("core.llm_pool.time.monotonic", return_value=100.0):
+            async with pool.lease("deepseek", BASE, "sk-a") as leased:
+                with patch("core.llm_pool.time.monotonic", return_value=200.0):
+                    assert pool.get("deepseek", BASE, "sk-a") is leased
+        assert pool.stats()["evicted"] == 0
+        await pool.aclose()
+
+    async def test_connection_limits(self):
+        pool = LLMClientPool(max_connections=3)
+        client = pool.get("deepseek", BASE, "sk-a")
+        transport_pool = client._client._transport._pool
+        assert transport_pool._max_connections == 3
+        await pool.aclose()
+
+
+async def test_lease_client_uses_shared_pool(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "sk-test-key")
+    async with _lease_client("deepseek", "deepseek-chat") as (first, max_tokens):
+        async with _lease_client("deepseek", "deepseek-chat") as (second, _):
+            assert first is second
+        assert max_tokens == 1024
+
+
+async def test_lease_client_without_key_still_raises(monkeypatch):
+    from core.errors import LLMKeyMissingError
+
+    monkeypatch.delenv("MOONSHOT_API_KEY", raising=False)
+    with pytest.raises(LLMKeyMissingError):
+        async with _lease_client("moonshot", "moonshot-v1-8k"):
+            pass
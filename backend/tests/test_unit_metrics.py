@@ -0,0 +1,13 @@
+"""
+Unit tests for the shared runtime-stats helpers.
+"""
+from core.metrics import percentile
+
+
+def test_percentile():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 0.50) == 51.0
+    assert percentile(samples, 0.99) == 100.0
+    assert percentile(samples, 1.0) == 100.0
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.234], 0.5, digits=2) == 1.23
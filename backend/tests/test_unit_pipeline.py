@@ -5,6 +5,7 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from PIL import Image
 
+from core.framebuffer import Frame
 from core.pipeline import generate_and_render, _generate_content_for_persona
 
 
@@ -134,10 +135,11 @@ class TestGenerateAndRender:
         ):
             mock_gc.return_value = {"quote": "Test", "author": "Author"}
 
-            result_img, result_content = await generate_and_render(
+            result_frame, result_content = await generate_and_render(
                 "STOIC", sample_config, sample_date_ctx, sample_weather, 85.0
             )
-            assert result_img is mock_img
+            assert isinstance(result_frame, Frame)
+            assert result_frame.bmp == Frame.from_image(mock_img).bmp
             assert result_content == {"quote": "Test", "author": "Author"}
             mock_gc.assert_called_once()
             mock_rm.assert_called_once()
@@ -153,7 +155,8 @@ class TestGenerateAndRender:
         ):
             mock_gc.return_value = {"quote": "Test", "author": "Author"}
 
-            result_img, result_content = await generate_and_render(
+            result_frame, result_content = await generate_and_render(
                 "STOIC", None, sample_date_ctx, sample_weather, 85.0
             )
-            assert result_img is mock_img
+            assert isinstance(result_frame, Frame)
+            assert result_frame.bmp == Frame.from_image(mock_img).bmp
@@ -0,0 +1,82 @@
+"""
+Unit tests for the off-loop render pool and the event-loop lag monitor.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+
+import pytest
+
+from core import render_pool as render_pool_mod
+from core.json_content import _get_fallback
+from core.json_renderer import render_json_mode
+from core.mode_registry import get_registry
+from core.render_pool import LoopLagMonitor, RenderPool, render_packed
+
+RENDER_KW = dict(
+    date_str="2月3日 周一",
+    weather_str="晴 12°C",
+    battery_pct=80,
+    weather_code=0,
+    time_str="10:00",
+    screen_w=400,
+    screen_h=300,
+)
+
+
+def _stoic():
+    mode_def = get_registry().get_json_mode("STOIC").definition
+    return mode_def, _get_fallback(mode_def["content"])
+
+
+@pytest.mark.parametrize("kind", ["inline", "thread", "process"])
+async def test_pool_output_matches_direct_render(kind):
+    mode_def, content = _stoic()
+    expected = render_json_mode(mode_def, content, **RENDER_KW)
+    pool = RenderPool(kind, workers=1)
+    try:
+        frame = await pool.render("STOIC", mode_def, content, **RENDER_KW)
+    finally:
+        pool.shutdown()
+    assert frame.size == (400, 300)
+    assert frame.to_image().tobytes() == expected.tobytes()
+    assert pool.stats()["renders"] == 1
+    assert pool._encodes == 1  # packing is timed where it runs, even in a worker process
+
+
+def test_worker_plan_is_compiled_once_per_definition(monkeypatch):
+    monkeypatch.setattr(render_pool_mod, "_worker_plans", OrderedDict())
+    mode_def, content = _stoic()
+    render_packed("STOIC", mode_def, content, RENDER_KW)
+    plan = render_pool_mod._worker_plans[("STOIC", 400, 300)][1]
+    render_packed("STOIC", mode_def, content, RENDER_KW)
+    assert render_pool_mod._worker_plans[("STOIC", 400, 300)][1] is plan
+
+    changed = {**mode_def, "layout": {**mode_def["layout"], "footer": {"label": "CHANGED"}}}
+    render_packed("STOIC", changed, content, RENDER_KW)
+    assert render_pool_mod._worker_plans[("STOIC", 400, 300)][1] is not plan
+
+
+def test_worker_plans_are_bounded(monkeypatch):
+    monkeypatch.setattr(render_pool_mod, "_worker_plans", OrderedDict())
+    monkeypatch.setattr(render_pool_mod, "LAYOUT_PLAN_CACHE_SIZE", 2)
+    mode_def, content = _stoic()
+    for w in (300, 320, 340):
+        render_packed("STOIC", mode_def, content, {**RENDER_KW, "screen_w": w})
+    assert list(render_pool_mod._worker_plans) == [("STOIC", 320, 300), ("STOIC", 340, 300)]
+
+
+def test_unknown_pool_kind_falls_back_to_threads():
+    assert RenderPool("gpu", workers=2).kind == "thread"
+
+
+async def test_loop_lag_records_blocking():
+    monitor = LoopLagMonitor(interval=0.01)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.02)
+    time.sleep(0.05)  # block the loop
+    await asyncio.sleep(0.02)
+    task.cancel()
+    stats = monitor.stats()
+    assert stats["samples"] >= 1
+    assert stats["lag_max_ms"] >= 30
@@ -0,0 +1,165 @@
+"""
+Unit tests for the hourly / daily render rollups.
+"""
+import random
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from core import db as db_mod
+from core.rollups import (
+    DAILY,
+    HOURLY,
+    LATENCY_BUCKETS_MS,
+    latency_bucket,
+    latency_histogram,
+    prune_hourly,
+    rebuild_rollups,
+)
+from core.stats_store import get_device_stats, get_stats_overview, init_stats_db
+from core.telemetry import TelemetryBuffer
+
+
+@pytest.fixture
+async def main_db(tmp_path):
+    await db_mod.close_all()
+    path = str(tmp_path / "rollups.db")
+    with patch.object(db_mod, "_MAIN_DB_PATH", path), patch("core.stats_store.DB_PATH", path):
+        await init_stats_db()
+        yield await db_mod.get_main_db()
+        await db_mod.close_all()
+
+
+def _render_rows(n: int, seed: int = 7) -> list[tuple]:
+    rng = random.Random(seed)
+    start = datetime(2026, 10, 1, 8)
+    rows = []
+    for i in range(n):
+        created = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 5))
+        rows.append((
+            rng.choice(["AA:01", "AA:02", "AA:03"]),
+            rng.choice(["STOIC", "ZEN", "DAILY"]),
+            rng.random() < 0.4,
+            rng.choice([0, 50, 100, 101, 400, 2500, 9000, 15000]),
+            "error" if rng.random() < 0.1 else "success",
+            created.isoformat(),
+        ))
+    return rows
+
+
+async def _write(buf: TelemetryBuffer, rows: list[tuple]) -> None:
+    """Queue ``rows`` with their own timestamps and flush in batches of 50."""
+    for i, (mac, persona, cache_hit, ms, status, created_at) in enumerate(rows):
+        buf._renders.append((mac, persona, int(cache_hit), ms, status, created_at))
+        if i % 50 == 49:
+            await buf.flush()
+    await buf.flush()
+
+
+async def _snapshot(db, table: str) -> list[tuple]:
+    cursor = await db.execute(f"SELECT * FROM {table} ORDER BY bucket, mac, persona")
+    return await cursor.fetchall()
+
+
+def test_latency_bucket_bounds_are_inclusive():
+    assert latency_bucket(0) == 0
+    assert latency_bucket(100) == 0
+    assert latency_bucket(101) == 1
+    assert latency_bucket(LATENCY_BUCKETS_MS[-1]) == len(LATENCY_BUCKETS_MS) - 1
+    assert latency_bucket(LATENCY_BUCKETS_MS[-1] + 1) == len(LATENCY_BUCKETS_MS)
+    hist = latency_histogram([1, None, 3])
+    assert hist[0] == {"le_ms": 100, "count": 1}
+    assert hist[1]["count"] == 0
+
+
+async def test_incremental_rollups_match_backfill(main_db):
+    await _write(TelemetryBuffer(flush_interval=60), _render_rows(600))
+    incremental = {table: await _snapshot(main_db, table) for table in (HOURLY, DAILY)}
+    assert incremental[DAILY]
+
+    assert await rebuild_rollups(main_db) == 600
+    for table in (HOURLY, DAILY):
+        assert await _snapshot(main_db, table) == incremental[table]
+
+
+async def test_rebuild_commits_each_table_separately(main_db):
+    await _write(TelemetryBuffer(flush_interval=60), _render_rows(100))
+    with patch.object(main_db, "commit", wraps=main_db.commit) as commit:
+        assert await rebuild_rollups(main_db) == 100
+    assert commit.await_count == len((HOURLY, DAILY))
+    assert not main_db.in_transaction
+
+
+async def test_failed_rebuild_keeps_rollups(main_db):
+    await _write(TelemetryBuffer(flush_interval=60), _render_rows(100))
+    daily = await _snapshot(main_db, DAILY)
+    real_execute = main_db.execute
+
+    async def failing_insert(sql, *args):
+        if sql.lstrip().startswith(f"INSERT INTO {DAILY}"):
+            raise RuntimeError("disk full")
+        return await real_execute(sql, *args)
+
+    with patch.object(main_db, "execute", failing_insert), pytest.raises(RuntimeError):
+        await rebuild_rollups(main_db)
+    assert await _snapshot(main_db, DAILY) == daily
+
+
+async def test_device_stats_match_raw_logs(main_db):
+    rows = _render_rows(400)
+    await _write(TelemetryBuffer(flush_interval=60), rows)
+
+    mine = [r for r in rows if r[0] == "AA:02"]
+    ok = [r for r in mine if r[4] == "success"]
+    stats = await get_device_stats("AA:02")
+    assert stats["total_renders"] == len(mine)
+    assert stats["cache_hit_rate"] == round(sum(r[2] for r in mine) / len(mine) * 100, 1)
+    assert stats["error_count"] == len(mine) - len(ok)
+    assert stats["avg_render_time_ms"] == round(sum(r[3] for r in ok) / len(ok))
+    assert stats["last_render"]["time"] == max(r[5] for r in mine)
+    assert sum(stats["mode_frequency"].values()) == len(mine)
+    assert sum(d["count"] for d in stats["daily_renders"]) == len(mine)
+    assert [d["date"] for d in stats["daily_renders"]] == sorted({r[5][:10] for r in mine})
+
+    expected = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for r in ok:
+        expected[latency_bucket(r[3])] += 1
+    assert [b["count"] for b in stats["latency_histogram"]] == expected
+    assert stats["latency_histogram"][-1]["le_ms"] is None
+
+    overview = await get_stats_overview()
+    assert overview["total_devices"] == 3
+    assert overview["total_renders"] == len(rows)
+    assert {d["mac"] for d in overview["devices"]} == {"AA:01", "AA:02", "AA:03"}
+
+
+async def test_empty_device_stats(main_db):
+    stats = await get_device_stats("NO:PE")
+    assert (stats["total_renders"], stats["avg_render_time_ms"], stats["last_render"]) == (0, 0, None)
+    assert all(b["count"] == 0 for b in stats["latency_histogram"])
+
+
+async def test_prune_hourly_keeps_daily(main_db):
+    await _write(TelemetryBuffer(flush_interval=60), _render_rows(200))
+    daily = await _snapshot(main_db, DAILY)
+    deleted = await prune_hourly(main_db, keep_days=2, now=datetime(2026, 10, 6, 8))
+    assert deleted > 0
+    remaining = await _snapshot(main_db, HOURLY)
+    assert remaining and all(row[0] >= "2026-10-04T08" for row in remaining)
+    assert await _snapshot(main_db, DAILY) == daily
+
+
+async def test_init_backfills_existing_logs(main_db):
+    rows = _render_rows(50)
+    await main_db.executemany(
+        """INSERT INTO render_logs (mac, persona, cache_hit, render_time_ms, status, created_at)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+    await main_db.commit()
+    assert await _snapshot(main_db, DAILY) == []
+
+    await init_stats_db()
+    cursor = await main_db.execute(f"SELECT SUM(renders) FROM {DAILY}")
+    assert (await cursor.fetchone())[0] == 50
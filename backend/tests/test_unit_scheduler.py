@@ -0,0 +1,220 @@
+"""
+Unit tests for the render job scheduler.
+"""
+import asyncio
+
+import pytest
+
+from core.scheduler import (
+    Priority, RenderScheduler, config_version, parse_provider_limits, render_job_key,
+)
+
+
+async def _blocked(scheduler: RenderScheduler, provider: str = "deepseek") -> asyncio.Event:
+    """Occupy a worker until the returned event is set."""
+    gate = asyncio.Event()
+
+    async def hold():
+        await gate.wait()
+
+    scheduler.submit(hold, provider=provider)
+    await asyncio.sleep(0)
+    return gate
+
+
+class TestScheduling:
+    async def test_runs_job_and_returns_result(self):
+        scheduler = RenderScheduler(workers=2)
+
+        async def job():
+            return 42
+
+        assert await scheduler.run(job) == 42
+        assert scheduler.stats()["completed"] == 1
+        await scheduler.stop()
+
+    async def test_priority_lanes_order(self):
+        scheduler = RenderScheduler(workers=1)
+        gate = await _blocked(scheduler)
+        order = []
+
+        def job(name):
+            async def run():
+                order.append(name)
+            return run
+
+        futures = [
+            scheduler.submit(job("background"), priority=Priority.BACKGROUND),
+            scheduler.submit(job("prefetch"), priority=Priority.PREFETCH),
+            scheduler.submit(job("interactive"), priority=Priority.INTERACTIVE),
+        ]
+        assert scheduler.stats()["queued"] == {"interactive": 1, "prefetch": 1, "background": 1}
+        gate.set()
+        await asyncio.gather(*futures)
+        assert order == ["interactive", "prefetch", "background"]
+        await scheduler.stop()
+
+    async def test_worker_limit(self):
+        scheduler = RenderScheduler(workers=2, default_provider_limit=10)
+        active = peak = 0
+
+        async def job():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await asyncio.gather(*(scheduler.run(job) for _ in range(6)))
+        assert peak == 2
+        await scheduler.stop()
+
+    async def test_provider_limit(self):
+        scheduler = RenderScheduler(workers=6, provider_limits={"deepseek": 1}, default_provider_limit=3)
+        active: dict[str, int] = {"deepseek": 0, "aliyun": 0}
+        peak = dict(active)
+
+        def job(provider):
+            async def run():
+                active[provider] += 1
+                peak[provider] = max(peak[provider], active[provider])
+                await asyncio.sleep(0.01)
+                active[provider] -= 1
+            return run
+
+        await asyncio.gather(*(
+            scheduler.run(job(p), provider=p) for p in ["deepseek", "aliyun"] * 4
+        ))
+        assert peak == {"deepseek": 1, "aliyun": 3}
+        await scheduler.stop()
+
+    async def test_saturated_provider_keeps_priority(self):
+        scheduler = RenderScheduler(workers=4, provider_limits={"deepseek": 1})
+        gate = await _blocked(scheduler)
+        order = []
+
+        def job(name):
+            async def run():
+                order.append(name)
+            return run
+
+        futures = [
+            scheduler.submit(job(f"bg{i}"), priority=Priority.BACKGROUND, provider="deepseek")
+            for i in range(4)
+        ]
+        await asyncio.sleep(0.01)
+        futures.append(scheduler.submit(job("interactive"), priority=Priority.INTERACTIVE, provider="deepseek"))
+        gate.set()
+        await asyncio.gather(*futures)
+        assert order == ["interactive", "bg0", "bg1", "bg2", "bg3"]
+        await scheduler.stop()
+
+    async def test_saturated_provider_does_not_block_others(self):
+        scheduler = RenderScheduler(workers=2, provider_limits={"deepseek": 1})
+        gate = await _blocked(scheduler)
+
+        async def job():
+            return "done"
+
+        scheduler.submit(job, provider="deepseek")
+        assert await asyncio.wait_for(scheduler.run(job, provider="aliyun"), 1) == "done"
+        gate.set()
+        await scheduler.stop()
+
+    async def test_failure_propagates(self):
+        scheduler = RenderScheduler(workers=1)
+
+        async def job():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await scheduler.run(job)
+        assert scheduler.stats()["failed"] == 1
+        await scheduler.stop()
+
+
+class TestDedupe:
+    async def test_same_key_runs_once(self):
+        scheduler = RenderScheduler(workers=4)
+        calls = 0
+
+        async def job():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "img"
+
+        key = render_job_key("AA:BB", "stoic", 400, 300)
+        results = await asyncio.gather(*(scheduler.run(job, key=key) for _ in range(5)))
+        assert results == ["img"] * 5
+        assert calls == 1
+        assert scheduler.stats()["deduped"] == 4
+        assert scheduler.stats()["deduped_by_kind"] == {"render": 4}
+        assert scheduler.stats()["deduped_by_lane"]["background"] == 4
+        await scheduler.stop()
+
+    async def test_config_versions_do_not_share(self):
+        scheduler = RenderScheduler(workers=4)
+        calls = 0
+
+        async def job():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+
+        keys = [render_job_key("AA:BB", "STOIC", 400, 300, version) for version in (1, 1, 2)]
+        keys.append(render_job_key("AA:BB", "STOIC", 400, 300, 1, kind="widget"))
+        await asyncio.gather(*(scheduler.run(job, key=key) for key in keys))
+        assert calls == 3
+        assert scheduler.stats()["deduped"] == 1
+        await scheduler.stop()
+
+    async def test_urgent_submitter_promotes_queued_job(self):
+        scheduler = RenderScheduler(workers=1)
+        gate = await _blocked(scheduler)
+        order = []
+
+        def job(name):
+            async def run():
+                order.append(name)
+            return run
+
+        key = render_job_key("AA:BB", "STOIC", 400, 300)
+        first = scheduler.submit(job("other"), priority=Priority.PREFETCH)
+        shared = scheduler.submit(job("render"), key=key, priority=Priority.BACKGROUND)
+        assert scheduler.submit(job("unused"), key=key, priority=Priority.INTERACTIVE) is shared
+        assert scheduler.stats()["queued"]["interactive"] == 1
+        assert scheduler.stats()["queued"]["background"] == 0
+        gate.set()
+        await asyncio.gather(first, shared)
+        assert order == ["render", "other"]
+        assert scheduler.stats()["promoted"] == 1
+        await scheduler.stop()
+
+    async def test_key_released_after_completion(self):
+        scheduler = RenderScheduler(workers=1)
+        calls = 0
+
+        async def job():
+            nonlocal calls
+            calls += 1
+
+        key = render_job_key("AA:BB", "STOIC", 400, 300)
+        await scheduler.run(job, key=key)
+        await scheduler.run(job, key=key)
+        assert calls == 2
+        await scheduler.stop()
+
+
+def test_config_version():
+    assert config_version(None) is None
+    assert config_version({"id": 7, "city": "杭州"}) == 7
+    assert config_version({"city": "杭州", "modes": ["STOIC"]}) == config_version({"modes": ["STOIC"], "city": "杭州"})
+    assert config_version({"city": "杭州"}) != config_version({"city": "北京"})
+
+
+def test_parse_provider_limits():
+    assert parse_provider_limits("deepseek=4, Aliyun=2,bad,x=y,openai=0") == {
+        "deepseek": 4, "aliyun": 2, "openai": 1,
+    }
+    assert parse_provider_limits("") == {}
@@ -0,0 +1,107 @@
+"""
+Unit tests for the write-behind telemetry buffer.
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from core import db as db_mod
+from core.stats_store import get_device_stats, init_stats_db
+from core.telemetry import TelemetryBuffer
+
+
+@pytest.fixture
+async def main_db(tmp_path):
+    await db_mod.close_all()
+    path = str(tmp_path / "telemetry.db")
+    with patch.object(db_mod, "_MAIN_DB_PATH", path), patch("core.stats_store.DB_PATH", path):
+        await init_stats_db()
+        yield await db_mod.get_main_db()
+        await db_mod.close_all()
+
+
+async def _count(db, table: str) -> int:
+    cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+    return (await cursor.fetchone())[0]
+
+
+async def test_records_wait_for_flush(main_db):
+    buf = TelemetryBuffer(flush_interval=60, batch_size=100)
+    for i in range(10):
+        await buf.record_render("AA:BB", "STOIC", i % 2 == 0, 12, battery_voltage=3.1, wifi_rssi=-60)
+    assert await _count(main_db, "render_logs") == 0
+    assert buf.pending == 20
+
+    assert await buf.flush() == 20
+    assert await _count(main_db, "render_logs") == 10
+    assert await _count(main_db, "device_heartbeats") == 10
+    stats = buf.stats()
+    assert (stats["pending"], stats["written"], stats["flushes"]) == (0, 20, 1)
+
+
+async def test_batch_size_triggers_background_flush(main_db):
+    buf = TelemetryBuffer(flush_interval=60, batch_size=4)
+    for _ in range(2):
+        await buf.record_render("AA:BB", "ZEN", False, 5, battery_voltage=3.0)
+    await asyncio.gather(*list(buf._background))
+    assert await _count(main_db, "render_logs") == 2
+
+
+async def test_write_through_without_interval(main_db):
+    buf = TelemetryBuffer(flush_interval=0)
+    await buf.record_render("AA:BB", "ZEN", False, 5, status="error")
+    assert await _count(main_db, "render_logs") == 1
+    assert await _count(main_db, "device_heartbeats") == 0
+
+
+async def test_failed_flush_keeps_rows_and_bounds_backlog(main_db):
+    buf = TelemetryBuffer(flush_interval=60, batch_size=1000, max_pending=1000)
+    for _ in range(450):
+        await buf.record_render("AA:BB", "ZEN", False, 5, battery_voltage=3.0)
+    await main_db.execute("ALTER TABLE render_logs RENAME TO render_logs_old")
+    assert await buf.flush() == 0
+    assert buf.pending == 900
+
+    # Reaching the batch size retries in the background; the backlog stays bounded
+    for _ in range(100):
+        await buf.record_render("AA:BB", "ZEN", False, 5, battery_voltage=3.0)
+    await asyncio.gather(*list(buf._background))
+    assert buf.pending == 1000
+    assert buf.stats()["errors"] == 2 and buf.stats()["dropped"] == 100
+
+    await main_db.execute("ALTER TABLE render_logs_old RENAME TO render_logs")
+    assert await buf.flush() == 1000
+    assert await _count(main_db, "render_logs") + await _count(main_db, "device_heartbeats") == 1000
+
+
+async def test_flush_writes_outside_the_shared_connection(main_db):
+    buf = TelemetryBuffer(flush_interval=60)
+    await buf.record_render("AA:BB", "ZEN", False, 5, battery_voltage=3.0)
+    changes = main_db.total_changes
+    assert await buf.flush() == 2
+    # Nothing went through the shared connection, so its transactions are untouched
+    assert main_db.total_changes == changes
+    assert not main_db.in_transaction
+    assert await _count(main_db, "render_logs") == 1
+
+
+async def test_trim_keeps_newest_heartbeats_per_device(main_db):
+    buf = TelemetryBuffer(flush_interval=60, heartbeats_per_device=3)
+    for mac, n in (("AA", 5), ("BB", 2)):
+        for i in range(n):
+            await buf.record_render(mac, "ZEN", False, 5, battery_voltage=3.0 + i / 10)
+    assert await buf.trim() == 2
+    cursor = await main_db.execute(
+        "SELECT mac, battery_voltage FROM device_heartbeats ORDER BY mac, battery_voltage"
+    )
+    rows = [(mac, round(v, 1)) for mac, v in await cursor.fetchall()]
+    assert rows == [("AA", 3.2), ("AA", 3.3), ("AA", 3.4), ("BB", 3.0), ("BB", 3.1)]
+
+
+async def test_stats_reads_see_buffered_rows(main_db):
+    with patch("core.stats_store.telemetry", TelemetryBuffer(flush_interval=60)) as buf:
+        await buf.record_render("AA:BB", "STOIC", True, 7, battery_voltage=3.2)
+        stats = await get_device_stats("AA:BB")
+    assert stats["total_renders"] == 1
+    assert stats["heartbeats"][0]["voltage"] == 3.2
@@ -0,0 +1,89 @@
+"""
+Unit tests for the glyph-metrics line breaking engine.
+"""
+import pytest
+from PIL import ImageFont
+
+from core.patterns.text_layout import (
+    break_paragraph,
+    clear_glyph_cache,
+    glyph_advances,
+    glyph_cache_info,
+    wrap_lines,
+)
+from core.patterns.utils import wrap_text
+
+
+def _greedy_wrap(text, font, max_width):
+    """Reference: the original per-character greedy wrap_text."""
+    lines = []
+    for paragraph in text.split("\n"):
+        current = ""
+        for ch in paragraph:
+            test = current + ch
+            if font.getbbox(test)[2] > max_width:
+                if current:
+                    lines.append(current)
+                current = ch
+            else:
+                current = test
+        if current:
+            lines.append(current)
+    return lines
+
+
+SAMPLES = [
+    "",
+    "Hello",
+    "The obstacle in the path becomes the path. Never forget, within every obstacle is an opportunity.",
+    "Waste no more time arguing about what a good man should be. Be one.\nMarcus Aurelius",
+    "a\n\nb",
+    "WWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWWW",
+    "iiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiiii",
+    "AV To Ty Wa -- kerning pairs, AVAVAVAVAVAV; LT LY Yo Te",
+    "   leading and trailing spaces   ",
+]
+
+
+@pytest.mark.parametrize("size", [10, 14, 22])
+@pytest.mark.parametrize("max_width", [1, 30, 120, 352])
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_greedy_reference(text, size, max_width):
+    font = ImageFont.load_default(size=size)
+    assert wrap_lines(text, font, max_width) == _greedy_wrap(text, font, max_width)
+
+
+def test_wrap_text_delegates_to_engine():
+    font = ImageFont.load_default(size=14)
+    text = SAMPLES[2]
+    assert wrap_text(text, font, 200) == _greedy_wrap(text, font, 200)
+
+
+def test_first_char_always_accepted():
+    font = ImageFont.load_default(size=22)
+    assert break_paragraph("WW", font, 1) == ["W", "W"]
+
+
+def test_advances_cached_per_font_and_size():
+    clear_glyph_cache()
+    small = ImageFont.load_default(size=10)
+    large = ImageFont.load_default(size=20)
+    glyph_advances(small, "abca")
+    info = glyph_cache_info()
+    assert info["misses"] == 3
+    assert info["hits"] == 1
+    glyph_advances(large, "a")
+    assert glyph_cache_info()["fonts"] == 2
+    # A fresh object for the same face/size reuses the table
+    glyph_advances(ImageFont.load_default(size=10), "abc")
+    assert glyph_cache_info()["misses"] == 4
+
+
+def test_exact_measures_bounded_per_line():
+    clear_glyph_cache()
+    font = ImageFont.load_default(size=14)
+    text = SAMPLES[2] * 4
+    lines = wrap_lines(text, font, 200)
+    # The greedy algorithm needs one getbbox per character.
+    assert glyph_cache_info()["exact_measures"] < len(text) // 4
+    assert len(lines) > 1
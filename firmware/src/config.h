@@ -35,6 +35,17 @@ static const int ROW_BYTES   = W / 8;
 static const int ROW_STRIDE  = (ROW_BYTES + 3) & ~3;  // BMP row stride (4-byte aligned)
 static const int IMG_BUF_LEN = ROW_BYTES * H;
 
+// Frame format requested from /api/render: "delta1" (changed rects against the
+// frame on screen, else PackBits), "raw1rle", "raw1" or "bmp". fetchBMP() parses
+// whichever format the server answers with, so servers that ignore the
+// parameter and send a BMP still work.
+#ifndef RENDER_FORMAT
+#define RENDER_FORMAT "delta1"
+#endif
+
+// Deltas covering more than this share of the panel get a whole-panel refresh
+static const int PARTIAL_REFRESH_MAX_PERCENT = 50;
+
 // Shared framebuffer (defined in main.cpp)
 extern uint8_t imgBuf[];
 
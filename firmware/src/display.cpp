@@ -244,3 +244,14 @@ void smartDisplay(const uint8_t *image) {
     }
     refreshCount++;
 }
+
+void smartPartialDisplay(const uint8_t *image, int x, int y, int w, int h) {
+    bool fullDue = refreshCount % FULL_REFRESH_INTERVAL == 0;
+    if (fullDue || w * h * 100 > W * H * PARTIAL_REFRESH_MAX_PERCENT) {
+        smartDisplay(image);
+        return;
+    }
+    Serial.printf("smartDisplay: partial refresh %d,%d %dx%d (cycle %d)\n", x, y, w, h, refreshCount);
+    epdPartialDisplayRegion(image, x, y, w, h);
+    refreshCount++;
+}
@@ -21,6 +21,10 @@ void updateTimeDisplay();
 // Smart display: uses no-flash partial refresh normally, full refresh every N cycles
 void smartDisplay(const uint8_t *image);
 
+// Like smartDisplay, but only the given region of image changed: refreshes just
+// that region unless a full refresh is due or the region is most of the panel
+void smartPartialDisplay(const uint8_t *image, int x, int y, int w, int h);
+
 // Show mode name preview screen (displayed briefly on double-click before loading)
 void showModePreview(const char *modeName);
 
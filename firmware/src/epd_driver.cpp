@@ -98,6 +98,16 @@ void epdPartialDisplay(uint8_t *data, int xStart, int yStart, int xEnd, int yEnd
     display.powerOff();
 }
 
+// Same, but the region is cut out of a full-screen image (e.g. imgBuf after
+// a delta), so the caller needs no separate region buffer.
+
+void epdPartialDisplayRegion(const uint8_t *image, int x, int y, int w, int h) {
+    epdInit();
+    display.writeImagePart(image, x, y, W, H, x, y, w, h, false, false, true);
+    display.refresh(x, y, w, h);
+    display.powerOff();
+}
+
 // ── EPD deep sleep ──────────────────────────────────────────
 
 void epdSleep() {
@@ -21,6 +21,9 @@ void epdDisplayFast(const uint8_t *image);
 // Partial display refresh for a rectangular region
 void epdPartialDisplay(uint8_t *data, int xStart, int yStart, int xEnd, int yEnd);
 
+// Partial refresh of a region of a full-screen image (x, w multiples of 8)
+void epdPartialDisplayRegion(const uint8_t *image, int x, int y, int w, int h);
+
 // Put EPD into deep sleep mode
 void epdSleep();
 
@@ -325,23 +325,36 @@ static void triggerImmediateRefresh(bool nextMode) {
     ledFeedback("ack");
     if (nextMode) {
         showModePreview("NEXT");
+        forgetImageHash();
     }
     ledFeedback("connecting");
     if (connectWiFi()) {
         ledFeedback("downloading");
-        if (fetchBMP(nextMode)) {
-            cacheSave(imgBuf, IMG_BUF_LEN);
-
-            uint32_t newChecksum = computeChecksum(imgBuf, IMG_BUF_LEN);
-            if (newChecksum == lastContentChecksum && !nextMode) {
-                Serial.println("Content unchanged, skipping display refresh");
+        bool unchanged = false;
+        if (fetchBMP(nextMode, &unchanged)) {
+            if (unchanged) {
+                Serial.println("Image not modified, skipping display refresh");
                 ledFeedback("success");
             } else {
-                Serial.println("Displaying new content...");
-                smartDisplay(imgBuf);
-                lastContentChecksum = newChecksum;
-                ledFeedback("success");
-                Serial.println("Display done");
+                cacheSave(imgBuf, IMG_BUF_LEN);
+
+                uint32_t newChecksum = computeChecksum(imgBuf, IMG_BUF_LEN);
+                if (newChecksum == lastContentChecksum && !nextMode) {
+                    Serial.println("Content unchanged, skipping display refresh");
+                    ledFeedback("success");
+                } else if (lastDirty.w > 0 && !nextMode) {
+                    Serial.println("Displaying changed region...");
+                    smartPartialDisplay(imgBuf, lastDirty.x, lastDirty.y, lastDirty.w, lastDirty.h);
+                    lastContentChecksum = newChecksum;
+                    ledFeedback("success");
+                    Serial.println("Display done");
+                } else {
+                    Serial.println("Displaying new content...");
+                    smartDisplay(imgBuf);
+                    lastContentChecksum = newChecksum;
+                    ledFeedback("success");
+                    Serial.println("Display done");
+                }
             }
 
             syncNTP();
@@ -87,13 +87,169 @@ static bool readExact(WiFiClient *s, uint8_t *buf, int len) {
 
 // ── Fetch BMP from backend ──────────────────────────────────
 
-bool fetchBMP(bool nextMode) {
+// raw1 frame header: "INK1" (or "INKD" for a delta), width, height, encoding,
+// reserved, body length (little-endian, 14 bytes - the same size as a BMP file header)
+static const int RAW1_HEADER_LEN = 14;
+static const uint8_t RAW1_PLAIN = 0;
+static const uint8_t RAW1_PACKBITS = 1;
+
+// Reads a raw1 / delta body from the HTTP stream, expanding PackBits on the
+// fly: a header byte n < 128 is followed by n+1 literal bytes, n > 128 by one
+// byte repeated 257-n times.
+class BodyReader {
+public:
+    BodyReader(WiFiClient *s, uint32_t len, bool packbits)
+        : _s(s), _left(len), _packbits(packbits) {}
+
+    bool read(uint8_t *dst, int n) {
+        if (!_packbits) return readRaw(dst, n);
+        while (n > 0) {
+            if (_run == 0 && !nextPacket()) return false;
+            int k = min(n, _run);
+            if (_literal) {
+                if (!readRaw(dst, k)) return false;
+            } else {
+                memset(dst, _value, k);
+            }
+            dst += k;
+            n -= k;
+            _run -= k;
+        }
+        return true;
+    }
+
+    bool done() const { return _left == 0 && _run == 0; }
+
+private:
+    bool readRaw(uint8_t *dst, int n) {
+        if ((uint32_t)n > _left || !readExact(_s, dst, n)) return false;
+        _left -= n;
+        return true;
+    }
+
+    bool nextPacket() {
+        uint8_t h;
+        do {
+            if (!readRaw(&h, 1)) return false;
+        } while (h == 128);
+        _literal = h < 128;
+        _run = _literal ? h + 1 : 257 - h;
+        return _literal || readRaw(&_value, 1);
+    }
+
+    WiFiClient *_s;
+    uint32_t _left;
+    bool _packbits;
+    bool _literal = false;
+    int _run = 0;
+    uint8_t _value = 0;
+};
+
+DirtyRegion lastDirty = {0, 0, 0, 0};
+
+// Apply a delta body: a rect count, then per rect x, y, w, h (uint16, pixels)
+// followed by its top-down rows of ceil(w/8) bytes, written into imgBuf.
+static bool readDelta(BodyReader &body) {
+    uint8_t count[2];
+    if (!body.read(count, 2)) return false;
+    int rects = count[0] | (count[1] << 8);
+    int x0 = W, y0 = H, x1 = 0, y1 = 0;
+    for (int r = 0; r < rects; r++) {
+        uint8_t hdr[8];
+        if (!body.read(hdr, 8)) return false;
+        int x = hdr[0] | (hdr[1] << 8);
+        int y = hdr[2] | (hdr[3] << 8);
+        int w = hdr[4] | (hdr[5] << 8);
+        int h = hdr[6] | (hdr[7] << 8);
+        if (x % 8 || x + w > W || y + h > H) {
+            Serial.printf("Delta rect out of bounds: %d,%d %dx%d\n", x, y, w, h);
+            return false;
+        }
+        int wBytes = (w + 7) / 8;
+        for (int i = 0; i < h; i++) {
+            if (!body.read(imgBuf + (y + i) * ROW_BYTES + x / 8, wBytes)) return false;
+        }
+        x0 = min(x0, x);
+        y0 = min(y0, y);
+        x1 = max(x1, x + w);
+        y1 = max(y1, y + h);
+    }
+    if (rects > 0) lastDirty = {x0, y0, x1 - x0, y1 - y0};
+    Serial.printf("Delta: %d rects, dirty %d,%d %dx%d\n", rects, lastDirty.x, lastDirty.y, lastDirty.w, lastDirty.h);
+    return body.done();
+}
+
+// raw1 rows are already top-down and ROW_BYTES wide: no flipping, no padding.
+// "INKD" deltas share the header and patch the previous frame in imgBuf.
+static bool readRaw1(WiFiClient *s, const uint8_t *header) {
+    int width  = header[4] | (header[5] << 8);
+    int height = header[6] | (header[7] << 8);
+    uint8_t encoding = header[8];
+    uint32_t len = header[10]
+                 | ((uint32_t)header[11] << 8)
+                 | ((uint32_t)header[12] << 16)
+                 | ((uint32_t)header[13] << 24);
+    Serial.printf("%.4s %dx%d encoding=%u body=%u\n", (const char *)header, width, height, encoding, len);
+    if (width != W || height != H) {
+        Serial.println("raw1 size does not match the panel");
+        return false;
+    }
+    if (encoding != RAW1_PLAIN && encoding != RAW1_PACKBITS) {
+        Serial.printf("Unknown raw1 encoding %u\n", encoding);
+        return false;
+    }
+    BodyReader body(s, len, encoding == RAW1_PACKBITS);
+    if (memcmp(header, "INKD", 4) == 0) {
+        return readDelta(body);
+    }
+    return body.read(imgBuf, IMG_BUF_LEN) && body.done();
+}
+
+// Read BMP pixel rows after the 14-byte file header
+static bool readBMP(WiFiClient *s, const uint8_t *fileHeader) {
+    // Extract pixel data offset from header
+    uint32_t pixelOffset = fileHeader[10]
+                         | ((uint32_t)fileHeader[11] << 8)
+                         | ((uint32_t)fileHeader[12] << 16)
+                         | ((uint32_t)fileHeader[13] << 24);
+    Serial.printf("BMP pixel offset: %u\n", pixelOffset);
+
+    // Skip remaining header bytes
+    int toSkip = pixelOffset - 14;
+    while (toSkip > 0 && s->connected()) {
+        if (s->available()) { s->read(); toSkip--; }
+    }
+
+    // Read pixel data row by row (BMP is bottom-up)
+    uint8_t rowBuf[ROW_STRIDE];
+    for (int bmpY = 0; bmpY < H; bmpY++) {
+        if (!readExact(s, rowBuf, ROW_STRIDE)) {
+            Serial.printf("Failed to read row %d\n", bmpY);
+            return false;
+        }
+        int dispY = H - 1 - bmpY;  // Flip vertical (BMP is bottom-up)
+        memcpy(imgBuf + dispY * ROW_BYTES, rowBuf, ROW_BYTES);
+    }
+    return true;
+}
+
+// Hash of the image last fetched into imgBuf (X-InkSight-Hash, hex digest)
+static String lastImageHash;
+
+void forgetImageHash() {
+    lastImageHash = "";
+}
+
+bool fetchBMP(bool nextMode, bool *unchanged) {
+    if (unchanged) *unchanged = false;
+    bool conditional = unchanged && !nextMode && lastImageHash.length() > 0;
     float v = readBatteryVoltage();
     String mac = WiFi.macAddress();
     int rssi = WiFi.RSSI();
     String url = cfgServer + "/api/render?v=" + String(v, 2)
                + "&mac=" + mac + "&rssi=" + String(rssi)
-               + "&w=" + String(W) + "&h=" + String(H);
+               + "&w=" + String(W) + "&h=" + String(H)
+               + "&fmt=" RENDER_FORMAT;
     if (nextMode) {
         url += "&next=1";
     }
@@ -115,11 +271,23 @@ bool fetchBMP(bool nextMode) {
     if (cfgDeviceToken.length() > 0) {
         http.addHeader("X-Device-Token", cfgDeviceToken);
     }
+    if (conditional) {
+        http.addHeader("If-None-Match", "\"" + lastImageHash + "\"");
+    }
+    const char *headerKeys[] = {"X-InkSight-Hash"};
+    http.collectHeaders(headerKeys, 1);
 
     Serial.printf("Free heap: %d\n", ESP.getFreeHeap());
     int code = http.GET();
     Serial.printf("HTTP code: %d\n", code);
 
+    if (code == 304 && conditional) {
+        Serial.println("Not modified, skipping download");
+        http.end();
+        *unchanged = true;
+        return true;
+    }
+
     if (code != 200) {
         if (code < 0) {
             Serial.printf("HTTP error: %s\n", http.errorToString(code).c_str());
@@ -131,46 +299,42 @@ bool fetchBMP(bool nextMode) {
         return false;
     }
 
+    // Proxies may drop If-None-Match; the hash header still spares the body
+    String hash = http.header("X-InkSight-Hash");
+    if (conditional && hash == lastImageHash) {
+        Serial.println("Same image hash, skipping download");
+        http.end();
+        *unchanged = true;
+        return true;
+    }
+
     int contentLen = http.getSize();
     Serial.printf("Content-Length: %d\n", contentLen);
 
     WiFiClient *stream = http.getStreamPtr();
 
-    // Read BMP file header (14 bytes)
-    uint8_t fileHeader[14];
-    if (!readExact(stream, fileHeader, 14)) {
-        Serial.println("Failed to read BMP header");
+    // BMP file header and raw1 header are both 14 bytes; the magic tells them apart
+    uint8_t fileHeader[RAW1_HEADER_LEN];
+    if (!readExact(stream, fileHeader, RAW1_HEADER_LEN)) {
+        Serial.println("Failed to read frame header");
         http.end();
         return false;
     }
 
-    // Extract pixel data offset from header
-    uint32_t pixelOffset = fileHeader[10]
-                         | ((uint32_t)fileHeader[11] << 8)
-                         | ((uint32_t)fileHeader[12] << 16)
-                         | ((uint32_t)fileHeader[13] << 24);
-    Serial.printf("BMP pixel offset: %u\n", pixelOffset);
-
-    // Skip remaining header bytes
-    int toSkip = pixelOffset - 14;
-    while (toSkip > 0 && stream->connected()) {
-        if (stream->available()) { stream->read(); toSkip--; }
-    }
-
-    // Read pixel data row by row (BMP is bottom-up)
-    uint8_t rowBuf[ROW_STRIDE];
-    for (int bmpY = 0; bmpY < H; bmpY++) {
-        if (!readExact(stream, rowBuf, ROW_STRIDE)) {
-            Serial.printf("Failed to read row %d\n", bmpY);
-            http.end();
-            return false;
-        }
-        int dispY = H - 1 - bmpY;  // Flip vertical (BMP is bottom-up)
-        memcpy(imgBuf + dispY * ROW_BYTES, rowBuf, ROW_BYTES);
+    lastDirty = {0, 0, 0, 0};
+    bool ok = memcmp(fileHeader, "INK1", 4) == 0 || memcmp(fileHeader, "INKD", 4) == 0
+            ? readRaw1(stream, fileHeader)
+            : readBMP(stream, fileHeader);
+    if (!ok) {
+        Serial.println("Failed to read frame");
+        http.end();
+        forgetImageHash();
+        return false;
     }
 
     http.end();
-    Serial.printf("BMP OK  %d bytes\n", IMG_BUF_LEN);
+    lastImageHash = hash;
+    Serial.printf("Frame OK  %d bytes\n", IMG_BUF_LEN);
 
 #if DEBUG_MODE
     // Checksum for verifying image data changed
@@ -15,7 +15,19 @@ bool connectWiFi();
 
 // Fetch BMP image from backend and store in imgBuf. Returns true on success.
 // If nextMode is true, appends &next=1 to request the next mode in sequence.
-bool fetchBMP(bool nextMode = false);
+// If unchanged is given, the request is conditional on the last image fetched:
+// when the server still has that image, *unchanged is set, nothing is
+// downloaded and imgBuf is left as it was.
+bool fetchBMP(bool nextMode = false, bool *unchanged = nullptr);
+
+// Bounding box of the pixels the last fetchBMP() changed in imgBuf when the
+// server answered with a delta; w == 0 after a full frame.
+struct DirtyRegion { int x, y, w, h; };
+extern DirtyRegion lastDirty;
+
+// Drop the remembered image hash once the panel shows something else,
+// so the next fetch downloads the image in full.
+void forgetImageHash();
 
 // POST favorite (triple-click) to backend. Returns true on success.
 bool postFavorite();